@@ -0,0 +1,96 @@
+import atexit
+import logging
+import threading
+from datetime import datetime
+
+from dal import upsert_statement
+
+logger = logging.getLogger(__name__)
+
+
+class AccessTracker:
+    """Buffers page-view counters in memory and writes them in one bulk UPSERT.
+
+    Views only touch an in-process dict, so they never take the database
+    write lock. A background thread flushes the buffer every ``interval``
+    seconds; the UPSERT adds the buffered count to the stored one in SQL, so
+    concurrent workers never lose increments.
+    """
+
+    def __init__(self, table, key_columns=('user_id', 'muscle_group_id'),
+                 count_column='access_count', time_column='last_accessed', interval=5.0):
+        self.table = table
+        self.key_columns = key_columns
+        self.count_column = count_column
+        self.time_column = time_column
+        self.interval = interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record(self, *key, when=None):
+        """Count one access and return the number of accesses not yet flushed for this key."""
+        when = when or datetime.utcnow()
+        with self._lock:
+            count, _ = self._pending.get(key, (0, None))
+            self._pending[key] = (count + 1, when)
+            return count + 1
+
+    def pending(self, *key):
+        with self._lock:
+            return self._pending.get(key, (0, None))[0]
+
+    def backlog(self):
+        """Number of keys with counts waiting for the next flush."""
+        with self._lock:
+            return len(self._pending)
+
+    def _drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def _restore(self, pending):
+        # Put unflushed counts back so a failed write is retried on the next flush
+        with self._lock:
+            for key, (count, when) in pending.items():
+                current, latest = self._pending.get(key, (0, when))
+                self._pending[key] = (current + count, max(when, latest))
+
+    def flush(self, engine):
+        """Write all buffered counters in a single statement. Returns the number of rows upserted."""
+        pending = self._drain()
+        if not pending:
+            return 0
+        rows = [
+            dict(zip(self.key_columns, key), **{self.count_column: count, self.time_column: when})
+            for key, (count, when) in pending.items()
+        ]
+        try:
+            with engine.begin() as connection:
+                connection.execute(upsert_statement(engine, self.table, self.key_columns,
+                                                    update_columns=[self.time_column],
+                                                    increment_columns=[self.count_column]), rows)
+        except Exception:
+            logger.exception('Access tracking flush failed; %d counters kept for retry', len(rows))
+            self._restore(pending)
+            return 0
+        return len(rows)
+
+    def start(self, engine):
+        """Start the background flusher (idempotent) and flush once more at interpreter exit."""
+        if self._thread is not None:
+            return
+
+        def run():
+            while not self._stop.wait(self.interval):
+                self.flush(engine)
+
+        self._thread = threading.Thread(target=run, name='access-tracker', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop, engine)
+
+    def stop(self, engine):
+        self._stop.set()
+        self.flush(engine)
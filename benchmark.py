@@ -0,0 +1,294 @@
+import http.client
+import json
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from urllib.parse import urlencode, urlsplit
+
+# One entry of the request mix: method, path, form data and relative weight
+Route = namedtuple('Route', ['method', 'path', 'data', 'weight'])
+
+
+# Transports
+class TestClientTransport:
+    """Runs requests in-process through the Flask test client; sessions are set directly."""
+
+    base_url = 'https://localhost'
+
+    def __init__(self, app):
+        self.app = app
+
+    def open_session(self, user):
+        client = self.app.test_client()
+        with client.session_transaction(base_url=self.base_url) as client_session:
+            client_session['user_id'] = user['id']
+            client_session['username'] = user['username']
+        return client
+
+    def request(self, client, method, path, data=None):
+        response = client.open(path, method=method, data=data, base_url=self.base_url)
+        return response.status_code, response.headers.get('X-Query-Count')
+
+
+class HTTPTransport:
+    """Runs requests against a live server, signing in each simulated user through /signin."""
+
+    def __init__(self, base_url, password):
+        parts = urlsplit(base_url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.password = password
+
+    def _send(self, connection, method, path, data=None, cookie=None):
+        headers = {}
+        body = None
+        if data is not None:
+            body = urlencode(data)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        if cookie:
+            headers['Cookie'] = cookie
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        return response
+
+    def open_session(self, user):
+        connection = self.connection_class(self.netloc, timeout=30)
+        response = self._send(connection, 'POST', '/signin', {'email': user['email'], 'password': self.password})
+        # The session cookie is Secure; send it back by hand so plain-HTTP test servers work too
+        cookie = '; '.join(header.split(';', 1)[0] for header in response.headers.get_all('Set-Cookie') or [])
+        return connection, cookie
+
+    def request(self, handle, method, path, data=None):
+        connection, cookie = handle
+        response = self._send(connection, method, path, data, cookie)
+        return response.status, response.getheader('X-Query-Count')
+
+
+# Load generation
+def run_load(transport, users, routes, threads=4, requests_per_thread=100, warmup=5, seed=42):
+    """Drive a weighted route mix from ``threads`` simulated users. Returns (samples, elapsed seconds).
+
+    Each sample is (route label, milliseconds, status, queries or None);
+    status 0 means the request raised.
+    """
+    samples = []
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(threads)
+    weights = [route.weight for route in routes]
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        handle = transport.open_session(users[index % len(users)])
+        local = []
+        for n in range(warmup + requests_per_thread):
+            if n == warmup:
+                start_barrier.wait()
+            route = rng.choices(routes, weights)[0]
+            started = time.perf_counter()
+            try:
+                status, queries = transport.request(handle, route.method, route.path, route.data)
+            except Exception:
+                status, queries = 0, None
+            if n >= warmup:
+                local.append((f'{route.method} {route.path}', (time.perf_counter() - started) * 1000,
+                              status, int(queries) if queries else None))
+        with lock:
+            samples.extend(local)
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, max(int(round(pct / 100 * len(sorted_values))) - 1, 0))]
+
+
+def summarize(samples, elapsed):
+    """Per-route and overall latency percentiles (ms), throughput and queries per request."""
+    by_route = {}
+    for label, ms, status, queries in samples:
+        by_route.setdefault(label, []).append((ms, status, queries))
+
+    def stats(rows):
+        latencies = sorted(ms for ms, _, _ in rows)
+        queries = [q for _, _, q in rows if q is not None]
+        return {
+            'requests': len(rows),
+            'errors': sum(1 for _, status, _ in rows if status == 0 or status >= 500),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'throughput_rps': round(len(rows) / elapsed, 1),
+            'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+        }
+
+    return {
+        'overall': stats([row for rows in by_route.values() for row in rows]),
+        'routes': {label: stats(rows) for label, rows in sorted(by_route.items())},
+    }
+
+
+def environment(**params):
+    """Metadata stored with a result so runs can be matched to commits."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {'commit': commit, 'recorded_at': datetime.utcnow().isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'params': params}
+
+
+def compare(baseline, current, threshold=0.2):
+    """Compare two saved results. Returns (report lines, regressed route labels).
+
+    A route regresses when its p95 grows by more than ``threshold`` or it
+    issues more queries per request than before (by over half a query on
+    average, since routes with branches average fractional counts).
+    """
+    lines = [f'{"route":<36}{"p95 before":>12}{"p95 after":>12}{"change":>9}{"queries":>12}']
+    regressed = []
+    for label, after in current['routes'].items():
+        before = baseline['routes'].get(label)
+        if before is None:
+            continue
+        change = (after['p95_ms'] - before['p95_ms']) / before['p95_ms'] if before['p95_ms'] else 0.0
+        queries = f'{before["queries_per_request"]}->{after["queries_per_request"]}'
+        lines.append(f'{label:<36}{before["p95_ms"]:>12}{after["p95_ms"]:>12}{change:>+9.0%}{queries:>12}')
+        more_queries = (after['queries_per_request'] or 0) > (before['queries_per_request'] or 0) + 0.5
+        if change > threshold or more_queries:
+            regressed.append(label)
+    return lines, regressed
+
+
+# Cold start
+STARTUP_SCRIPT = """
+import json, time
+started = time.perf_counter()
+from coachsmart import create_app
+imported = time.perf_counter()
+app = create_app({config!r})
+created = time.perf_counter()
+app.test_client().get('/', base_url='https://localhost')
+served = time.perf_counter()
+print(json.dumps({{'import_ms': (imported - started) * 1000, 'create_app_ms': (created - imported) * 1000,
+                  'first_request_ms': (served - created) * 1000}}))
+"""
+
+
+def _timed_run(command, cwd, env):
+    started = time.perf_counter()
+    result = subprocess.run(command, cwd=cwd, env=env, capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise RuntimeError(f'{" ".join(command)} failed:\n{result.stderr}')
+    return result, (time.perf_counter() - started) * 1000
+
+
+def import_times(module, cwd, env, top=10):
+    """The ``top`` slowest imports (cumulative microseconds) under ``python -X importtime``."""
+    result, _ = _timed_run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd, env)
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        times.append((int(cumulative), name.strip()))
+    return sorted(times, reverse=True)[:top]
+
+
+def measure_startup(cwd, env, runs=5, cli_commands=(('--help',),), config=None):
+    """Cold start of fresh interpreters: web worker phases and whole CLI invocations, in ms.
+
+    Each run is a new process, so nothing is cached between runs except the
+    filesystem. Returns {phase: {'median', 'min', 'max'}}.
+    """
+    script = STARTUP_SCRIPT.format(config=config or {})
+    phases = {}
+    for _ in range(runs):
+        result, total = _timed_run([sys.executable, '-c', script], cwd, env)
+        for phase, ms in json.loads(result.stdout.strip().splitlines()[-1]).items():
+            phases.setdefault(phase, []).append(ms)
+        phases.setdefault('worker_total_ms', []).append(total)
+        for args in cli_commands:
+            _, ms = _timed_run([sys.executable, '-m', 'flask', '--app', 'coachsmart'] + list(args), cwd, env)
+            phases.setdefault(f'flask {" ".join(args)} ms', []).append(ms)
+    return {phase: {'median': round(sorted(values)[len(values) // 2], 1), 'min': round(min(values), 1),
+                    'max': round(max(values), 1)} for phase, values in phases.items()}
+
+
+# Row hydration
+def hydration_benchmark(engine, model, dto, sizes=(1000, 100000), repeat=5):
+    """Cost of loading the same rows as ORM objects, Core rows and DTOs.
+
+    ``model``'s table in ``engine`` must hold at least max(sizes) rows and
+    ``dto`` is a namedtuple whose fields are columns of ``model``. Each mode
+    runs in a fresh session. Returns {size: {mode: {'median_ms', 'us_per_row', 'peak_kib'}}}.
+    """
+    import statistics
+    import tracemalloc
+    from sqlalchemy import select
+    from sqlalchemy.orm import Session
+
+    columns = [getattr(model, field) for field in dto._fields]
+    modes = {
+        'orm': lambda session, n: session.scalars(select(model).order_by(model.id).limit(n)).all(),
+        'core_rows': lambda session, n: session.execute(select(*columns).order_by(model.id).limit(n)).all(),
+        'dto': lambda session, n: [dto._make(row) for row in session.execute(select(*columns).order_by(model.id).limit(n))],
+    }
+    results = {}
+    for size in sizes:
+        results[size] = {}
+        for mode, load in modes.items():
+            timings = []
+            for _ in range(repeat):
+                with Session(engine) as session:
+                    started = time.perf_counter()
+                    loaded = load(session, size)
+                    timings.append((time.perf_counter() - started) * 1000)
+                if len(loaded) != size:
+                    raise ValueError(f'Expected {size} rows, loaded {len(loaded)}')
+            with Session(engine) as session:
+                tracemalloc.start()
+                loaded = load(session, size)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            del loaded
+            median = statistics.median(timings)
+            results[size][mode] = {'median_ms': round(median, 2), 'us_per_row': round(median * 1000 / size, 3),
+                                   'peak_kib': round(peak / 1024)}
+    return results
+
+
+# Streaming memory
+def peak_memory(chunks):
+    """Consume an iterator of str/bytes chunks under tracemalloc, discarding them.
+
+    Returns {'size' (characters or bytes), 'peak_kib', 'ms'}; the peak covers everything allocated
+    while producing the chunks, so it stays flat for a truly streaming producer.
+    """
+    import tracemalloc
+
+    produced = 0
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        for chunk in chunks:
+            produced += len(chunk)
+        elapsed = (time.perf_counter() - started) * 1000
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'size': produced, 'peak_kib': round(peak / 1024), 'ms': round(elapsed, 1)}
@@ -0,0 +1,65 @@
+import os
+from importlib import import_module
+
+from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from dal import enable_sqlite_foreign_keys
+from search import create_backend
+from . import features
+from .config import Config
+from .extensions import db, metrics, profiler, query_stats
+from .events import contact_queue, idempotency_keys, outbox
+
+# Templates, static files and the instance folder stay at the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def create_app(config=None):
+    """Build a CoachSmart app. ``config`` overrides the Config defaults (a dict), e.g. {'FEATURES': ['muscles']}."""
+    app = Flask(__name__, template_folder=os.path.join(ROOT, 'templates'),
+                static_folder=os.path.join(ROOT, 'static'), instance_path=os.path.join(ROOT, 'instance'))
+    app.config.from_object(Config)
+    if config:
+        app.config.update(config)
+    if app.config['ARCHIVE_DIR'] is None:
+        app.config['ARCHIVE_DIR'] = os.path.join(app.instance_path, 'archive')
+
+    if app.config['PROXY_HOPS']:
+        # request.remote_addr, scheme and host as the client sent them, read from the trusted proxies' headers
+        hops = app.config['PROXY_HOPS']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
+
+    db.init_app(app)
+    if app.config['SQLITE_FOREIGN_KEYS']:
+        with app.app_context():
+            enable_sqlite_foreign_keys(db.engine)
+    query_stats.init_app(app)
+    metrics.init_app(app)
+    profiler.init_app(app)
+    app.extensions['search_backend'] = create_backend(app.config['SEARCH_BACKEND'])
+    outbox.init_app(app)
+    idempotency_keys.init_app(app)
+    contact_queue.init_app(app)
+
+    # Shared auth, account, ops console, pages and CLI, plus the blueprints of each enabled feature module
+    features.validate(app.config['FEATURES'])
+    from . import account, auth, cli, current, ops, pages, security, timezones
+    security.init_app(app)
+    ops.init_app(app)
+    app.add_template_filter(timezones.localtime_filter, 'localtime')
+    app.before_request(timezones.reset_calendar)
+    app.before_request(current.reset_current_user)
+    app.context_processor(current.inject_current_user)
+    blueprints = [pages, auth, account, ops, cli] + [
+        import_module(f'.{name}', __name__)
+        for feature in app.config['FEATURES'] for name in features.FEATURES[feature].blueprints
+    ]
+    for module in blueprints:
+        app.register_blueprint(module.bp)
+
+    if app.config['PRECOMPILE_TEMPLATES']:
+        # Compile everything up front so the first request to each page doesn't pay for it
+        for name in app.jinja_env.list_templates(extensions=['html']):
+            app.jinja_env.get_template(name)
+    return app
@@ -0,0 +1,157 @@
+import secrets
+from datetime import datetime
+
+from flask import Blueprint, Response, current_app, jsonify, request, session, stream_with_context, url_for
+from sqlalchemy import delete, select
+from werkzeug.security import check_password_hash
+
+from dal import delete_chunk
+from data_export import ndjson_export, zip_export
+from .events import outbox, publish_event
+from .extensions import db, search_backend
+from .models import (AccountDeletion, Activity, ActivitySummary, Challenge, CustomWorkout, Goal, IdempotencyKey,
+                     MuscleGroup, User, UserChallenge, UserProgress, UserStats, Workout)
+from .security import security_logger
+
+# Account - personal data export and deletion
+bp = Blueprint('account', __name__, url_prefix='/account')
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = {
+    'ndjson': (ndjson_export, 'application/x-ndjson', 'ndjson'),
+    'zip': (zip_export, 'application/zip', 'zip'),
+}
+
+
+def _owned(model, user_id, *extra_columns, join=None):
+    query = select(*[column for column in model.__table__.c if column.name != 'user_id'], *extra_columns)
+    if join is not None:
+        query = query.join_from(model, join)
+    return query.where(model.user_id == user_id).order_by(model.id)
+
+
+def export_sections(user_id):
+    """(name, statement) for every kind of personal data held about a user, password hash excluded."""
+    return [
+        ('profile', select(User.id, User.username, User.email, User.is_admin, User.created_at, User.last_login)
+         .where(User.id == user_id)),
+        ('stats', _owned(UserStats, user_id)),
+        ('workouts', _owned(Workout, user_id)),
+        ('activities', _owned(Activity, user_id)),
+        ('activity_summaries', _owned(ActivitySummary, user_id)),
+        ('goals', _owned(Goal, user_id)),
+        ('custom_workouts', _owned(CustomWorkout, user_id)),
+        ('challenges', _owned(UserChallenge, user_id, Challenge.name.label('challenge_name'),
+                              Challenge.badge_name, join=Challenge)),
+        ('muscle_notes', _owned(UserProgress, user_id, MuscleGroup.name.label('muscle_group'), join=MuscleGroup)),
+    ]
+
+
+def export_account(engine, user_id, fmt='ndjson', batch_size=EXPORT_BATCH_SIZE):
+    """Yield the user's export in ``fmt`` (see EXPORT_FORMATS) on a connection of its own."""
+    writer = EXPORT_FORMATS[fmt][0]
+    with engine.connect() as connection:
+        yield from writer(connection, export_sections(user_id), batch_size)
+
+
+@bp.route('/export')
+def export():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f'format must be one of {", ".join(EXPORT_FORMATS)}'}), 400
+
+    user_id = session['user_id']
+    security_logger.warning(f"DATA_EXPORT: user_id={user_id}, format={fmt}, ip={request.remote_addr}")
+    _, mimetype, extension = EXPORT_FORMATS[fmt]
+    filename = f'coachsmart-export-{user_id}-{datetime.utcnow():%Y%m%d}.{extension}'
+    # Streamed straight from the cursor; the body is never held in memory
+    return Response(stream_with_context(export_account(db.engine, user_id, fmt)), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+
+# Account deletion - the account is anonymised at once, then its rows are deleted in chunks by the outbox worker
+ACCOUNT_TABLES = [Activity, Workout, UserChallenge, Goal, CustomWorkout, ActivitySummary, UserProgress, UserStats,
+                  IdempotencyKey]
+
+
+def request_account_deletion(user):
+    """Lock the user out and queue the removal of their data. Returns the AccountDeletion; the caller commits."""
+    # Sign-in is impossible from now on ('!' matches no password), every open session ends on its next request
+    # (security.end_revoked_session) and the email can be reused
+    user.username = f'deleted-{user.id}'
+    user.email = f'deleted-{user.id}@deleted.invalid'
+    user.password_hash = '!'
+    deletion = AccountDeletion(token=secrets.token_urlsafe(32), user_id=user.id, status='pending',
+                               requested_at=datetime.utcnow())
+    db.session.add(deletion)
+    db.session.flush()
+    publish_event('account_deletion', deletion_id=deletion.id)
+    return deletion
+
+
+@outbox.handler('account_deletion')
+def apply_account_deletion(deletion_id):
+    """Delete up to ACCOUNT_DELETE_BATCH_SIZE of the account's rows, child tables first.
+
+    While rows remain the event queues itself again, so each chunk commits on
+    its own; the user row goes last, once nothing references it.
+    """
+    deletion = db.session.get(AccountDeletion, deletion_id)
+    if deletion is None or deletion.status == 'done':
+        return
+    if deletion.started_at is None:
+        deletion.status = 'running'
+        deletion.started_at = datetime.utcnow()
+
+    budget = current_app.config['ACCOUNT_DELETE_BATCH_SIZE']
+    for model in ACCOUNT_TABLES:
+        table = model.__table__
+        ids = delete_chunk(db.session, table, table.c.user_id == deletion.user_id, budget)
+        if model is CustomWorkout:
+            # Bulk deletes skip the mapper events that keep the search index in sync
+            for workout_id in ids:
+                search_backend().remove_document(db.session.connection(), 'custom_workout', workout_id)
+        deletion.rows_deleted += len(ids)
+        budget -= len(ids)
+        if budget == 0:
+            outbox.publish(db.session, 'account_deletion', deletion_id=deletion_id)
+            return
+
+    deletion.rows_deleted += db.session.execute(delete(User).where(User.id == deletion.user_id)).rowcount
+    deletion.status = 'done'
+    deletion.finished_at = datetime.utcnow()
+
+
+@bp.route('/delete', methods=['POST'])
+def delete_account():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    user = db.session.get(User, session['user_id'])
+    if user is None or not check_password_hash(user.password_hash, request.form.get('password', '')):
+        security_logger.warning(f"FAILED_ACCOUNT_DELETION: user_id={session['user_id']}, ip={request.remote_addr}")
+        return jsonify({'error': 'Password is incorrect'}), 403
+
+    deletion = request_account_deletion(user)
+    db.session.commit()
+    security_logger.warning(f"ACCOUNT_DELETION_REQUESTED: user_id={user.id}, ip={request.remote_addr}")
+    session.clear()
+    return jsonify({'status': deletion.status,
+                    'status_url': url_for('account.deletion_status', token=deletion.token)}), 202
+
+
+@bp.route('/deletion/<token>')
+def deletion_status(token):
+    deletion = AccountDeletion.query.filter_by(token=token).first()
+    if deletion is None:
+        return jsonify({'error': 'Not found'}), 404
+    return jsonify({
+        'status': deletion.status,
+        'rows_deleted': deletion.rows_deleted,
+        'requested_at': deletion.requested_at.isoformat(),
+        'started_at': deletion.started_at.isoformat() if deletion.started_at else None,
+        'finished_at': deletion.finished_at.isoformat() if deletion.finished_at else None,
+    })
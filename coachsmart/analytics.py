@@ -0,0 +1,213 @@
+import statistics
+from array import array
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from sqlalchemy import case, cast, extract, func, literal, select
+
+from columnar import column_batches, csv_chunks, runs
+from .extensions import db
+from .models import Goal, User, UserStats, Workout
+from .security import admin_required
+
+# Coach analytics - cohort reports across all athletes, read in column batches
+bp = Blueprint('analytics', __name__, url_prefix='/admin/analytics')
+
+DIFFICULTIES = ('Easy', 'Medium', 'Hard', 'Intense')
+ADHERENCE_TARGET = 3  # workouts in a week for it to count as adherent
+DEFAULT_WEEKS = 12
+MAX_WEEKS = 104
+BATCH_SIZE = 10000
+
+UserMetrics = namedtuple('UserMetrics', [
+    'user_id', 'username', 'cohort', 'level', 'total_points', 'current_streak',
+    'workouts', 'avg_weekly_minutes', 'adherence', 'easy_share', 'medium_share', 'hard_share', 'intense_share',
+    'points_per_week', 'points_velocity', 'active_goals', 'goals_completed',
+])
+CohortMetrics = namedtuple('CohortMetrics', [
+    'cohort', 'users', 'active_users', 'median_weekly_minutes', 'mean_adherence',
+    'easy_share', 'medium_share', 'hard_share', 'intense_share',
+    'median_points_per_week', 'mean_points_velocity', 'goals_completed',
+])
+
+# Whole weeks between a timestamp and the start of the report window, per dialect
+WEEK_INDEX = {
+    'sqlite': lambda column, start: cast((func.julianday(column) - func.julianday(literal(start))) / 7, db.Integer),
+    'postgresql': lambda column, start: cast(func.floor(extract('epoch', column - literal(start)) / 604800), db.Integer),
+}
+
+
+def _week_index(dialect, column, start):
+    try:
+        return WEEK_INDEX[dialect](column, start)
+    except KeyError:
+        raise NotImplementedError(f'Analytics are not supported on {dialect}')
+
+
+# Queries - grouped in SQL, ordered by user so the two streams can be merged
+def weekly_workouts_query(dialect, start, end):
+    week = _week_index(dialect, Workout.completed_at, start)
+    return (select(Workout.user_id, week.label('week'), func.count().label('workouts'),
+                   func.sum(Workout.duration_minutes).label('minutes'),
+                   func.sum(Workout.points_earned).label('points'),
+                   *[func.sum(case((Workout.difficulty == difficulty, 1), else_=0)).label(difficulty.lower())
+                     for difficulty in DIFFICULTIES])
+            .where(Workout.completed_at >= start, Workout.completed_at < end)
+            .group_by(Workout.user_id, week)
+            .order_by(Workout.user_id, week))
+
+
+def users_query(start):
+    goals = (select(Goal.user_id,
+                    func.count().filter(Goal.is_active == True, Goal.is_completed == False).label('active_goals'),
+                    func.count().filter(Goal.is_completed == True, Goal.completed_at >= start).label('goals_completed'))
+             .group_by(Goal.user_id).subquery())
+    return (select(User.id, User.username, User.created_at, UserStats.level, UserStats.total_points,
+                   UserStats.current_streak, goals.c.active_goals, goals.c.goals_completed)
+            .outerjoin(UserStats, UserStats.user_id == User.id)
+            .outerjoin(goals, goals.c.user_id == User.id)
+            .where(User.is_admin == False)
+            .order_by(User.id))
+
+
+# Metrics
+def _ratio(part, whole):
+    return round(part / whole, 4) if whole else 0.0
+
+
+def _user_metrics(user, weekly, weeks):
+    """One user's metrics from their per-week columns (None when they have no workouts in the window)."""
+    user_id, username, created_at, level, total_points, streak, active_goals, goals_completed = user
+    cohort = created_at.strftime('%Y-%m') if created_at else 'unknown'
+    if weekly is None:
+        return UserMetrics(user_id, username, cohort, level or 1, total_points or 0, streak or 0,
+                           0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, active_goals or 0, goals_completed or 0)
+
+    workouts = sum(weekly['workouts'])
+    points = weekly['points']
+    half = weeks // 2
+    recent = sum(p for week, p in zip(weekly['week'], points) if week >= half)
+    earlier = sum(points) - recent
+    # Change in weekly points between the first and second half of the window
+    velocity = recent / (weeks - half) - (earlier / half if half else 0.0)
+    return UserMetrics(
+        user_id, username, cohort, level or 1, total_points or 0, streak or 0,
+        workouts,
+        round(sum(weekly['minutes']) / weeks, 2),
+        _ratio(sum(1 for count in weekly['workouts'] if count >= ADHERENCE_TARGET), weeks),
+        *[_ratio(sum(weekly[difficulty.lower()]), workouts) for difficulty in DIFFICULTIES],
+        round(sum(points) / weeks, 2),
+        round(velocity, 2),
+        active_goals or 0, goals_completed or 0,
+    )
+
+
+def user_metrics(connection, weeks=DEFAULT_WEEKS, now=None, batch_size=BATCH_SIZE):
+    """Yield UserMetrics for every athlete over the last ``weeks`` weeks, in user id order.
+
+    Workouts are aggregated per user and week in SQL and read back as column
+    batches alongside the users; neither table is loaded whole.
+    """
+    end = now or datetime.utcnow()
+    start = end - timedelta(weeks=weeks)
+    dialect = connection.dialect.name
+    weekly = runs(column_batches(connection, weekly_workouts_query(dialect, start, end),
+                                 ['q'] * (5 + len(DIFFICULTIES)), batch_size), 'user_id')
+    # A second connection, so the two cursors stream side by side
+    with connection.engine.connect() as users_connection:
+        next_run = next(weekly, None)
+        for batch in column_batches(users_connection, users_query(start),
+                                    ['q', None, None, 'q', 'q', 'q', 'q', 'q'], batch_size):
+            for user in zip(*batch.values()):
+                while next_run is not None and next_run[0] < user[0]:
+                    next_run = next(weekly, None)
+                own = next_run[1] if next_run is not None and next_run[0] == user[0] else None
+                yield _user_metrics(user, own, weeks)
+
+
+class Cohorts:
+    """Folds UserMetrics into per-signup-month cohort figures."""
+
+    def __init__(self):
+        self.cohorts = {}
+
+    def add(self, metrics):
+        cohort = self.cohorts.get(metrics.cohort)
+        if cohort is None:
+            cohort = self.cohorts[metrics.cohort] = {
+                'users': 0, 'active_users': 0, 'weekly_minutes': array('d'), 'adherence': array('d'),
+                'points_per_week': array('d'), 'points_velocity': array('d'),
+                'workouts': 0, 'difficulty': [0.0] * len(DIFFICULTIES), 'goals_completed': 0,
+            }
+        cohort['users'] += 1
+        cohort['goals_completed'] += metrics.goals_completed
+        cohort['weekly_minutes'].append(metrics.avg_weekly_minutes)
+        cohort['adherence'].append(metrics.adherence)
+        cohort['points_per_week'].append(metrics.points_per_week)
+        cohort['points_velocity'].append(metrics.points_velocity)
+        if metrics.workouts:
+            cohort['active_users'] += 1
+            cohort['workouts'] += metrics.workouts
+            shares = (metrics.easy_share, metrics.medium_share, metrics.hard_share, metrics.intense_share)
+            for index, share in enumerate(shares):
+                cohort['difficulty'][index] += share * metrics.workouts
+        return metrics
+
+    def rows(self):
+        for name, cohort in sorted(self.cohorts.items()):
+            yield CohortMetrics(
+                name, cohort['users'], cohort['active_users'],
+                round(statistics.median(cohort['weekly_minutes']), 2),
+                round(statistics.fmean(cohort['adherence']), 4),
+                *[_ratio(count, cohort['workouts']) for count in cohort['difficulty']],
+                round(statistics.median(cohort['points_per_week']), 2),
+                round(statistics.fmean(cohort['points_velocity']), 2),
+                cohort['goals_completed'],
+            )
+
+
+def cohort_metrics(connection, weeks=DEFAULT_WEEKS, now=None):
+    cohorts = Cohorts()
+    for metrics in user_metrics(connection, weeks, now):
+        cohorts.add(metrics)
+    return list(cohorts.rows())
+
+
+# Routes
+def _csv_response(filename, fields, rows):
+    return Response(stream_with_context(csv_chunks(fields, rows)), mimetype='text/csv',
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+
+def _weeks_arg():
+    weeks = request.args.get('weeks', DEFAULT_WEEKS, type=int)
+    if weeks is None or not 1 <= weeks <= MAX_WEEKS:
+        return None
+    return weeks
+
+
+@bp.route('/users.csv')
+@admin_required
+def users_csv():
+    weeks = _weeks_arg()
+    if weeks is None:
+        return jsonify({'error': f'weeks must be between 1 and {MAX_WEEKS}'}), 400
+
+    def rows():
+        with db.engine.connect() as connection:
+            yield from user_metrics(connection, weeks)
+
+    return _csv_response(f'athletes-{weeks}w.csv', UserMetrics._fields, rows())
+
+
+@bp.route('/cohorts.csv')
+@admin_required
+def cohorts_csv():
+    weeks = _weeks_arg()
+    if weeks is None:
+        return jsonify({'error': f'weeks must be between 1 and {MAX_WEEKS}'}), 400
+
+    with db.engine.connect() as connection:
+        rows = cohort_metrics(connection, weeks)
+    return _csv_response(f'cohorts-{weeks}w.csv', CohortMetrics._fields, rows)
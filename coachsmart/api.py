@@ -0,0 +1,182 @@
+from functools import wraps
+
+from flask import Blueprint, jsonify, request, session
+
+from query_stats import query_budget
+from read_api import ApiError, conditional_json, decode_cursor, encode_cursor, parse_fields, parse_limit, row_to_dict
+from .challenges import gold_medal_criteria
+from .extensions import db
+from .models import Activity, Challenge, CustomWorkout, Goal, UserChallenge, UserStats
+
+# Read API (v1) - read-only JSON for the mobile client
+bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+# Each resource maps public field names to columns; only requested columns are selected.
+API_STATS_FIELDS = {
+    'current_streak': UserStats.current_streak,
+    'total_workouts': UserStats.total_workouts,
+    'total_time_minutes': UserStats.total_time_minutes,
+    'total_points': UserStats.total_points,
+    'level': UserStats.level,
+    'challenges_completed': UserStats.challenges_completed,
+    'gold_medals': UserStats.gold_medals,
+    'updated_at': UserStats.updated_at,
+}
+API_STATS_DEFAULTS = {
+    'current_streak': 0,
+    'total_workouts': 0,
+    'total_time_minutes': 0,
+    'total_points': 0,
+    'level': 1,
+    'challenges_completed': 0,
+    'gold_medals': 0,
+    'updated_at': None,
+}
+API_ACTIVITY_FIELDS = {
+    'id': Activity.id,
+    'activity_type': Activity.activity_type,
+    'title': Activity.title,
+    'description': Activity.description,
+    'points_earned': Activity.points_earned,
+    'created_at': Activity.created_at,
+}
+API_CHALLENGE_FIELDS = {
+    'id': UserChallenge.id,
+    'challenge_id': UserChallenge.challenge_id,
+    'name': Challenge.name,
+    'description': Challenge.description,
+    'challenge_type': Challenge.challenge_type,
+    'target_value': Challenge.target_value,
+    'points_reward': Challenge.points_reward,
+    'badge_name': Challenge.badge_name,
+    'current_progress': UserChallenge.current_progress,
+    'is_completed': UserChallenge.is_completed,
+    'started_at': UserChallenge.started_at,
+    'completed_at': UserChallenge.completed_at,
+}
+API_BADGE_FIELDS = {
+    'id': UserChallenge.id,
+    'challenge_id': UserChallenge.challenge_id,
+    'name': Challenge.name,
+    'badge_name': Challenge.badge_name,
+    'points_reward': Challenge.points_reward,
+    'gold_medal': gold_medal_criteria(),
+    'completed_at': UserChallenge.completed_at,
+}
+API_GOAL_FIELDS = {
+    'id': Goal.id,
+    'title': Goal.title,
+    'description': Goal.description,
+    'goal_type': Goal.goal_type,
+    'target_value': Goal.target_value,
+    'current_value': Goal.current_value,
+    'unit': Goal.unit,
+    'target_date': Goal.target_date,
+    'is_completed': Goal.is_completed,
+    'is_active': Goal.is_active,
+    'created_at': Goal.created_at,
+    'completed_at': Goal.completed_at,
+}
+API_CUSTOM_WORKOUT_FIELDS = {
+    'id': CustomWorkout.id,
+    'name': CustomWorkout.name,
+    'duration_minutes': CustomWorkout.duration_minutes,
+    'difficulty': CustomWorkout.difficulty,
+    'workout_type': CustomWorkout.workout_type,
+    'exercises': CustomWorkout.exercises,
+    'description': CustomWorkout.description,
+    'created_at': CustomWorkout.created_at,
+}
+
+def api_login_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user_id' not in session:
+            return jsonify({'error': 'Unauthorized'}), 401
+        return f(*args, **kwargs)
+    return decorated_function
+
+def api_page(columns, id_column, *criteria, select_from=None):
+    """One keyset-paginated page (newest first) of the requested fields, as plain dicts."""
+    fields = parse_fields(columns)
+    limit = parse_limit()
+    last_id = decode_cursor(request.args.get('cursor'))
+
+    # The id is always selected (last column) to build the next cursor
+    stmt = db.select(*[columns[name] for name in fields], id_column).where(*criteria)
+    if select_from is not None:
+        stmt = stmt.select_from(select_from)
+    if last_id is not None:
+        stmt = stmt.where(id_column < last_id)
+    rows = db.session.execute(stmt.order_by(id_column.desc()).limit(limit + 1)).all()
+
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1][-1]) if len(rows) > limit else None
+    return conditional_json({
+        'data': [row_to_dict(row, fields) for row in page],
+        'next_cursor': next_cursor
+    })
+
+def status_criteria(model):
+    status = request.args.get('status')
+    if status == 'active':
+        return [model.is_completed == False]
+    if status == 'completed':
+        return [model.is_completed == True]
+    if status:
+        raise ApiError('status must be "active" or "completed"')
+    return []
+
+@bp.route('/stats')
+@api_login_required
+@query_budget(1)
+def api_stats():
+    fields = parse_fields(API_STATS_FIELDS)
+    row = db.session.execute(
+        db.select(*[API_STATS_FIELDS[name] for name in fields]).where(UserStats.user_id == session['user_id'])
+    ).first()
+    # Read-only: a missing stats row is reported as defaults rather than created
+    data = row_to_dict(row, fields) if row else {name: API_STATS_DEFAULTS[name] for name in fields}
+    return conditional_json({'data': data})
+
+@bp.route('/activities')
+@api_login_required
+@query_budget(1)
+def api_activities():
+    criteria = [Activity.user_id == session['user_id']]
+    if request.args.get('type'):
+        criteria.append(Activity.activity_type == request.args['type'])
+    return api_page(API_ACTIVITY_FIELDS, Activity.id, *criteria)
+
+@bp.route('/challenges')
+@api_login_required
+@query_budget(1)
+def api_challenges():
+    return api_page(API_CHALLENGE_FIELDS, UserChallenge.id,
+                    UserChallenge.user_id == session['user_id'], *status_criteria(UserChallenge),
+                    select_from=UserChallenge.__table__.join(Challenge.__table__))
+
+@bp.route('/badges')
+@api_login_required
+@query_budget(1)
+def api_badges():
+    # Badge cabinet: every completed challenge, newest enrollment first; totals are in /stats
+    return api_page(API_BADGE_FIELDS, UserChallenge.id,
+                    UserChallenge.user_id == session['user_id'], UserChallenge.is_completed == True,
+                    select_from=UserChallenge.__table__.join(Challenge.__table__))
+
+@bp.route('/goals')
+@api_login_required
+@query_budget(1)
+def api_goals():
+    return api_page(API_GOAL_FIELDS, Goal.id, Goal.user_id == session['user_id'], *status_criteria(Goal))
+
+@bp.route('/custom-workouts')
+@api_login_required
+@query_budget(1)
+def api_custom_workouts():
+    return api_page(API_CUSTOM_WORKOUT_FIELDS, CustomWorkout.id, CustomWorkout.user_id == session['user_id'])
+
+@bp.errorhandler(ApiError)
+def handle_api_error(error):
+    return jsonify({'error': error.message}), error.status_code
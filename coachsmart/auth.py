@@ -0,0 +1,113 @@
+from datetime import datetime
+
+from flask import Blueprint, flash, redirect, request, session, url_for
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from localtime import is_valid_zone
+from .extensions import db
+from .features import enabled
+from .models import User, UserStats
+from .security import security_logger
+
+bp = Blueprint('auth', __name__)
+
+
+def browser_timezone():
+    """The IANA time zone the sign-up/sign-in form reported, or None if missing or unknown."""
+    name = request.form.get('timezone')
+    return name if name and is_valid_zone(name) else None
+
+# Authentication Routes
+@bp.route('/signup', methods=['GET', 'POST'])
+def signup():
+    if request.method == 'POST':
+        username = request.form.get('username')
+        email = request.form.get('email')
+        password = request.form.get('password')
+        confirm_password = request.form.get('confirm_password')
+        
+        # Basic validation
+        if not all([username, email, password, confirm_password]):
+            flash('All fields are required.', 'error')
+            return redirect(url_for('pages.get_started'))
+            
+        if password != confirm_password:
+            flash('Passwords do not match.', 'error')
+            return redirect(url_for('pages.get_started'))
+            
+        # Check if user already exists
+        if User.query.filter_by(email=email).first():
+            flash('Email already registered.', 'error')
+            return redirect(url_for('pages.get_started'))
+            
+        # Create new user
+        try:
+            hashed_password = generate_password_hash(password, method='pbkdf2:sha256')
+            new_user = User(username=username, email=email, password_hash=hashed_password,
+                            timezone=browser_timezone())
+            db.session.add(new_user)
+            db.session.commit()
+            
+            # Initialize user stats
+            if enabled('training'):
+                db.session.add(UserStats(user_id=new_user.id))
+                db.session.commit()
+            
+            # Log the user in with secure session
+            session['user_id'] = new_user.id
+            session['username'] = new_user.username
+            session['is_admin'] = new_user.is_admin
+            session['timezone'] = new_user.timezone
+            session.permanent = True
+            flash('Account created successfully!', 'success')
+            return redirect(url_for('pages.dashboard'))
+            
+        except Exception as e:
+            db.session.rollback()
+            flash('An error occurred. Please try again.', 'error')
+            return redirect(url_for('pages.get_started'))
+    
+    return redirect(url_for('pages.get_started'))
+
+@bp.route('/signin', methods=['POST'])
+def signin():
+    if request.method == 'POST':
+        email = request.form.get('email')
+        password = request.form.get('password')
+        
+        if not all([email, password]):
+            flash('Please enter both email and password.', 'error')
+            return redirect(url_for('pages.get_started'))
+            
+        user = User.query.filter_by(email=email).first()
+        
+        if user and check_password_hash(user.password_hash, password):
+            # Update last login, and the time zone if the user is on a device set to another one
+            user.last_login = datetime.utcnow()
+            user.timezone = browser_timezone() or user.timezone
+            db.session.commit()
+            
+            # Log successful login
+            security_logger.info(f"SUCCESSFUL_LOGIN: user_id={user.id}, email={email}, ip={request.remote_addr}")
+            
+            # Log the user in with secure session
+            session['user_id'] = user.id
+            session['username'] = user.username
+            session['is_admin'] = user.is_admin
+            session['timezone'] = user.timezone
+            session.permanent = True
+            flash('Logged in successfully!', 'success')
+            return redirect(url_for('pages.dashboard'))
+        else:
+            # Log failed login attempt
+            security_logger.warning(f"FAILED_LOGIN: email={email}, ip={request.remote_addr}")
+            flash('Invalid email or password.', 'error')
+            return redirect(url_for('pages.get_started'))
+    
+    return redirect(url_for('pages.get_started'))
+
+@bp.route('/logout')
+def logout():
+    session.clear()
+    flash('You have been logged out.', 'info')
+    return redirect(url_for('pages.index'))
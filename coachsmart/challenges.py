@@ -0,0 +1,119 @@
+from flask import Blueprint, flash, redirect, render_template, session, url_for
+
+from dal import insert_or_ignore
+from .current import current_user
+from .events import outbox, publish_event
+from .extensions import db
+from .models import Activity, Challenge, UserChallenge, UserStats
+from .view_models import load_challenges
+
+bp = Blueprint('challenges', __name__)
+
+# Badge Counters - a gold medal is a completed challenge with a gold badge or a high reward
+GOLD_MEDAL_POINTS = 100
+
+def is_gold_medal(challenge):
+    return challenge.badge_name == 'gold' or challenge.points_reward >= GOLD_MEDAL_POINTS
+
+def gold_medal_criteria():
+    """is_gold_medal() as a SQL condition on Challenge."""
+    return db.or_(Challenge.badge_name == 'gold', Challenge.points_reward >= GOLD_MEDAL_POINTS)
+
+def record_challenge_completion(user_id, challenge):
+    """Award a completed challenge's points and bump the badge counters (atomic increments); the caller commits."""
+    db.session.execute(
+        db.update(UserStats).where(UserStats.user_id == user_id).values(
+            total_points=UserStats.total_points + challenge.points_reward,
+            challenges_completed=UserStats.challenges_completed + 1,
+            gold_medals=UserStats.gold_medals + int(is_gold_medal(challenge)),
+        ).execution_options(synchronize_session=False)
+    )
+
+def backfill_badge_counters(batch_size=5000):
+    """Recompute every user's badge counters from their completed challenges. Returns rows updated.
+
+    Runs one correlated UPDATE per batch of stats rows, committing in between
+    so the write lock is never held for long.
+    """
+    completed = db.select(db.func.count()).select_from(UserChallenge).where(
+        UserChallenge.user_id == UserStats.user_id, UserChallenge.is_completed == True)
+    gold = completed.join(Challenge, Challenge.id == UserChallenge.challenge_id).where(gold_medal_criteria())
+    updated = 0
+    last_id = 0
+    while True:
+        ids = db.session.execute(db.select(UserStats.id).where(UserStats.id > last_id)
+                                 .order_by(UserStats.id).limit(batch_size)).scalars().all()
+        if not ids:
+            return updated
+        updated += db.session.execute(db.update(UserStats).where(UserStats.id.between(ids[0], ids[-1])).values(
+            challenges_completed=completed.scalar_subquery(), gold_medals=gold.scalar_subquery()
+        )).rowcount
+        db.session.commit()
+        last_id = ids[-1]
+
+@bp.route('/challenges')
+def challenges():
+    if 'user_id' not in session:
+        flash('Please sign in to view challenges.', 'error')
+        return redirect(url_for('pages.get_started'))
+    
+    user_id = session['user_id']
+    
+    # Stats and every challenge list in one round trip; totals come from the badge counters
+    user_stats, active_challenges, available_challenges, completed_challenges = load_challenges(user_id)
+    
+    return render_template('challenges.html', 
+                         user_stats=user_stats,
+                         active_challenges=active_challenges,
+                         available_challenges=available_challenges,
+                         completed_challenges=completed_challenges,
+                         challenges_completed=user_stats.challenges_completed if user_stats else 0,
+                         gold_medals=user_stats.gold_medals if user_stats else 0)
+
+@bp.route('/join-challenge/<int:challenge_id>', methods=['POST'])
+def join_challenge(challenge_id):
+    if 'user_id' not in session:
+        flash('Please sign in to join challenges.', 'error')
+        return redirect(url_for('pages.get_started'))
+    
+    user_id = session['user_id']
+    
+    try:
+        # Get challenge details for activity
+        challenge = db.session.get(Challenge, challenge_id)
+        if not challenge:
+            flash('Challenge not found.', 'error')
+            return redirect(url_for('challenges.challenges'))
+        
+        # Create user challenge unless already joined (atomic, safe against double submits)
+        if challenge_id in current_user().joined_challenge_ids() or not insert_or_ignore(db.session, UserChallenge.__table__,
+                                {'user_id': user_id, 'challenge_id': challenge_id},
+                                index_elements=['user_id', 'challenge_id']):
+            db.session.rollback()
+            flash('You have already joined this challenge!', 'info')
+            return redirect(url_for('challenges.challenges'))
+        
+        publish_event('challenge_joined', user_id=user_id, challenge_id=challenge_id)
+        db.session.commit()
+        current_user().forget('joined_challenge_ids')
+        flash(f'🎯 Successfully joined: {challenge.name}!', 'success')
+        
+    except Exception as e:
+        db.session.rollback()
+        flash('An error occurred. Please try again.', 'error')
+    
+    return redirect(url_for('challenges.challenges'))
+
+# Outbox Handlers - derived state applied by the outbox worker, in its transaction
+@outbox.handler('challenge_joined')
+def apply_challenge_joined(user_id, challenge_id):
+    challenge = db.session.get(Challenge, challenge_id)
+    if challenge is None:
+        return
+    db.session.add(Activity(
+        user_id=user_id,
+        activity_type='challenge',
+        title=f'🎯 Joined Challenge: {challenge.name}',
+        description=challenge.description,
+        points_earned=0
+    ))
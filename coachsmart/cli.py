@@ -0,0 +1,789 @@
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import click
+from flask import Blueprint, current_app
+
+from dal import add_missing_columns, blocking_duplicates, create_missing_indexes, remove_duplicates, upsert
+from .events import contact_queue, idempotency_keys, outbox
+from .extensions import db, search_backend
+from .features import enabled_doc_types, enabled_fixtures, validate
+from .models import (SEARCH_DOCUMENTS, AccountDeletion, Activity, ActivitySummary, Challenge, CustomWorkout, Goal,
+                     MuscleGroup, User, UserChallenge, UserProgress, UserStats, Workout)
+
+# Commands are registered at the top level (`flask init-db`, not `flask commands init-db`).
+# Heavy helpers (benchmarks, seeding, retention) are imported inside the commands that use
+# them, so web workers and `flask --help` don't pay for them.
+bp = Blueprint('commands', __name__, cli_group=None)
+
+
+# Create tables
+# Tables whose indexes were declared after databases already existed
+INDEXED_TABLES = [UserStats, UserChallenge, Goal, Challenge, UserProgress, MuscleGroup, Workout, Activity, CustomWorkout,
+                  AccountDeletion]
+
+
+def create_tables():
+    """Create missing tables, columns and indexes. Returns {index name: duplicate rows} for unique indexes left out."""
+    db.create_all()
+    # create_all() skips existing tables, so columns and indexes declared since are added here
+    add_missing_columns(db.session, UserStats.__table__)
+    add_missing_columns(db.session, User.__table__)
+    blocked = {}
+    for model in INDEXED_TABLES:
+        blocked.update(create_missing_indexes(db.session, model.__table__))
+    with db.engine.begin() as connection:
+        search_backend().create_schema(connection)
+    return blocked
+
+def apply_fixtures(names):
+    """Upsert the named fixtures in one transaction. Returns {name: affected rows}."""
+    from seeding import load_fixture, seed_fixtures
+
+    seeded_tables = {load_fixture(name)['table'] for name in names}
+    with db.engine.begin() as connection:
+        applied = seed_fixtures(connection, db.metadata, names)
+        # Core inserts bypass the mapper events that keep the search index in sync
+        for doc_type, (model, document) in SEARCH_DOCUMENTS.items():
+            if model.__table__.name in seeded_tables:
+                search_backend().rebuild(connection, [document(row) for row in connection.execute(model.__table__.select())],
+                                         doc_types=[doc_type])
+    return applied
+
+@contextmanager
+def scratch_app(**config):
+    """A copy of the current app on a temporary SQLite database with the default fixtures, for stress tests and reports."""
+    import os
+    import tempfile
+    from . import create_app
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app(dict(config, FEATURES=current_app.config['FEATURES'], OUTBOX_WORKER=False,
+                              CONTACT_WORKER=False, SECRET_KEY=current_app.config['SECRET_KEY'],
+                              SQLALCHEMY_DATABASE_URI=f'sqlite:///{os.path.join(directory, "scratch.db")}'))
+        with app.app_context():
+            create_tables()
+            apply_fixtures(enabled_fixtures())
+            try:
+                yield app
+            finally:
+                db.session.remove()
+                db.engine.dispose()
+
+def add_sample_account(username, size):
+    """Add a user with ``size`` rows in every per-user table. Returns its id."""
+    user = User(username=username, email=f'{username}@coachsmart.invalid', password_hash='!')
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(UserStats(user_id=user.id))
+    for i in range(size):
+        db.session.add(Workout(user_id=user.id, workout_type='Cardio', duration_minutes=30, difficulty='Medium', points_earned=90))
+        db.session.add(Activity(user_id=user.id, activity_type='workout', title=f'Workout {i}', points_earned=90))
+        db.session.add(Goal(user_id=user.id, title=f'Goal {i}', goal_type='endurance', target_value=10, unit='workouts',
+                            is_completed=i % 2 == 0, completed_at=datetime.utcnow() if i % 2 == 0 else None))
+        db.session.add(CustomWorkout(user_id=user.id, name=f'Workout plan {i}', duration_minutes=30, difficulty='Easy',
+                                     workout_type='Cardio', exercises='["Run"]', description='Easy workout'))
+    for challenge in Challenge.query.order_by(Challenge.id).limit(size):
+        db.session.add(UserChallenge(user_id=user.id, challenge_id=challenge.id, is_completed=challenge.id % 2 == 0))
+    db.session.commit()
+    return user.id
+
+# Flask CLI command to initialize database
+@bp.cli.command('init-db')
+def init_db_command():
+    """Initialize the database."""
+    blocked = create_tables()
+    if blocked:
+        # Fixtures are upserted against these indexes, and deleting rows is left to an explicit step
+        details = ', '.join(f'{name} ({count} rows)' for name, count in blocked.items())
+        raise click.ClickException(f'Duplicate rows block unique indexes: {details}. Back up the database, review them '
+                                   f'with `flask remove-duplicates --dry-run`, then run `flask remove-duplicates`.')
+    
+    # Default data of the enabled features comes from fixtures/ and is upserted on every run
+    for name, count in apply_fixtures(enabled_fixtures()).items():
+        print(f'Fixture {name} seeded ({count} rows).')
+    
+    # Earlier versions seeded an admin account with a published password
+    from werkzeug.security import check_password_hash
+    for admin in User.query.filter_by(is_admin=True).all():
+        if admin.password_hash and check_password_hash(admin.password_hash, 'admin123'):
+            print(f'WARNING: admin {admin.username} still has the old default password; '
+                  f'reset it with `flask create-admin {admin.username}`.')
+    print('Database initialized.')
+
+@bp.cli.command('remove-duplicates')
+@click.option('--dry-run', is_flag=True, help='List the rows that would be removed without deleting them.')
+def remove_duplicates_command(dry_run):
+    """Delete rows that block a unique index (databases from before it existed), then build the indexes.
+
+    The oldest row per key is kept. Rows whose foreign keys cascade from a
+    removed row are deleted with it, so back up the database first.
+    """
+    create_tables()
+    find = blocking_duplicates if dry_run else remove_duplicates
+    removed = {}
+    for model in INDEXED_TABLES:
+        for name, ids in find(db.session, model.__table__).items():
+            print(f'{model.__tablename__}: {len(ids)} duplicate rows for {name}, ids {ids}')
+            removed[name] = ids
+    count = sum(len(ids) for ids in removed.values())
+    if dry_run:
+        print(f'Dry run: {count} rows would be removed.')
+        return
+    db.session.commit()
+    create_tables()
+    print(f'Removed {count} duplicate rows and built {len(removed)} unique indexes.')
+
+@bp.cli.command('search-reindex')
+def search_reindex_command():
+    """Rebuild the full-text search index from the database."""
+    create_tables()
+    print(f'Search index rebuilt with {rebuild_search_index()} documents.')
+
+def rebuild_search_index():
+    """Re-index the enabled features' document types, streaming rows. Returns the number of documents."""
+    doc_types = enabled_doc_types()
+    indexed = 0
+    def documents():
+        nonlocal indexed
+        for doc_type in doc_types:
+            model, document = SEARCH_DOCUMENTS[doc_type]
+            for row in model.query.yield_per(1000):
+                indexed += 1
+                yield document(row)
+    search_backend().rebuild(db.session.connection(), documents(), doc_types=doc_types)
+    db.session.commit()
+    return indexed
+
+@bp.cli.command('backfill-badges')
+@click.option('--batch-size', default=5000, help='Stats rows updated per transaction.')
+def backfill_badges_command(batch_size):
+    """Recompute challenges_completed and gold_medals for every user from completed challenges."""
+    from .challenges import backfill_badge_counters
+
+    create_tables()
+    print(f'Badge counters recomputed for {backfill_badge_counters(batch_size)} users.')
+
+@bp.cli.command('analytics-export')
+@click.option('--weeks', default=12, help='Length of the report window in weeks.')
+@click.option('--output-dir', type=click.Path(file_okay=False), help='Where to write the CSV files (default instance/analytics).')
+def analytics_export_command(weeks, output_dir):
+    """Write per-athlete and per-cohort training metrics as CSV files for coaches."""
+    import os
+    from columnar import csv_chunks
+    from .analytics import Cohorts, CohortMetrics, UserMetrics, user_metrics
+
+    output_dir = output_dir or os.path.join(current_app.instance_path, 'analytics')
+    os.makedirs(output_dir, exist_ok=True)
+    started = time.perf_counter()
+    cohorts = Cohorts()
+    users_path = os.path.join(output_dir, f'athletes-{weeks}w.csv')
+    # One pass: each athlete row is written and folded into its cohort as it streams
+    with db.engine.connect() as connection, open(users_path, 'w', newline='') as out:
+        for chunk in csv_chunks(UserMetrics._fields, (cohorts.add(metrics) for metrics in user_metrics(connection, weeks))):
+            out.write(chunk)
+    cohorts_path = os.path.join(output_dir, f'cohorts-{weeks}w.csv')
+    with open(cohorts_path, 'w', newline='') as out:
+        out.writelines(csv_chunks(CohortMetrics._fields, cohorts.rows()))
+
+    athletes = sum(cohort['users'] for cohort in cohorts.cohorts.values())
+    print(f'{athletes} athletes in {len(cohorts.cohorts)} cohorts over {weeks} weeks '
+          f'({time.perf_counter() - started:.2f}s).')
+    print(f'Wrote {users_path}')
+    print(f'Wrote {cohorts_path}')
+
+def find_user(account):
+    """The user with this id, username or email, or a CLI error."""
+    user = User.query.filter(db.or_(User.username == account, User.email == account,
+                                    User.id == (int(account) if account.isdigit() else None))).first()
+    if user is None:
+        raise click.ClickException(f'No user {account}')
+    return user
+
+@bp.cli.command('create-admin')
+@click.argument('username')
+@click.option('--email', help='Email address for a new account (default <username>@coachsmart.local).')
+@click.password_option(envvar='COACHSMART_ADMIN_PASSWORD', help='Password; read from COACHSMART_ADMIN_PASSWORD or prompted for.')
+def create_admin_command(username, email, password):
+    """Create an admin account, or make an existing account an admin and set its password."""
+    from werkzeug.security import generate_password_hash
+
+    if len(password) < 12:
+        raise click.ClickException('Admin passwords must be at least 12 characters.')
+    create_tables()
+    user = User.query.filter_by(username=username).first()
+    if user is None:
+        user = User(username=username, email=email or f'{username}@coachsmart.local')
+        db.session.add(user)
+    user.password_hash = generate_password_hash(password, method='pbkdf2:sha256')
+    user.is_admin = True
+    db.session.commit()
+    print(f'{username} (id {user.id}) is an admin.')
+
+@bp.cli.command('export-user')
+@click.argument('account')
+@click.option('--format', 'fmt', type=click.Choice(['ndjson', 'zip']), default='ndjson', show_default=True)
+@click.option('--output', type=click.Path(dir_okay=False), help='File to write (default instance/exports/<user>.<format>).')
+def export_user_command(account, fmt, output):
+    """Export all personal data of a user (id, username or email) for a data access request."""
+    import os
+    from .account import export_account
+
+    user = find_user(account)
+    output = output or os.path.join(current_app.instance_path, 'exports', f'{user.username}.{fmt}')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    started = time.perf_counter()
+    with open(output, 'wb') as out:
+        for chunk in export_account(db.engine, user.id, fmt):
+            out.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+    print(f'Exported user {user.id} to {output} ({os.path.getsize(output) / 1e6:.1f} MB, '
+          f'{time.perf_counter() - started:.1f}s).')
+
+@bp.cli.command('export-memcheck')
+@click.option('--activities', 'sizes', multiple=True, type=int, default=[10000, 100000, 1000000], show_default=True,
+              help='Activity rows of each test account (repeatable).')
+@click.option('--tolerance', default=0.5, help='Allowed relative growth of peak memory from the smallest to the largest account.')
+def export_memcheck_command(sizes, tolerance):
+    """Check that account exports stream in constant memory, on accounts of growing size."""
+    import os
+    import tempfile
+    from sqlalchemy import create_engine
+    from benchmark import peak_memory
+    from .account import export_account
+
+    sizes = sorted(sizes)
+    # A scratch database, so the app's own data is never touched
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f'sqlite:///{os.path.join(directory, "export.db")}')
+        db.metadata.create_all(engine)
+        now = datetime.utcnow()
+        with engine.begin() as connection:
+            for user_id, size in enumerate(sizes, 1):
+                connection.execute(User.__table__.insert(), {'id': user_id, 'username': f'export{user_id}',
+                                                             'email': f'export{user_id}@example.com', 'password_hash': '-'})
+                for start in range(0, size, 10000):
+                    connection.execute(Activity.__table__.insert(), [
+                        {'user_id': user_id, 'activity_type': 'workout', 'title': f'Workout {i}',
+                         'description': '30 minutes of Cardio', 'points_earned': 90, 'created_at': now - timedelta(minutes=i)}
+                        for i in range(start, min(start + 10000, size))
+                    ])
+        results = {}
+        print(f'{"activities":>12}  {"format":<8}{"MB":>9}{"seconds":>9}{"peak KiB":>10}')
+        for user_id, size in enumerate(sizes, 1):
+            for fmt in ('ndjson', 'zip'):
+                result = results[size, fmt] = peak_memory(export_account(engine, user_id, fmt))
+                print(f'{size:>12}  {fmt:<8}{result["size"] / 1e6:>9.1f}{result["ms"] / 1000:>9.1f}{result["peak_kib"]:>10}')
+        engine.dispose()
+
+    for fmt in ('ndjson', 'zip'):
+        smallest, largest = results[sizes[0], fmt]['peak_kib'], results[sizes[-1], fmt]['peak_kib']
+        if largest > smallest * (1 + tolerance):
+            raise click.ClickException(f'{fmt} export memory grows with account size: {smallest} KiB -> {largest} KiB')
+    print('Export memory is flat across account sizes.')
+
+@bp.cli.command('delete-account')
+@click.argument('account')
+@click.option('--queue-only', is_flag=True, help='Only queue the deletion; the outbox worker removes the rows.')
+@click.option('--yes', is_flag=True, help='Do not ask for confirmation.')
+def delete_account_command(account, queue_only, yes):
+    """Delete a user (id, username or email) and all their data in chunked transactions."""
+    from .account import request_account_deletion
+
+    create_tables()
+    user = find_user(account)
+    if not yes:
+        click.confirm(f'Permanently delete user {user.id} ({user.email}) and all their data?', abort=True)
+    # This command (or a `flask outbox-work` process) applies the chunks, not a thread that dies with it
+    current_app.config['OUTBOX_WORKER'] = False
+    deletion = request_account_deletion(user)
+    db.session.commit()
+    print(f'Deletion {deletion.token} queued.')
+    if queue_only:
+        return
+
+    # Apply the chunks here, timing each transaction (the longest is how long writers can be blocked)
+    started = time.perf_counter()
+    batches = []
+    while deletion.status != 'done':
+        batch_started = time.perf_counter()
+        if outbox.process_batch(db.session):
+            batches.append((time.perf_counter() - batch_started) * 1000)
+        else:
+            # Another worker holds the next chunk, or it is waiting to be retried
+            time.sleep(0.5)
+        db.session.refresh(deletion)
+    print(f'{deletion.status}: {deletion.rows_deleted} rows deleted in {len(batches)} transactions, '
+          f'{time.perf_counter() - started:.1f}s; longest transaction {max(batches, default=0):.0f} ms.')
+
+@bp.cli.command('search-bench')
+@click.option('--docs', default=1_000_000, help='Number of synthetic documents to index.')
+@click.option('--queries', default=500, help='Number of timed search queries.')
+def search_bench_command(docs, queries):
+    """Benchmark the search backend against a synthetic index."""
+    from search import run_benchmark
+
+    print(json.dumps(run_benchmark(n_docs=docs, n_queries=queries), indent=2))
+
+@bp.cli.command('upsert-stress')
+@click.option('--threads', default=8, help='Number of parallel clients.')
+@click.option('--rounds', default=25, help='Requests per route per client.')
+def upsert_stress_command(threads, rounds):
+    """Hammer the create-or-update routes in parallel on a scratch database and check no duplicate rows appear."""
+    import threading
+
+    with scratch_app() as app:
+        challenge_ids = [c.id for c in Challenge.query.order_by(Challenge.id).limit(5)]
+        # A user without a stats row, so every client races to create it
+        user = User(username='stress', email='stress@coachsmart.invalid', password_hash='!')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+        paths = [('GET', '/dashboard'), ('GET', '/training-plan')] + \
+                [('POST', f'/join-challenge/{challenge_id}') for challenge_id in challenge_ids]
+        failures = []
+
+        def worker():
+            client = app.test_client()
+            with client.session_transaction(base_url='https://localhost') as client_session:
+                client_session['user_id'] = user_id
+                client_session['username'] = 'stress'
+            for _ in range(rounds):
+                for method, path in paths:
+                    response = client.open(path, method=method, base_url='https://localhost')
+                    if response.status_code >= 500:
+                        failures.append(f'{method} {path} -> {response.status_code}')
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        db.session.remove()
+        outbox.drain(db.session())
+        stats_rows = UserStats.query.filter_by(user_id=user_id).count()
+        joined_rows = UserChallenge.query.filter_by(user_id=user_id).count()
+        join_activities = Activity.query.filter_by(user_id=user_id, activity_type='challenge').count()
+
+    print(f'{threads} clients x {rounds} rounds x {len(paths)} routes, {len(failures)} server errors')
+    print(f'user_stats rows: {stats_rows} (expected 1)')
+    print(f'user_challenge rows: {joined_rows} (expected {len(challenge_ids)})')
+    print(f'join activities: {join_activities} (expected {len(challenge_ids)})')
+    if failures or stats_rows != 1 or joined_rows != len(challenge_ids) or join_activities != len(challenge_ids):
+        raise click.ClickException('Duplicate rows or server errors detected.')
+
+@bp.cli.command('idempotency-stress')
+@click.option('--threads', default=8, help='Parallel clients submitting the same form.')
+@click.option('--rounds', default=10, help='Distinct submissions, each sent by every client.')
+def idempotency_stress_command(threads, rounds):
+    """Submit each workout from many clients at once with one key, on a scratch database, and check it is applied once."""
+    import threading
+    import uuid
+
+    with scratch_app() as app:
+        user = User(username='stress', email='stress@coachsmart.invalid', password_hash='!')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+        responses = []
+        failures = []
+
+        def worker(key, barrier):
+            client = app.test_client()
+            with client.session_transaction(base_url='https://localhost') as client_session:
+                client_session['user_id'] = user_id
+            barrier.wait()
+            started = time.perf_counter()
+            response = client.post('/complete-workout', base_url='https://localhost', data={
+                'workout_type': 'Cardio', 'duration': 30, 'difficulty': 'Medium', 'idempotency_key': key})
+            elapsed = (time.perf_counter() - started) * 1000
+            if response.status_code != 302:
+                failures.append(response.status_code)
+            responses.append((response.headers.get('Idempotent-Replayed') == 'true', elapsed))
+
+        for _ in range(rounds):
+            key = uuid.uuid4().hex
+            barrier = threading.Barrier(threads)
+            workers = [threading.Thread(target=worker, args=(key, barrier)) for _ in range(threads)]
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+
+        db.session.remove()
+        outbox.drain(db.session())
+        workouts = Workout.query.filter_by(user_id=user_id).count()
+        stats = UserStats.query.filter_by(user_id=user_id).first()
+        total_workouts = stats.total_workouts if stats else 0
+
+    first = sorted(ms for replayed, ms in responses if not replayed)
+    replays = sorted(ms for replayed, ms in responses if replayed)
+    print(f'{threads} clients x {rounds} submissions, {len(failures)} unexpected responses')
+    print(f'workout rows: {workouts} (expected {rounds}), stats total_workouts: {total_workouts}')
+    if first and replays:
+        print(f'first submission median {first[len(first) // 2]:.1f} ms, '
+              f'replay median {replays[len(replays) // 2]:.1f} ms ({len(replays)} replays)')
+    if failures or workouts != rounds or total_workouts != rounds:
+        raise click.ClickException('Duplicate submissions were applied or failed.')
+
+@bp.cli.command('idempotency-purge')
+def idempotency_purge_command():
+    """Delete expired idempotency keys."""
+    print(f'Purged {idempotency_keys.purge(db.session)} expired idempotency keys.')
+
+@bp.cli.command('query-report')
+@click.option('--small', default=5, help='Rows per table for the small account.')
+@click.option('--large', default=50, help='Rows per table for the large account.')
+def query_report_command(small, large):
+    """Report queries per route for a small and a large account on a scratch database, with lazy loads raising."""
+    routes = ['/dashboard', '/start-workout', '/training-plan', '/activity', '/challenges',
+              '/my-custom-workouts', '/search?q=workout']
+    with scratch_app(RAISE_ON_LAZY_LOAD=True) as app:
+        results = {}
+        avoided = {}  # queries saved by the request-scoped memos (coachsmart/current.py)
+        for size in (small, large):
+            user_id = add_sample_account(f'report-{size}', size)
+            client = app.test_client()
+            with client.session_transaction(base_url='https://localhost') as client_session:
+                client_session['user_id'] = user_id
+                client_session['username'] = f'report-{size}'
+            for route in routes:
+                response = client.get(route, base_url='https://localhost')
+                if response.status_code != 200:
+                    raise click.ClickException(f'{route} returned {response.status_code} for the {size}-row account')
+                results.setdefault(route, []).append(int(response.headers['X-Query-Count']))
+                avoided[route] = int(response.headers['X-Queries-Avoided'])
+
+    print(f'{"route":<24}{small:>8} rows{large:>8} rows{"avoided":>10}')
+    growing = []
+    for route, (small_count, large_count) in results.items():
+        print(f'{route:<24}{small_count:>13}{large_count:>13}{avoided[route]:>10}')
+        if large_count > small_count:
+            growing.append(route)
+    if growing:
+        raise click.ClickException(f'Query count grows with data size (N+1): {", ".join(growing)}')
+
+@bp.cli.command('hydration-bench')
+@click.option('--rows', 'sizes', multiple=True, type=int, default=[1000, 100000], show_default=True,
+              help='Row counts to load (repeatable).')
+@click.option('--repeat', default=5, help='Timed loads per row count and mode.')
+def hydration_bench_command(sizes, repeat):
+    """Compare loading activities as ORM objects, Core rows and view-model DTOs."""
+    import os
+    import tempfile
+    from sqlalchemy import create_engine
+    from benchmark import hydration_benchmark
+    from .view_models import ActivityRow
+
+    # A scratch database, so the numbers don't depend on what the app's database holds
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f'sqlite:///{os.path.join(directory, "hydration.db")}')
+        Activity.__table__.create(engine)
+        now = datetime.utcnow()
+        with engine.begin() as connection:
+            for start in range(0, max(sizes), 10000):
+                connection.execute(Activity.__table__.insert(), [
+                    {'user_id': 1 + i % 100, 'activity_type': 'workout', 'title': f'Workout {i}',
+                     'description': '30 minutes of Cardio', 'points_earned': 90, 'created_at': now - timedelta(minutes=i)}
+                    for i in range(start, min(start + 10000, max(sizes)))
+                ])
+        results = hydration_benchmark(engine, Activity, ActivityRow, sizes=sizes, repeat=repeat)
+        engine.dispose()
+
+    print(f'{"rows":>8}  {"mode":<10}{"median ms":>12}{"us/row":>10}{"peak KiB":>10}{"vs orm":>8}')
+    for size, modes in results.items():
+        for mode, row in modes.items():
+            ratio = modes['orm']['median_ms'] / row['median_ms'] if row['median_ms'] else 0
+            print(f'{size:>8}  {mode:<10}{row["median_ms"]:>12}{row["us_per_row"]:>10}{row["peak_kib"]:>10}{ratio:>7.1f}x')
+
+# Benchmarks - seed a synthetic population, then drive the real routes with a weighted request mix
+BENCH_PASSWORD = 'benchmark'
+# (method, path, form data, weight) - see benchmark.Route. Shared routes run in every configuration.
+BENCH_ROUTES = {
+    'shared': [
+        ('GET', '/dashboard', None, 4),
+        ('GET', '/search?q=core', None, 1),
+    ],
+    'training': [
+        ('GET', '/training-plan', None, 3),
+        ('GET', '/activity', None, 2),
+        ('GET', '/challenges', None, 2),
+        ('GET', '/start-workout', None, 1),
+        ('GET', '/my-custom-workouts', None, 1),
+        ('GET', '/api/v1/stats', None, 2),
+        ('GET', '/api/v1/activities', None, 2),
+        ('GET', '/api/v1/goals', None, 1),
+        ('POST', '/complete-workout', {'workout_type': 'Cardio', 'duration': '30', 'difficulty': 'Medium'}, 1),
+    ],
+    'muscles': [
+        ('GET', '/muscles', None, 2),
+        ('GET', '/muscle/1', None, 3),
+        ('GET', '/muscle/5', None, 1),
+        ('POST', '/save_notes/1', {'notes': 'Benchmark notes'}, 1),
+    ],
+}
+
+def bench_routes(features):
+    from benchmark import Route
+
+    return [Route(*route) for name in ['shared'] + list(features) for route in BENCH_ROUTES[name]]
+
+@bp.cli.command('seed')
+@click.option('--fixture', 'fixtures', multiple=True,
+              help='Fixture from fixtures/ to upsert (repeatable; default: those of the enabled features).')
+@click.option('--synthetic-users', default=0, help='Also bulk-insert this many synthetic users (password "benchmark").')
+@click.option('--years', default=1.0, help='Years of workout history per synthetic user.')
+@click.option('--workouts-per-week', default=3, help='Workouts (and workout activities) per user per week.')
+@click.option('--challenges', default=5, help='Challenge enrollments per synthetic user.')
+@click.option('--goals', default=6, help='Goals per synthetic user.')
+@click.option('--custom-workouts', default=4, help='Custom workouts per synthetic user.')
+@click.option('--yes', is_flag=True, help='Do not ask for confirmation before adding synthetic users.')
+def seed_command(fixtures, synthetic_users, years, workouts_per_week, challenges, goals, custom_workouts, yes):
+    """Upsert fixtures (idempotent) and optionally bulk-insert synthetic users."""
+    from werkzeug.security import generate_password_hash
+    from seeding import seed_population
+    from .challenges import backfill_badge_counters
+
+    if synthetic_users and not yes:
+        click.confirm(f'Add {synthetic_users} synthetic users to {db.engine.url}?', abort=True)
+    create_tables()
+    started = time.perf_counter()
+    for name, count in apply_fixtures(fixtures or enabled_fixtures()).items():
+        print(f'{name:<16}{count:>12} rows upserted')
+    if synthetic_users:
+        with db.engine.begin() as connection:
+            counts = seed_population(connection, db.metadata, users=synthetic_users, years=years,
+                                     workouts_per_week=workouts_per_week, challenges_per_user=challenges,
+                                     goals_per_user=goals, custom_workouts_per_user=custom_workouts,
+                                     password_hash=generate_password_hash(BENCH_PASSWORD))
+        for table, count in counts.items():
+            print(f'{table:<16}{count:>12} rows inserted')
+        print(f'Search index has {rebuild_search_index()} documents.')
+        print(f'Badge counters recomputed for {backfill_badge_counters()} users.')
+    print(f'Seeded in {time.perf_counter() - started:.1f}s.')
+
+@bp.cli.command('bench-run')
+@click.option('--threads', default=4, help='Concurrent simulated users.')
+@click.option('--requests', 'requests_per_thread', default=200, help='Measured requests per thread.')
+@click.option('--url', help='Base URL of a running server; without it requests go through the test client.')
+@click.option('--output', type=click.Path(dir_okay=False), help='Save the results as JSON.')
+@click.option('--compare', 'baseline_path', type=click.Path(exists=True, dir_okay=False), help='Earlier results to compare against.')
+@click.option('--threshold', default=0.2, help='Allowed relative p95 growth before a route counts as regressed.')
+@click.option('--profile', 'profiles', multiple=True,
+              help='Comma-separated FEATURES to build an app with, e.g. "muscles" (repeatable; default: this app).')
+def bench_run_command(threads, requests_per_thread, url, output, baseline_path, threshold, profiles):
+    """Measure p50/p95/p99 latency, throughput and queries per request for each route.
+
+    With --profile, each configuration gets its own app on this database and
+    its routes are labelled with the profile, so one run covers them all.
+    """
+    from benchmark import HTTPTransport, TestClientTransport, compare, environment, run_load, summarize
+    from coachsmart import create_app
+
+    users = [{'id': user.id, 'username': user.username, 'email': user.email}
+             for user in User.query.filter(User.email.like('%@coachsmart.invalid'), User.username.like('bench%'))
+             .order_by(db.func.random()).limit(max(threads, 100))]
+    if not users:
+        raise click.ClickException('No benchmark users found. Run "flask seed --synthetic-users N" first.')
+    db.session.remove()
+
+    if profiles and url:
+        raise click.ClickException('--profile builds apps in-process; benchmark each server separately with --url.')
+    if profiles:
+        try:
+            for profile in profiles:
+                validate(profile.split(','))
+        except ValueError as exc:
+            raise click.ClickException(str(exc))
+        overrides = {key: current_app.config[key] for key in ('SQLALCHEMY_DATABASE_URI', 'SECRET_KEY', 'OUTBOX_WORKER')}
+        runs = [(profile, features, TestClientTransport(create_app(dict(overrides, FEATURES=features))))
+                for profile in profiles for features in [profile.split(',')]]
+    else:
+        transport = HTTPTransport(url, BENCH_PASSWORD) if url else TestClientTransport(current_app._get_current_object())
+        runs = [(None, current_app.config['FEATURES'], transport)]
+
+    all_samples = []
+    total_elapsed = 0.0
+    overall_rows = []
+    results = {'routes': {}}
+    for profile, features, transport in runs:
+        prefix = f'[{profile}] ' if profile else ''
+        samples, elapsed = run_load(transport, users, bench_routes(features), threads=threads,
+                                    requests_per_thread=requests_per_thread)
+        summary = summarize(samples, elapsed)
+        results['routes'].update((prefix + label, row) for label, row in summary['routes'].items())
+        overall_rows.append((prefix + 'overall', summary['overall']))
+        all_samples.extend(samples)
+        total_elapsed += elapsed
+    results['overall'] = summarize(all_samples, total_elapsed)['overall']
+    results['environment'] = environment(threads=threads, requests_per_thread=requests_per_thread, profiles=profiles,
+                                         target=url or 'test-client', database=str(db.engine.url))
+
+    width = 50 if profiles else 36
+    print(f'{"route":<{width}}{"p50":>9}{"p95":>9}{"p99":>9}{"req/s":>9}{"queries":>9}{"errors":>8}')
+    for label, row in list(results['routes'].items()) + overall_rows:
+        print(f'{label:<{width}}{row["p50_ms"]:>9}{row["p95_ms"]:>9}{row["p99_ms"]:>9}{row["throughput_rps"]:>9}'
+              f'{row["queries_per_request"] if row["queries_per_request"] is not None else "-":>9}{row["errors"]:>8}')
+    if output:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'Results saved to {output}')
+    if baseline_path:
+        with open(baseline_path) as f:
+            lines, regressed = compare(json.load(f), results, threshold)
+        print('\n'.join(lines))
+        if regressed:
+            raise click.ClickException(f'Regressed: {", ".join(regressed)}')
+
+# History Retention
+def summarize_activities(rows):
+    """Add a batch of archived activities to the per-user monthly summaries."""
+    totals = {}
+    for row in rows:
+        key = (row['user_id'], row['created_at'].strftime('%Y-%m'), row['activity_type'])
+        count, points = totals.get(key, (0, 0))
+        totals[key] = (count + 1, points + (row['points_earned'] or 0))
+    upsert(db.session, ActivitySummary.__table__,
+           [{'user_id': user_id, 'month': month, 'activity_type': activity_type,
+             'activity_count': count, 'points_earned': points}
+            for (user_id, month, activity_type), (count, points) in totals.items()],
+           index_elements=['user_id', 'month', 'activity_type'],
+           increment_columns=['activity_count', 'points_earned'])
+
+def benchmark_pages(user_ids, rounds=20, routes=('/dashboard', '/activity', '/training-plan')):
+    """Median and p95 response time in ms per route, over `rounds` requests for each user."""
+    import statistics
+
+    timings = {}
+    for user_id in user_ids:
+        client = current_app.test_client()
+        with client.session_transaction(base_url='https://localhost') as client_session:
+            client_session['user_id'] = user_id
+        for route in routes:
+            for _ in range(rounds):
+                started = time.perf_counter()
+                client.get(route, base_url='https://localhost')
+                timings.setdefault(route, []).append((time.perf_counter() - started) * 1000)
+    return {
+        route: (round(statistics.median(samples), 2), round(sorted(samples)[int(len(samples) * 0.95) - 1], 2))
+        for route, samples in timings.items()
+    }
+
+@bp.cli.command('archive-history')
+@click.option('--activity-days', type=int, help='Keep activities newer than this (default ACTIVITY_RETENTION_DAYS).')
+@click.option('--workout-days', type=int, help='Keep workouts newer than this (default WORKOUT_RETENTION_DAYS).')
+@click.option('--batch-size', default=5000, help='Rows read, archived and deleted per transaction.')
+@click.option('--bench', is_flag=True, help='Measure database size and page latency before and after.')
+def archive_history_command(activity_days, workout_days, batch_size, bench):
+    """Archive old activities and workouts, keep monthly activity summaries, and reclaim disk space."""
+    from retention import archive_rows, database_size, incremental_vacuum
+
+    create_tables()
+    activity_days = activity_days or current_app.config['ACTIVITY_RETENTION_DAYS']
+    workout_days = workout_days or current_app.config['WORKOUT_RETENTION_DAYS']
+
+    if bench:
+        # The accounts with the longest history show the difference best
+        busiest = [user_id for user_id, in db.session.query(Activity.user_id).group_by(Activity.user_id)
+                   .order_by(db.func.count().desc()).limit(5)]
+        size_before, _ = database_size(db.session.connection())
+        pages_before = benchmark_pages(busiest)
+        db.session.remove()
+
+    now = datetime.utcnow()
+    activities, activity_archive = archive_rows(db.session, Activity.__table__, 'created_at',
+                                                now - timedelta(days=activity_days), current_app.config['ARCHIVE_DIR'],
+                                                batch_size, on_batch=summarize_activities)
+    workouts, workout_archive = archive_rows(db.session, Workout.__table__, 'completed_at',
+                                             now - timedelta(days=workout_days), current_app.config['ARCHIVE_DIR'], batch_size)
+    db.session.remove()
+    reclaimed = incremental_vacuum(db.engine)
+
+    print(f'Archived {activities} activities{f" to {activity_archive}" if activity_archive else ""}')
+    print(f'Archived {workouts} workouts{f" to {workout_archive}" if workout_archive else ""}')
+    print(f'Reclaimed {reclaimed / 1024:.1f} KiB')
+
+    if bench:
+        size_after, _ = database_size(db.session.connection())
+        pages_after = benchmark_pages(busiest)
+        print(f'{"":<16}{"before":>20}{"after":>20}')
+        print(f'{"database KiB":<16}{size_before / 1024:>20.1f}{size_after / 1024:>20.1f}')
+        for route, (median, p95) in pages_before.items():
+            after_median, after_p95 = pages_after[route]
+            print(f'{route:<16}{f"{median} / {p95} ms":>20}{f"{after_median} / {after_p95} ms":>20}')
+
+@bp.cli.command('outbox-work')
+@click.option('--once', is_flag=True, help='Apply every pending event, then exit.')
+def outbox_work_command(once):
+    """Run the outbox worker in this process (use with OUTBOX_WORKER = False in the web app)."""
+    create_tables()
+    if once:
+        print(f'Applied {outbox.drain(db.session())} events.')
+        return
+    outbox.run(current_app._get_current_object(), db.session)
+
+@bp.cli.command('outbox-status')
+@click.option('--prune-days', type=int, help='Also delete events processed more than this many days ago.')
+def outbox_status_command(prune_days):
+    """Print outbox backlog and lag metrics as JSON."""
+    if prune_days is not None:
+        print(f'Pruned {outbox.prune(db.session, timedelta(days=prune_days))} processed events.')
+    print(json.dumps(outbox.stats(db.session), indent=2))
+
+
+@bp.cli.command('contact-work')
+@click.option('--once', is_flag=True, help='Store and forward everything in the spool, then exit.')
+def contact_work_command(once):
+    """Run the contact form worker in this process (use with CONTACT_WORKER = False in the web app)."""
+    create_tables()
+    if once:
+        # Segments still open for writes are left for the next run
+        stored, duplicates, forwarded = contact_queue.process(db.engine)
+        print(f'Stored {stored} contact messages ({duplicates} duplicates dropped), forwarded {forwarded}.')
+        print(json.dumps(contact_queue.stats(db.session), indent=2))
+        return
+    contact_queue.run(db.engine)
+
+@bp.cli.command('contact-bench')
+@click.option('--submissions', default=20_000, help='Contact form submissions to send.')
+@click.option('--threads', default=8, help='Concurrent submitters.')
+@click.option('--duplicates', 'duplicate_rate', default=0.1, help='Share of submissions that repeat an earlier one.')
+def contact_bench_command(submissions, threads, duplicate_rate):
+    """Compare spooled contact submissions with a database write per submission, on scratch databases."""
+    import tempfile
+    from contact_queue import run_benchmark
+    from .models import ContactMessage
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = run_benchmark(ContactMessage.__table__, directory, submissions=submissions, threads=threads,
+                                duplicate_rate=duplicate_rate)
+    for name, value in results.items():
+        print(f'{name:<24}{value:>14}')
+    if results['stored'] + results['duplicates'] != submissions or results['forwarded'] != results['stored']:
+        raise click.ClickException('Submissions were lost or forwarded twice.')
+
+
+@bp.cli.command('startup-bench')
+@click.option('--runs', default=5, help='Fresh interpreters to start per measurement.')
+@click.option('--precompile', is_flag=True, help='Measure with PRECOMPILE_TEMPLATES on, as wsgi.py runs.')
+@click.option('--imports', default=10, help='Also list this many of the slowest imports (0 to skip).')
+def startup_bench_command(runs, precompile, imports):
+    """Measure cold start: import, create_app and first request for a web worker, and whole CLI runs."""
+    import os
+    from benchmark import import_times, measure_startup
+
+    cwd = os.path.dirname(current_app.root_path)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [cwd, os.environ.get('PYTHONPATH')])))
+    results = measure_startup(cwd, env, runs=runs, cli_commands=[('--help',), ('routes',)],
+                              config={'PRECOMPILE_TEMPLATES': precompile, 'OUTBOX_WORKER': False})
+    print(f'{"phase":<28}{"median":>10}{"min":>10}{"max":>10}')
+    for phase, row in results.items():
+        print(f'{phase:<28}{row["median"]:>10}{row["min"]:>10}{row["max"]:>10}')
+    if imports:
+        print(f'\n{"slowest imports":<40}{"cumulative ms":>14}')
+        for microseconds, module in import_times('coachsmart', cwd, env, top=imports):
+            print(f'{module:<40}{microseconds / 1000:>14.1f}')
@@ -0,0 +1,98 @@
+import os
+from datetime import timedelta
+
+
+class Config:
+    """Defaults for create_app(); deployment-specific values come from the environment."""
+
+    # Set SECRET_KEY in production so every worker signs sessions with the same key
+    SECRET_KEY = os.environ.get('SECRET_KEY') or os.urandom(32).hex()
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///coachsmart.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Secure Session Configuration
+    SESSION_COOKIE_SECURE = True
+    SESSION_COOKIE_HTTPONLY = True
+    SESSION_COOKIE_SAMESITE = 'Lax'
+    PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
+
+    # Feature modules to enable (see features.FEATURES), e.g. COACHSMART_FEATURES=muscles
+    FEATURES = os.environ.get('COACHSMART_FEATURES', 'training,muscles').split(',')
+
+    # Reverse proxies in front of the app that set X-Forwarded-For/-Proto/-Host. Each one is trusted to report
+    # the client address, so rate limits and logs see visitors rather than the proxy; 0 when clients connect directly.
+    PROXY_HOPS = int(os.environ.get('PROXY_HOPS', 0))
+
+    # Security event log, opened on the first event rather than at startup
+    SECURITY_LOG = 'security.log'
+
+    # Compile every template at startup instead of on its first request (web workers)
+    PRECOMPILE_TEMPLATES = os.environ.get('PRECOMPILE_TEMPLATES') == '1'
+
+    # Full-text search engine (see search.BACKENDS)
+    SEARCH_BACKEND = 'sqlite-fts5'
+
+    # Outbox worker - applies derived state (stats, activities, challenges, goals) after user actions.
+    # Set OUTBOX_WORKER to False when a separate `flask outbox-work` process consumes the events.
+    OUTBOX_WORKER = True
+    OUTBOX_INTERVAL = 2.0
+    OUTBOX_BATCH_SIZE = 100
+
+    # History retention - `flask archive-history` moves older rows into compressed archive files
+    ACTIVITY_RETENTION_DAYS = 365
+    WORKOUT_RETENTION_DAYS = 730
+    ARCHIVE_DIR = None  # defaults to <instance>/archive
+
+    # Time zone for users whose browser didn't report one; timestamps are always stored in UTC
+    DEFAULT_TIMEZONE = 'UTC'
+
+    # Account deletion - rows removed per outbox event, so no transaction holds the write lock for long
+    ACCOUNT_DELETE_BATCH_SIZE = 5000
+
+    # Idempotency keys - a repeated POST with the same key within this window replays the first response
+    IDEMPOTENCY_KEY_TTL_HOURS = 24
+
+    # Enforce foreign keys (and their ON DELETE CASCADE) on SQLite connections
+    SQLITE_FOREIGN_KEYS = True
+
+    # Operations console (/admin/ops) - database health is measured at most every N seconds.
+    # Prometheus scrapes /admin/ops/metrics with `Authorization: Bearer <OPS_METRICS_TOKEN>`;
+    # OPS_METRICS_LOCAL_SCRAPE also lets in unauthenticated requests from localhost - only enable it when
+    # no reverse proxy runs on the same host, since proxied requests all come from localhost unless PROXY_HOPS is set.
+    OPS_DB_HEALTH_TTL = 30
+    OPS_METRICS_TOKEN = os.environ.get('OPS_METRICS_TOKEN')
+    OPS_METRICS_LOCAL_SCRAPE = os.environ.get('OPS_METRICS_LOCAL_SCRAPE') == '1'
+
+    # Sampling profiler - requests to PROFILE_ENDPOINTS, plus a PROFILE_SAMPLE_RATE fraction of all requests,
+    # are sampled every PROFILER_INTERVAL seconds; both can be changed at runtime from /admin/ops.
+    # The newest PROFILER_KEEP profiles are kept under PROFILE_DIR (default: <instance>/profiles).
+    PROFILE_ENDPOINTS = [e for e in os.environ.get('COACHSMART_PROFILE_ENDPOINTS', '').split(',') if e]
+    PROFILE_SAMPLE_RATE = float(os.environ.get('COACHSMART_PROFILE_SAMPLE_RATE', 0))
+    PROFILER_INTERVAL = 0.005
+    PROFILER_KEEP = 200
+    PROFILE_DIR = None
+
+    # Contact form - submissions are appended to a spool under CONTACT_SPOOL_DIR (default: <instance>/contact_spool)
+    # and a worker stores them every CONTACT_INTERVAL seconds, dropping repeats of the same message within
+    # CONTACT_DEDUP_HOURS, then forwards them to CONTACT_SINK (see contact_queue.SINKS: log, file or smtp).
+    # Set CONTACT_WORKER to False when a separate `flask contact-work` process consumes the spool.
+    CONTACT_WORKER = True
+    CONTACT_INTERVAL = 2.0
+    CONTACT_BATCH_SIZE = 500
+    CONTACT_SPOOL_DIR = None
+    CONTACT_SPOOL_SEGMENT_SECONDS = 5
+    CONTACT_DEDUP_HOURS = 24
+    CONTACT_SINK = os.environ.get('COACHSMART_CONTACT_SINK', 'file')
+    CONTACT_SINK_FILE = None  # file sink, default: <instance>/contact_inbox.jsonl
+    CONTACT_SMTP_HOST = os.environ.get('CONTACT_SMTP_HOST', 'localhost')
+    CONTACT_SMTP_PORT = int(os.environ.get('CONTACT_SMTP_PORT', 587))
+    CONTACT_SMTP_USERNAME = os.environ.get('CONTACT_SMTP_USERNAME')
+    CONTACT_SMTP_PASSWORD = os.environ.get('CONTACT_SMTP_PASSWORD')
+    CONTACT_EMAIL_FROM = os.environ.get('CONTACT_EMAIL_FROM', 'noreply@coachsmart.local')
+    CONTACT_EMAIL_TO = os.environ.get('CONTACT_EMAIL_TO', 'hello@coachsmart.local')
+    # Spam bursts - submissions allowed per client address and per sender address in CONTACT_RATE_WINDOW seconds
+    CONTACT_RATE_LIMIT = 5
+    CONTACT_RATE_WINDOW = 600
+
+    # Muscle page views are buffered in memory and written in bulk every N seconds
+    ACCESS_FLUSH_INTERVAL = 5.0
@@ -0,0 +1,76 @@
+from flask import g, session
+
+from dal import get_or_create
+from .extensions import db, metrics, query_stats
+from .models import User, UserChallenge, UserStats
+
+
+class CurrentUser:
+    """The signed-in user's commonly needed rows for one request.
+
+    Each part is loaded on first use and then shared by the route, the
+    templates (``current_user``) and the error handlers, so however many of
+    them ask for the stats row it is queried once. Later reads are counted as
+    avoided queries (``X-Queries-Avoided``). The username and admin flag come
+    from the session and cost nothing.
+    """
+
+    def __init__(self, user_id, username=None, is_admin=False):
+        self.id = user_id
+        self.username = username
+        self.is_admin = is_admin
+        self._loaded = {}
+
+    def _memo(self, name, load):
+        if name in self._loaded:
+            query_stats.avoided()
+            metrics.inc('cache_requests_total', cache='current_user', result='hit')
+            return self._loaded[name]
+        metrics.inc('cache_requests_total', cache='current_user', result='miss')
+        value = self._loaded[name] = load()
+        return value
+
+    def user(self):
+        return self._memo('user', lambda: db.session.get(User, self.id, options=[db.raiseload('*')]))
+
+    def stats(self):
+        """The user's UserStats, or None if it doesn't exist yet."""
+        return self._memo('stats', lambda: UserStats.query.options(db.raiseload('*')).filter_by(user_id=self.id).first())
+
+    def stats_or_create(self):
+        """``(stats, created)``, inserting the stats row if missing; the caller commits a created row."""
+        stats = self.stats()
+        if stats is not None:
+            return stats, False
+        stats, created = get_or_create(db.session, UserStats, user_id=self.id)
+        self._loaded['stats'] = stats
+        return stats, created
+
+    def joined_challenge_ids(self):
+        """Ids of every challenge the user has joined, completed or not."""
+        return self._memo('joined_challenge_ids', lambda: frozenset(db.session.execute(
+            db.select(UserChallenge.challenge_id).where(UserChallenge.user_id == self.id)).scalars()))
+
+    def forget(self, *names):
+        """Drop loaded parts after a write that changed them, so the next read reloads."""
+        for name in names:
+            self._loaded.pop(name, None)
+
+
+def current_user():
+    """The signed-in user's CurrentUser for this request, or None."""
+    if 'user_id' not in session:
+        return None
+    if 'current_user' not in g:
+        g.current_user = CurrentUser(session['user_id'], session.get('username'), session.get('is_admin', False))
+    return g.current_user
+
+
+def reset_current_user():
+    """Start each request without loaded parts; ``g`` outlives a request run inside a CLI command's app context."""
+    g.pop('current_user', None)
+
+
+def inject_current_user():
+    """Template context: ``current_user`` (no query until a template asks for a loaded part)."""
+    return {'current_user': current_user()}
@@ -0,0 +1,33 @@
+from flask import current_app, session
+
+from contact_queue import ContactQueue
+from idempotency import IdempotencyKeys
+from outbox import Outbox
+from .extensions import db
+from .models import ContactMessage, IdempotencyKey, OutboxEvent
+
+# Handlers are registered next to the feature they belong to (@outbox.handler)
+outbox = Outbox(OutboxEvent.__table__)
+
+
+def publish_event(event_type, **payload):
+    """Queue derived work in the current transaction; the caller commits."""
+    if current_app.config['OUTBOX_WORKER']:
+        outbox.start(current_app._get_current_object(), db.session)
+    outbox.publish(db.session, event_type, **payload)
+
+
+# Repeated submissions of a form or API call (double taps, retries) get the first response back
+idempotency_keys = IdempotencyKeys(IdempotencyKey.__table__)
+idempotent = idempotency_keys.decorator(db.session, user_id=lambda: session.get('user_id'))
+
+
+# Contact form submissions are spooled to a file on the request path and stored and forwarded in batches
+contact_queue = ContactQueue(ContactMessage.__table__)
+
+
+def submit_contact(**fields):
+    """Spool a contact form submission; nothing is written to the database on the request path."""
+    if current_app.config['CONTACT_WORKER']:
+        contact_queue.start(db.engine)
+    return contact_queue.submit(**fields)
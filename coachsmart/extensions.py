@@ -0,0 +1,18 @@
+from flask import current_app
+from flask_sqlalchemy import SQLAlchemy
+
+from metrics import MetricsRegistry
+from profiler import SamplingProfiler
+from query_stats import QueryStats
+
+# Objects stay loaded after commit, so templates rendered after a commit don't re-query every attribute
+db = SQLAlchemy(session_options={'expire_on_commit': False})
+query_stats = QueryStats()
+metrics = MetricsRegistry()
+# The ops console's own polling is only profiled when asked for by endpoint
+profiler = SamplingProfiler(exclude=('static', 'ops.'))
+
+
+def search_backend():
+    """The current app's full-text search engine (see SEARCH_BACKEND)."""
+    return current_app.extensions['search_backend']
@@ -0,0 +1,31 @@
+from collections import namedtuple
+
+from flask import current_app
+
+# A feature module: the blueprints it registers, the fixtures `init-db` seeds and the document types it searches
+Feature = namedtuple('Feature', ['blueprints', 'fixtures', 'doc_types'])
+
+FEATURES = {
+    # Workouts, training plan, goals, challenges, the read API and coach analytics
+    'training': Feature(('workouts', 'goals', 'challenges', 'api', 'analytics'), ('challenges',), ('custom_workout', 'challenge')),
+    # Muscle group guide with per-user view counts and notes
+    'muscles': Feature(('muscles',), ('muscle_groups',), ('muscle_group',)),
+}
+
+
+def validate(names):
+    unknown = set(names) - set(FEATURES)
+    if unknown or not names:
+        raise ValueError(f'FEATURES must name at least one of {", ".join(FEATURES)}; got {", ".join(names) or "none"}')
+
+
+def enabled(name):
+    return name in current_app.config['FEATURES']
+
+
+def enabled_fixtures():
+    return [fixture for name in current_app.config['FEATURES'] for fixture in FEATURES[name].fixtures]
+
+
+def enabled_doc_types():
+    return [doc_type for name in current_app.config['FEATURES'] for doc_type in FEATURES[name].doc_types]
@@ -0,0 +1,229 @@
+from datetime import datetime
+
+from flask import Blueprint, flash, jsonify, redirect, request, session, url_for
+
+from .events import idempotent, outbox, publish_event
+from .extensions import db
+from .models import Activity, Goal, UserStats
+
+bp = Blueprint('goals', __name__)
+
+# Automatic Goal Tracking - which goals a workout counts towards, and by how much
+TRACKED_GOAL_UNITS = ['workouts', 'times', 'minutes', 'hours']
+GOAL_WORKOUT_KEYWORDS = {
+    'strength': ('strength', 'upper body', 'lower body', 'full body', 'core', 'weights'),
+    'muscle_gain': ('strength', 'upper body', 'lower body', 'full body', 'core', 'weights'),
+    'endurance': ('cardio', 'hiit', 'run', 'cycling', 'swim', 'sports', 'endurance', 'quick'),
+    'weight_loss': ('cardio', 'hiit', 'run', 'cycling', 'swim', 'sports', 'quick'),
+}
+
+def goal_types_for_workout(workout_type):
+    # Custom goals count every workout
+    name = (workout_type or '').lower()
+    return ['custom'] + [goal_type for goal_type, keywords in GOAL_WORKOUT_KEYWORDS.items()
+                         if any(keyword in name for keyword in keywords)]
+
+def apply_workout_to_goals(user_id, workout_type, duration):
+    """Advance the user's active goals that a workout counts towards.
+
+    Runs two UPDATEs on the ix_goal_user_active index inside the caller's
+    transaction: one increments progress, one marks reached goals complete.
+    Returns (id, title, target_value) for each goal this workout completed.
+    """
+    increment = db.case(
+        (Goal.unit.in_(['workouts', 'times']), 1.0),
+        (Goal.unit == 'minutes', float(duration)),
+        else_=duration / 60.0
+    )
+    active = [
+        Goal.user_id == user_id,
+        Goal.is_active == True,
+        Goal.is_completed == False,
+        Goal.unit.in_(TRACKED_GOAL_UNITS),
+        Goal.goal_type.in_(goal_types_for_workout(workout_type))
+    ]
+    db.session.execute(
+        db.update(Goal).where(*active)
+        .values(current_value=db.func.coalesce(Goal.current_value, 0.0) + increment)
+        .execution_options(synchronize_session=False)
+    )
+    return db.session.execute(
+        db.update(Goal).where(*active, Goal.current_value >= Goal.target_value)
+        .values(is_completed=True, completed_at=datetime.utcnow())
+        .returning(Goal.id, Goal.title, Goal.target_value)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+# Goals Service
+COMPLETED_GOAL_HISTORY = 10
+
+def load_goals(user_id, completed_limit=COMPLETED_GOAL_HISTORY):
+    """Active goals and the most recently completed ones, in one ordered query."""
+    recent_completed = db.select(Goal.id).where(
+        Goal.user_id == user_id,
+        Goal.is_completed == True
+    ).order_by(Goal.completed_at.desc()).limit(completed_limit).scalar_subquery()
+    
+    goals = Goal.query.options(db.raiseload('*')).filter(
+        Goal.user_id == user_id,
+        db.or_(db.and_(Goal.is_active == True, Goal.is_completed == False), Goal.id.in_(recent_completed))
+    ).order_by(Goal.is_completed, Goal.completed_at.desc(), Goal.id).all()
+    
+    active_goals = [goal for goal in goals if not goal.is_completed]
+    completed_goals = [goal for goal in goals if goal.is_completed]
+    return active_goals, completed_goals
+
+def set_goal_progress(user_id, goal_id, new_value):
+    """Set a goal's progress, completing it if the target is reached.
+
+    The completing UPDATE only matches a goal that is not completed yet, so
+    posting the same completion twice awards points once; the points and the
+    activity are applied by the outbox worker. Runs in the caller's
+    transaction. Returns (found, is_completed, points_awarded).
+    """
+    completed = db.session.execute(
+        db.update(Goal).where(
+            Goal.id == goal_id,
+            Goal.user_id == user_id,
+            Goal.is_completed == False,
+            Goal.target_value <= new_value
+        ).values(current_value=new_value, is_completed=True, completed_at=datetime.utcnow())
+        .returning(Goal.title, Goal.target_value)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if completed:
+        publish_event('goal_completed', user_id=user_id, title=completed.title, target_value=completed.target_value)
+        return True, True, goal_points(completed.target_value)
+    
+    updated = db.session.execute(
+        db.update(Goal).where(Goal.id == goal_id, Goal.user_id == user_id)
+        .values(current_value=new_value)
+        .returning(Goal.is_completed)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if not updated:
+        return False, False, 0
+    return True, updated.is_completed, 0
+
+def goal_points(target_value):
+    return int(target_value * 10)  # 10 points per target unit
+
+def record_goal_completion(user_id, goal_title, target_value):
+    """Award points (atomic increment) and log the activity for a completed goal. Returns the points awarded."""
+    points_awarded = goal_points(target_value)
+    db.session.execute(
+        db.update(UserStats).where(UserStats.user_id == user_id)
+        .values(total_points=UserStats.total_points + points_awarded)
+    )
+    db.session.add(Activity(
+        user_id=user_id,
+        activity_type='goal_completed',
+        title=f'Goal Completed: {goal_title}',
+        description=f'Completed goal: {goal_title}',
+        points_earned=points_awarded
+    ))
+    return points_awarded
+
+# Outbox Handlers - derived state applied by the outbox worker, in its transaction
+@outbox.handler('goal_created')
+def apply_goal_created(user_id, title):
+    db.session.add(Activity(
+        user_id=user_id,
+        activity_type='goal_created',
+        title=f'Goal Created: {title}',
+        description=f'Created new goal: {title}',
+        points_earned=0
+    ))
+
+@outbox.handler('goal_completed')
+def apply_goal_completed(user_id, title, target_value):
+    record_goal_completion(user_id, title, target_value)
+
+# Goal Management Routes
+@bp.route('/goals')
+def goals():
+    if 'user_id' not in session:
+        flash('Please sign in to view your goals.', 'error')
+        return redirect(url_for('pages.get_started'))
+    
+    # Redirect to training plan since goals are now integrated there
+    return redirect(url_for('workouts.training_plan'))
+
+@bp.route('/add-goal', methods=['GET', 'POST'])
+@idempotent
+def add_goal():
+    if 'user_id' not in session:
+        flash('Please sign in to create goals.', 'error')
+        return redirect(url_for('pages.get_started'))
+    
+    if request.method == 'POST':
+        title = request.form.get('title')
+        description = request.form.get('description')
+        goal_type = request.form.get('goal_type')
+        target_value = float(request.form.get('target_value'))
+        unit = request.form.get('unit')
+        target_date_str = request.form.get('target_date')
+        
+        # Parse target date
+        target_date = None
+        if target_date_str:
+            target_date = datetime.strptime(target_date_str, '%Y-%m-%d').date()
+        
+        # Create new goal
+        new_goal = Goal(
+            user_id=session['user_id'],
+            title=title,
+            description=description,
+            goal_type=goal_type,
+            target_value=target_value,
+            current_value=0.0,
+            unit=unit,
+            target_date=target_date
+        )
+        
+        db.session.add(new_goal)
+        publish_event('goal_created', user_id=session['user_id'], title=title)
+        db.session.commit()
+        
+        flash('Goal created successfully!', 'success')
+        return redirect(url_for('workouts.training_plan'))
+    
+    return redirect(url_for('workouts.training_plan'))
+
+@bp.route('/update-goal/<int:goal_id>', methods=['POST'])
+def update_goal(goal_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        new_value = float(request.form.get('current_value'))
+        found, is_completed, points_awarded = set_goal_progress(session['user_id'], goal_id, new_value)
+        if not found:
+            db.session.rollback()
+            return jsonify({'error': 'Goal not found'}), 404
+        
+        db.session.commit()
+        if points_awarded:
+            flash(f'Congratulations! Goal completed and earned {points_awarded} points! 🎉', 'success')
+        return jsonify({'success': True, 'is_completed': is_completed})
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/delete-goal/<int:goal_id>', methods=['POST'])
+def delete_goal(goal_id):
+    if 'user_id' not in session:
+        flash('Please sign in to manage goals.', 'error')
+        return redirect(url_for('pages.get_started'))
+    
+    goal = Goal.query.filter_by(id=goal_id, user_id=session['user_id']).first()
+    if not goal:
+        flash('Goal not found.', 'error')
+        return redirect(url_for('workouts.training_plan'))
+    
+    db.session.delete(goal)
+    db.session.commit()
+    
+    flash('Goal deleted successfully.', 'success')
+    return redirect(url_for('workouts.training_plan'))
@@ -0,0 +1,287 @@
+from search import SearchDocument, flatten_exercises
+from .extensions import db, search_backend
+
+# User Model
+class User(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)  # Hashed password
+    is_admin = db.Column(db.Boolean, default=False)  # Role-based access control
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    last_login = db.Column(db.DateTime)
+    timezone = db.Column(db.String(64))  # IANA name from the browser; None means DEFAULT_TIMEZONE
+    # Relationships - child rows are removed by ON DELETE CASCADE in the database, never loaded to be deleted
+    workouts = db.relationship('Workout', backref='user', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    user_stats = db.relationship('UserStats', backref='user', lazy=True, uselist=False, cascade='all, delete-orphan',
+                                 passive_deletes=True)
+    challenges = db.relationship('UserChallenge', backref='user', lazy=True, cascade='all, delete-orphan',
+                                 passive_deletes=True)
+    activities = db.relationship('Activity', backref='user', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+
+# User Stats Model
+class UserStats(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    current_streak = db.Column(db.Integer, default=0)
+    total_workouts = db.Column(db.Integer, default=0)
+    total_time_minutes = db.Column(db.Integer, default=0)
+    total_points = db.Column(db.Integer, default=0)
+    level = db.Column(db.Integer, default=1)
+    # Badge counters, kept in step with challenge completions (see `flask backfill-badges`)
+    challenges_completed = db.Column(db.Integer, default=0, server_default='0')
+    gold_medals = db.Column(db.Integer, default=0, server_default='0')
+    # This week's generated training plan (JSON) and the inputs it was built from (see schedule.plan_key)
+    weekly_plan = db.Column(db.Text)
+    weekly_plan_key = db.Column(db.String(64))
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
+
+    # One stats row per user, so get-or-create can rely on ON CONFLICT
+    __table_args__ = (db.Index('uq_user_stats_user', 'user_id', unique=True),)
+
+# Goal Model
+class Goal(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    goal_type = db.Column(db.String(50), nullable=False)  # 'weight_loss', 'muscle_gain', 'endurance', 'strength', 'custom'
+    target_value = db.Column(db.Float, nullable=False)
+    current_value = db.Column(db.Float, default=0.0)
+    unit = db.Column(db.String(20), nullable=False)  # 'kg', 'lbs', 'minutes', 'workouts', 'km', etc.
+    target_date = db.Column(db.Date)
+    is_completed = db.Column(db.Boolean, default=False)
+    is_active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
+    completed_at = db.Column(db.DateTime)
+    
+    # Relationship to user
+    user = db.relationship('User', backref=db.backref('goals', cascade='all, delete-orphan', passive_deletes=True))
+
+    # Per-user index of active goals, used when workouts advance goal progress
+    __table_args__ = (db.Index('ix_goal_user_active', 'user_id', 'is_active', 'is_completed'),)
+
+# Workout Model
+class Workout(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    workout_type = db.Column(db.String(50), nullable=False)  # Upper Body, Lower Body, etc.
+    duration_minutes = db.Column(db.Integer, nullable=False)
+    difficulty = db.Column(db.String(20), nullable=False)  # Easy, Medium, Hard, Intense
+    points_earned = db.Column(db.Integer, default=0)
+    completed_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    # Per-user history in date order, for the training plan and the analytics export
+    __table_args__ = (db.Index('ix_workout_user_completed', 'user_id', 'completed_at'),)
+
+# Custom Workout Model
+class CustomWorkout(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    duration_minutes = db.Column(db.Integer, nullable=False)
+    difficulty = db.Column(db.String(20), nullable=False)
+    workout_type = db.Column(db.String(50), nullable=False)
+    exercises = db.Column(db.Text, nullable=False)  # JSON string of exercises
+    description = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    __table_args__ = (db.Index('ix_custom_workout_user', 'user_id'),)
+
+# Activity Model
+class Activity(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    activity_type = db.Column(db.String(50), nullable=False)  # workout, achievement, personal_record, challenge
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    points_earned = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    # Per-user feed in date order; also lets account deletion find a user's rows without a table scan
+    __table_args__ = (db.Index('ix_activity_user_created', 'user_id', 'created_at'),)
+
+# Activity Summary Model (monthly rollup of activities moved to the archive)
+class ActivitySummary(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    month = db.Column(db.String(7), nullable=False)  # 'YYYY-MM'
+    activity_type = db.Column(db.String(50), nullable=False)
+    activity_count = db.Column(db.Integer, nullable=False, default=0)
+    points_earned = db.Column(db.Integer, nullable=False, default=0)
+
+    # One row per user, month and type, so archiving can add to it with ON CONFLICT
+    __table_args__ = (db.Index('uq_activity_summary_user_month_type', 'user_id', 'month', 'activity_type', unique=True),)
+
+# Challenge Model
+class Challenge(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text)
+    target_value = db.Column(db.Integer, nullable=False)
+    points_reward = db.Column(db.Integer, nullable=False)
+    badge_name = db.Column(db.String(50))
+    challenge_type = db.Column(db.String(50), nullable=False)  # streak, workout_count, etc.
+
+    # Challenge names are the natural key fixtures are upserted on
+    __table_args__ = (db.Index('uq_challenge_name', 'name', unique=True),)
+
+# User Challenge Model (tracks user progress in challenges)
+class UserChallenge(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    challenge_id = db.Column(db.Integer, db.ForeignKey('challenge.id'), nullable=False)
+    current_progress = db.Column(db.Integer, default=0)
+    is_completed = db.Column(db.Boolean, default=False)
+    started_at = db.Column(db.DateTime, server_default=db.func.now())
+    completed_at = db.Column(db.DateTime)
+    
+    # Relationship to challenge
+    challenge = db.relationship('Challenge', backref='user_challenges')
+
+    # A user can join each challenge once
+    __table_args__ = (db.Index('uq_user_challenge_user_challenge', 'user_id', 'challenge_id', unique=True),)
+
+# Muscle Group Model
+class MuscleGroup(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text)
+    location = db.Column(db.String(100))
+    exercises = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    # Muscle group names are the natural key fixtures are upserted on
+    __table_args__ = (db.Index('uq_muscle_group_name', 'name', unique=True),)
+
+# User Progress Model (muscle page views and notes)
+class UserProgress(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    muscle_group_id = db.Column(db.Integer, db.ForeignKey('muscle_group.id'), nullable=False)
+    last_accessed = db.Column(db.DateTime, server_default=db.func.now())
+    access_count = db.Column(db.Integer, default=0)
+    notes = db.Column(db.Text)
+
+    user = db.relationship('User', backref=db.backref('progress', cascade='all, delete-orphan', passive_deletes=True))
+    muscle_group = db.relationship('MuscleGroup', backref='progress')
+
+    # One row per user and muscle group, so access counters can be upserted
+    __table_args__ = (db.Index('uq_user_progress_user_muscle', 'user_id', 'muscle_group_id', unique=True),)
+
+# Outbox Event Model (side effects of user actions, applied by the outbox worker)
+class OutboxEvent(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(50), nullable=False)  # workout_completed, goal_created, goal_completed, challenge_joined
+    payload = db.Column(db.Text, nullable=False)  # JSON keyword arguments for the handler
+    created_at = db.Column(db.DateTime, nullable=False)
+    available_at = db.Column(db.DateTime, nullable=False)  # pushed back after a failed attempt
+    processed_at = db.Column(db.DateTime)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+
+    # Pending events are read in id order
+    __table_args__ = (db.Index('ix_outbox_event_pending', 'processed_at', 'id'),)
+
+# Account Deletion Model (a deletion request and its progress; outlives the account it removes)
+class AccountDeletion(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    token = db.Column(db.String(64), nullable=False)  # unguessable id for the status endpoint
+    user_id = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, running, done
+    rows_deleted = db.Column(db.Integer, nullable=False, default=0)
+    requested_at = db.Column(db.DateTime, nullable=False)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    # The session check on every signed-in request looks deletions up by user
+    __table_args__ = (db.Index('uq_account_deletion_token', 'token', unique=True),
+                      db.Index('ix_account_deletion_user', 'user_id'))
+
+# Idempotency Key Model (a submitted POST and its response, replayed when the same key is sent again)
+class IdempotencyKey(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    key = db.Column(db.String(64), nullable=False)
+    fingerprint = db.Column(db.String(64), nullable=False)  # hash of the request the key was first used for
+    status_code = db.Column(db.Integer)  # null while the first request is in progress
+    location = db.Column(db.String(500))
+    mimetype = db.Column(db.String(100))
+    body = db.Column(db.Text)
+    flashes = db.Column(db.Text)  # JSON [category, message] pairs flashed by the first request
+    created_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('uq_idempotency_key_user_key', 'user_id', 'key', unique=True),
+        db.Index('ix_idempotency_key_expires', 'expires_at'),
+    )
+
+# Contact Message Model (a contact form submission, moved here in batches from the spool and then forwarded)
+class ContactMessage(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    dedup_key = db.Column(db.String(64), nullable=False)  # hash of sender, subject, message and dedup window
+    name = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    remote_addr = db.Column(db.String(45))
+    submitted_at = db.Column(db.DateTime, nullable=False)
+    received_at = db.Column(db.DateTime, nullable=False)
+    forwarded_at = db.Column(db.DateTime)
+    available_at = db.Column(db.DateTime, nullable=False)  # next forwarding attempt
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.String(500))
+
+    __table_args__ = (
+        db.Index('uq_contact_message_dedup_key', 'dedup_key', unique=True),
+        db.Index('ix_contact_message_forward', 'forwarded_at', 'available_at'),
+    )
+
+# Search Index Sync - index writes run on the flush connection, so they commit or roll back with the row
+def custom_workout_document(workout):
+    return SearchDocument('custom_workout', workout.id, workout.name,
+                          f'{workout.description or ""} {flatten_exercises(workout.exercises)}', workout.user_id)
+
+def challenge_document(challenge):
+    return SearchDocument('challenge', challenge.id, challenge.name, challenge.description, None)
+
+def muscle_group_document(muscle_group):
+    return SearchDocument('muscle_group', muscle_group.id, muscle_group.name,
+                          f'{muscle_group.description or ""} {flatten_exercises(muscle_group.exercises)}', None)
+
+# Indexed document types: the model each is built from and its document builder
+SEARCH_DOCUMENTS = {
+    'custom_workout': (CustomWorkout, custom_workout_document),
+    'challenge': (Challenge, challenge_document),
+    'muscle_group': (MuscleGroup, muscle_group_document),
+}
+
+@db.event.listens_for(CustomWorkout, 'after_insert')
+@db.event.listens_for(CustomWorkout, 'after_update')
+def index_custom_workout(mapper, connection, target):
+    search_backend().index_document(connection, custom_workout_document(target))
+
+@db.event.listens_for(Challenge, 'after_insert')
+@db.event.listens_for(Challenge, 'after_update')
+def index_challenge(mapper, connection, target):
+    search_backend().index_document(connection, challenge_document(target))
+
+@db.event.listens_for(CustomWorkout, 'after_delete')
+def unindex_custom_workout(mapper, connection, target):
+    search_backend().remove_document(connection, 'custom_workout', target.id)
+
+@db.event.listens_for(Challenge, 'after_delete')
+def unindex_challenge(mapper, connection, target):
+    search_backend().remove_document(connection, 'challenge', target.id)
+
+@db.event.listens_for(MuscleGroup, 'after_insert')
+@db.event.listens_for(MuscleGroup, 'after_update')
+def index_muscle_group(mapper, connection, target):
+    search_backend().index_document(connection, muscle_group_document(target))
+
+@db.event.listens_for(MuscleGroup, 'after_delete')
+def unindex_muscle_group(mapper, connection, target):
+    search_backend().remove_document(connection, 'muscle_group', target.id)
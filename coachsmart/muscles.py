@@ -0,0 +1,79 @@
+from datetime import datetime
+
+from flask import Blueprint, jsonify, redirect, render_template, request, session, url_for
+
+from access_tracking import AccessTracker
+from dal import upsert
+from .current import current_user
+from .extensions import db
+from .models import MuscleGroup, UserProgress
+
+bp = Blueprint('muscles', __name__)
+
+access_tracker = AccessTracker(UserProgress.__table__)
+
+
+@bp.record_once
+def configure_access_tracker(state):
+    access_tracker.interval = state.app.config['ACCESS_FLUSH_INTERVAL']
+
+
+# Muscle Group Routes
+@bp.route('/muscles')
+def overview():
+    if 'user_id' not in session:
+        return redirect(url_for('pages.get_started'))
+
+    user_id = session['user_id']
+    user = current_user().user()
+
+    # Get all muscle groups
+    muscle_groups = MuscleGroup.query.options(db.raiseload('*')).all()
+
+    # Get user progress
+    user_progress = UserProgress.query.options(db.raiseload('*')).filter_by(user_id=user_id).all()
+    progress_dict = {p.muscle_group_id: p for p in user_progress}
+
+    return render_template('dashboard_premium.html',
+                         user=user,
+                         muscle_groups=muscle_groups,
+                         progress_dict=progress_dict)
+
+@bp.route('/muscle/<int:muscle_id>')
+def muscle_detail(muscle_id):
+    if 'user_id' not in session:
+        return redirect(url_for('pages.get_started'))
+
+    muscle = MuscleGroup.query.options(db.raiseload('*')).get_or_404(muscle_id)
+    user_id = session['user_id']
+
+    # Record the view in the access buffer - no write transaction on the request path
+    access_tracker.start(db.engine)
+    now = datetime.utcnow()
+    pending_views = access_tracker.record(user_id, muscle_id, when=now)
+
+    stored = UserProgress.query.options(db.raiseload('*')).filter_by(user_id=user_id, muscle_group_id=muscle_id).first()
+    progress = {
+        'access_count': (stored.access_count if stored else 0) + pending_views,
+        'last_accessed': now,
+        'notes': stored.notes if stored else ''
+    }
+
+    return render_template('muscle_detail_simplified.html', muscle=muscle, progress=progress)
+
+@bp.route('/save_notes/<int:muscle_id>', methods=['POST'])
+def save_notes(muscle_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    MuscleGroup.query.get_or_404(muscle_id)
+    user_id = session['user_id']
+    notes = request.form.get('notes', '')
+
+    # Update or create user progress in one atomic statement
+    upsert(db.session, UserProgress.__table__,
+           {'user_id': user_id, 'muscle_group_id': muscle_id, 'notes': notes, 'access_count': 1},
+           index_elements=['user_id', 'muscle_group_id'], update_columns=['notes'])
+    db.session.commit()
+
+    return jsonify({'success': True, 'notes': notes})
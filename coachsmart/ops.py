@@ -0,0 +1,297 @@
+import hmac
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from flask import (Blueprint, Response, abort, current_app, flash, g, jsonify, redirect, render_template, request,
+                   send_from_directory, session, url_for)
+from sqlalchemy import func, select, text
+
+from metrics import Sample, histogram_quantile
+from .events import contact_queue, outbox
+from .extensions import db, metrics, profiler
+from .models import AccountDeletion
+from .security import admin_required, security_logger
+
+# Operations console - live request throughput and latency, database health and background job lag
+bp = Blueprint('ops', __name__, url_prefix='/admin/ops')
+
+LOOPBACK = ('127.0.0.1', '::1')
+
+DatabaseHealth = namedtuple('DatabaseHealth', [
+    'dialect', 'size_bytes', 'free_bytes', 'wal_bytes', 'tables', 'indexes', 'buffer_hit_ratio', 'measured_at',
+])
+# bytes and scans are None where the database doesn't record them
+IndexHealth = namedtuple('IndexHealth', ['name', 'table', 'bytes', 'scans'])
+
+
+# Database health, per dialect
+def sqlite_health(connection):
+    """File, free and WAL bytes, exact row counts and index sizes (dbstat, where SQLite was built with it)."""
+    from retention import database_size
+
+    size, free = database_size(connection)
+    path = connection.engine.url.database
+    wal_path = f'{path}-wal' if path and path != ':memory:' else None
+    wal = os.path.getsize(wal_path) if wal_path and os.path.exists(wal_path) else 0
+    tables = {table.name: connection.execute(select(func.count()).select_from(table)).scalar()
+              for table in db.metadata.sorted_tables}
+    index_tables = connection.execute(text(
+        "SELECT name, tbl_name FROM sqlite_master WHERE type = 'index' ORDER BY tbl_name, name")).all()
+    try:
+        sizes = dict(connection.execute(text('SELECT name, SUM(pgsize) FROM dbstat GROUP BY name')).all())
+    except Exception:
+        sizes = {}
+    indexes = [IndexHealth(name, table, sizes.get(name), None) for name, table in index_tables]
+    # SQLite keeps no usage or page cache statistics
+    return size, free, wal, tables, indexes, None
+
+
+def postgresql_health(connection):
+    """Database size, estimated row counts, index scans and sizes, and the buffer cache hit ratio."""
+    size = connection.execute(text('SELECT pg_database_size(current_database())')).scalar()
+    tables = dict(connection.execute(text('SELECT relname, n_live_tup FROM pg_stat_user_tables')).all())
+    indexes = [IndexHealth(*row) for row in connection.execute(text(
+        'SELECT indexrelname, relname, pg_relation_size(indexrelid), idx_scan FROM pg_stat_user_indexes '
+        'ORDER BY relname, indexrelname')).all()]
+    hit, read = connection.execute(text(
+        'SELECT blks_hit, blks_read FROM pg_stat_database WHERE datname = current_database()')).one()
+    return size, None, None, tables, indexes, hit / (hit + read) if hit + read else None
+
+
+HEALTH = {
+    'sqlite': sqlite_health,
+    'postgresql': postgresql_health,
+}
+
+_health_cache = {}
+_health_lock = threading.Lock()
+
+
+def database_health(max_age=None):
+    """DatabaseHealth for the app's database, measured at most every OPS_DB_HEALTH_TTL seconds.
+
+    Row counts read whole tables, so scrapes and console refreshes share one
+    recent measurement instead of each counting again.
+    """
+    max_age = current_app.config['OPS_DB_HEALTH_TTL'] if max_age is None else max_age
+    engine = db.engine
+    with _health_lock:
+        cached = _health_cache.get(engine.url)
+        if cached is not None and time.monotonic() - cached[0] < max_age:
+            return cached[1]
+        probe = HEALTH.get(engine.dialect.name)
+        if probe is None:
+            health = DatabaseHealth(engine.dialect.name, None, None, None, {}, [], None, datetime.utcnow())
+        else:
+            with engine.connect() as connection:
+                health = DatabaseHealth(engine.dialect.name, *probe(connection), datetime.utcnow())
+        _health_cache[engine.url] = (time.monotonic(), health)
+        return health
+
+
+# Background jobs
+def job_status():
+    """Backlog and lag of the outbox, buffered page views, account deletions and contact messages."""
+    from .muscles import access_tracker
+
+    status = outbox.stats(db.session)
+    contact = contact_queue.stats(db.session)
+    deletions = db.session.execute(
+        select(func.count()).select_from(AccountDeletion).where(AccountDeletion.status != 'done')).scalar()
+    return {
+        'outbox_pending': status['pending'],
+        'outbox_dead': status['dead'],
+        'outbox_lag_seconds': status['lag_seconds'],
+        'outbox_max_lag_seconds': status['max_lag_seconds'],
+        'outbox_worker_running': status['worker_running'],
+        'access_tracker_backlog': access_tracker.backlog(),
+        'account_deletions_pending': deletions,
+        'contact_spool_bytes': contact['spool_bytes'],
+        'contact_forward_pending': contact['forward_pending'],
+        'contact_forward_dead': contact['forward_dead'],
+    }
+
+
+# Metrics - request counts, latency and query counts are recorded as requests finish
+def record_queries(response):
+    if 'query_count' in g:
+        metrics.inc('db_queries_total', g.query_count, endpoint=request.endpoint or 'unknown')
+    return response
+
+
+@metrics.collector
+def database_samples():
+    health = database_health()
+    samples = [
+        Sample('db_size_bytes', 'gauge', 'Database size on disk', [({}, health.size_bytes or 0)]),
+        Sample('db_table_rows', 'gauge', 'Rows per table (estimated on PostgreSQL)',
+               [({'table': name}, rows) for name, rows in sorted(health.tables.items())]),
+        Sample('db_index_bytes', 'gauge', 'Index size',
+               [({'index': index.name, 'table': index.table}, index.bytes) for index in health.indexes
+                if index.bytes is not None]),
+        Sample('db_index_scans', 'gauge', 'Index scans since statistics were reset',
+               [({'index': index.name, 'table': index.table}, index.scans) for index in health.indexes
+                if index.scans is not None]),
+    ]
+    if health.free_bytes is not None:
+        samples.append(Sample('db_free_bytes', 'gauge', 'Free pages in the database file', [({}, health.free_bytes)]))
+    if health.wal_bytes is not None:
+        samples.append(Sample('db_wal_bytes', 'gauge', 'Write-ahead log size', [({}, health.wal_bytes)]))
+    if health.buffer_hit_ratio is not None:
+        samples.append(Sample('db_buffer_hit_ratio', 'gauge', 'Share of block reads served from the buffer cache',
+                              [({}, health.buffer_hit_ratio)]))
+    return samples
+
+
+@metrics.collector
+def job_samples():
+    jobs = job_status()
+    return [Sample(name, 'gauge', name.replace('_', ' ').capitalize(), [({}, float(value))])
+            for name, value in jobs.items()]
+
+
+@metrics.collector
+def process_samples():
+    return [Sample('process_uptime_seconds', 'gauge', 'Seconds since the metrics registry was created',
+                   [({}, round(time.time() - metrics.started_at, 3))])]
+
+
+def init_app(app):
+    metrics.counter('db_queries_total', 'SQL statements issued by requests, by endpoint')
+    metrics.counter('cache_requests_total', 'In-process cache lookups by cache and result (hit or miss)')
+    app.after_request(record_queries)
+
+
+# Console
+def endpoint_summary(values):
+    """Per-endpoint request counts by status, latency quantiles (ms) and queries, from the registry values."""
+    buckets = metrics.metrics['http_request_duration_seconds'].buckets
+    endpoints = {}
+    for (name, labels), value in values.items():
+        labels = dict(labels)
+        if name not in ('http_requests_total', 'http_request_duration_seconds', 'db_queries_total'):
+            continue
+        row = endpoints.setdefault(labels['endpoint'], {'endpoint': labels['endpoint'], 'requests': 0, 'errors': 0,
+                                                       'queries': 0, 'histogram': None})
+        if name == 'http_requests_total':
+            row['requests'] += value
+            if labels['status'].startswith('5'):
+                row['errors'] += value
+        elif name == 'db_queries_total':
+            row['queries'] += value
+        else:
+            row['histogram'] = value[:-1]
+            row['latency_sum'] = value[-1]
+    for row in endpoints.values():
+        counts = row['histogram'] or [0] * (len(buckets) + 1)
+        for q in (50, 95, 99):
+            quantile = histogram_quantile(buckets, counts, q / 100)
+            row[f'p{q}_ms'] = round(quantile * 1000, 1) if quantile is not None else None
+        row['queries_per_request'] = round(row['queries'] / row['requests'], 2) if row['requests'] else None
+        row.pop('latency_sum', None)
+    return sorted(endpoints.values(), key=lambda row: -row['requests'])
+
+
+def cache_summary(values):
+    caches = {}
+    for (name, labels), value in values.items():
+        if name == 'cache_requests_total':
+            labels = dict(labels)
+            caches.setdefault(labels['cache'], {'hit': 0, 'miss': 0})[labels['result']] += value
+    return {name: dict(counts, hit_ratio=round(counts['hit'] / (counts['hit'] + counts['miss']), 3)
+                       if counts['hit'] + counts['miss'] else None)
+            for name, counts in sorted(caches.items())}
+
+
+@bp.route('')
+@admin_required
+def console():
+    # Endpoints that can be picked for profiling
+    endpoints = sorted({rule.endpoint for rule in current_app.url_map.iter_rules()
+                        if 'GET' in rule.methods and rule.endpoint != 'static'})
+    return render_template('admin_ops.html', endpoints=endpoints, profiler=profiler)
+
+
+@bp.route('/metrics.json')
+@admin_required
+def metrics_json():
+    """Everything the console shows. Counters are totals; the console turns them into rates between polls."""
+    values = metrics.values()
+    health = database_health()
+    return jsonify({
+        'now': time.time(),
+        'uptime_seconds': round(time.time() - metrics.started_at, 1),
+        'latency_buckets_ms': [bound * 1000 for bound in metrics.metrics['http_request_duration_seconds'].buckets],
+        'endpoints': endpoint_summary(values),
+        'caches': cache_summary(values),
+        'jobs': job_status(),
+        'database': {
+            'dialect': health.dialect,
+            'size_bytes': health.size_bytes,
+            'free_bytes': health.free_bytes,
+            'wal_bytes': health.wal_bytes,
+            'buffer_hit_ratio': health.buffer_hit_ratio,
+            'measured_at': health.measured_at.isoformat(),
+            'tables': health.tables,
+            'indexes': [index._asdict() for index in health.indexes],
+        },
+        'profiler': {
+            'endpoints': sorted(profiler.endpoints),
+            'sample_rate': profiler.sample_rate,
+            'interval_ms': profiler.interval * 1000,
+            'profiles': [dict(profile._asdict(), created_at=profile.created_at.isoformat(),
+                              folded_url=url_for('ops.profile_file', filename=f'{profile.name}.folded'),
+                              sql_url=url_for('ops.profile_file', filename=f'{profile.name}.sql'))
+                         for profile in profiler.profiles(limit=20)],
+        },
+    })
+
+
+# Sampling profiler - switched per endpoint or per fraction of requests, in this process
+@bp.route('/profiler', methods=['POST'])
+@admin_required
+def configure_profiler():
+    endpoints = [endpoint.strip() for endpoint in request.form.get('endpoints', '').split(',') if endpoint.strip()]
+    unknown = set(endpoints) - set(current_app.view_functions)
+    if unknown:
+        flash(f'Unknown endpoints: {", ".join(sorted(unknown))}', 'error')
+        return redirect(url_for('ops.console'))
+    try:
+        percent = float(request.form.get('sample_percent') or 0)
+    except ValueError:
+        flash('Sample rate must be a number.', 'error')
+        return redirect(url_for('ops.console'))
+
+    profiler.configure(endpoints=endpoints, sample_rate=percent / 100)
+    security_logger.warning(f"PROFILER_CONFIGURED: user_id={session['user_id']}, endpoints={','.join(endpoints)}, "
+                            f"sample_rate={profiler.sample_rate}, ip={request.remote_addr}")
+    if profiler.enabled:
+        flash(f'Profiling {", ".join(endpoints) or "no endpoints"} and {profiler.sample_rate:.1%} of other requests.',
+              'success')
+    else:
+        flash('Profiler off.', 'success')
+    return redirect(url_for('ops.console'))
+
+
+@bp.route('/profiles/<path:filename>')
+@admin_required
+def profile_file(filename):
+    """A written profile: collapsed stacks (.folded, for flamegraph.pl or speedscope) or its SQL (.sql)."""
+    if not filename.endswith(('.folded', '.sql')):
+        abort(404)
+    return send_from_directory(profiler.directory, filename, mimetype='text/plain')
+
+
+@bp.route('/metrics')
+def prometheus():
+    """Prometheus text format, for admins, scrapers sending OPS_METRICS_TOKEN and (opt-in) local scrapers."""
+    token = current_app.config['OPS_METRICS_TOKEN']
+    scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+    scraper = bool(token) and scheme.lower() == 'bearer' and hmac.compare_digest(credentials.encode(), token.encode())
+    local = current_app.config['OPS_METRICS_LOCAL_SCRAPE'] and request.remote_addr in LOOPBACK
+    if not scraper and not local and not (session.get('user_id') and session.get('is_admin')):
+        abort(403, description='Admin access required')
+    return Response(metrics.prometheus(prefix='coachsmart_'), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,155 @@
+from flask import Blueprint, abort, flash, jsonify, redirect, render_template, request, session, url_for
+
+from contact_queue import RateLimiter
+from search import MAX_PAGE, MAX_PER_PAGE
+from .current import current_user
+from .events import submit_contact
+from .extensions import db, metrics, search_backend
+from .features import enabled, enabled_doc_types
+from .models import Activity, Workout
+from .timezones import user_calendar
+from .view_models import load_dashboard
+
+bp = Blueprint('pages', __name__)
+
+# Contact form spam bursts - submissions per client address and per sender address, in this process
+contact_limiter = RateLimiter()
+CONTACT_FIELDS = {'name': 100, 'email': 120, 'subject': 200, 'message': 5000}  # maximum lengths
+
+
+@bp.record_once
+def configure_contact_limiter(state):
+    contact_limiter.limit = state.app.config['CONTACT_RATE_LIMIT']
+    contact_limiter.window = state.app.config['CONTACT_RATE_WINDOW']
+    metrics.counter('contact_submissions_total', 'Contact form submissions by result')
+
+
+@bp.route('/')
+def index():
+    if not enabled('training'):
+        # The muscle guide's landing page carries the sign-in forms
+        if 'user_id' in session:
+            return redirect(url_for('pages.dashboard'))
+        return render_template('index_rebuilt.html')
+    return render_template('index.html')
+
+@bp.route('/features')
+def features():
+    return render_template('features.html')
+
+@bp.route('/about')
+def about():
+    return render_template('about.html')
+
+@bp.route('/contact', methods=['GET', 'POST'])
+def contact():
+    if request.method == 'GET':
+        return render_template('contact.html', form={})
+
+    form = {field: request.form.get(field, '').strip() for field in CONTACT_FIELDS}
+    # Name and subject end up in mail headers: fold line breaks and other runs of whitespace into one space
+    form['name'] = ' '.join(form['name'].split())
+    form['subject'] = ' '.join(form['subject'].split())
+    # Bots fill in the hidden field; they get the usual thank-you and nothing is kept
+    if request.form.get('website'):
+        metrics.inc('contact_submissions_total', result='honeypot')
+        flash('Thank you for your message! We will get back to you soon.', 'success')
+        return redirect(url_for('pages.contact'))
+    if not all(form.values()) or '@' not in form['email'] or len(form['email'].split()) > 1 or any(
+            len(form[field]) > length for field, length in CONTACT_FIELDS.items()):
+        metrics.inc('contact_submissions_total', result='invalid')
+        flash('Please fill in every field (messages can be up to 5000 characters).', 'error')
+        return render_template('contact.html', form=form), 400
+    if not contact_limiter.allow(('remote_addr', request.remote_addr), ('email', form['email'].lower())):
+        metrics.inc('contact_submissions_total', result='rate_limited')
+        flash('You have sent several messages already. Please try again later.', 'error')
+        return render_template('contact.html', form=form), 429
+
+    # Spooled, not written: the contact worker stores and forwards submissions in batches
+    submit_contact(remote_addr=request.remote_addr, **form)
+    metrics.inc('contact_submissions_total', result='queued')
+    flash('Thank you for your message! We will get back to you soon.', 'success')
+    return redirect(url_for('pages.contact'))
+
+@bp.route('/get-started')
+def get_started():
+    return render_template('get_started.html')
+
+@bp.route('/dashboard')
+def dashboard():
+    if 'user_id' not in session:
+        return redirect(url_for('pages.get_started'))
+    
+    if not enabled('training'):
+        from .muscles import overview
+        return overview()
+
+    user_id = session['user_id']
+    
+    # Stats, recent activities and active challenges in one round trip
+    user_stats, recent_activities, active_challenges = load_dashboard(user_id)
+    if user_stats is None:
+        user_stats, created = current_user().stats_or_create()
+        if created:
+            db.session.commit()
+    
+    return render_template('dashboard.html', 
+                         user_stats=user_stats,
+                         recent_activities=recent_activities,
+                         active_challenges=active_challenges)
+
+@bp.route('/activity')
+def activity():
+    if not enabled('training'):
+        abort(404)
+    if 'user_id' not in session:
+        flash('Please sign in to view your activity.', 'error')
+        return redirect(url_for('pages.get_started'))
+    
+    user_id = session['user_id']
+    
+    # Get user stats and all activities
+    user_stats = current_user().stats()
+    user_activities = Activity.query.options(db.raiseload('*')).filter_by(user_id=user_id).order_by(Activity.created_at.desc()).all()
+    
+    # Calculate monthly stats (this calendar month in the user's time zone), totalled in SQL
+    month = user_calendar().month
+    workout_count, total_time_minutes, points_earned = db.session.execute(
+        db.select(db.func.count(), db.func.coalesce(db.func.sum(Workout.duration_minutes), 0),
+                  db.func.coalesce(db.func.sum(Workout.points_earned), 0))
+        .where(Workout.user_id == user_id, Workout.completed_at >= month.start, Workout.completed_at < month.end)
+    ).one()
+    
+    monthly_stats = {
+        'workout_count': workout_count,
+        'total_time_minutes': total_time_minutes,
+        'points_earned': points_earned
+    }
+    
+    return render_template('activity.html',
+                         user_stats=user_stats,
+                         activities=user_activities,
+                         monthly_stats=monthly_stats)
+
+@bp.route('/search')
+def search():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    query = request.args.get('q', '').strip()
+    page = min(max(request.args.get('page', 1, type=int), 1), MAX_PAGE)
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), MAX_PER_PAGE)
+    # Each enabled feature module contributes its document types
+    searchable = enabled_doc_types()
+    doc_types = [t for t in request.args.getlist('type') if t in searchable] or searchable
+
+    results = search_backend().search(db.session.connection(), query, owner_id=session['user_id'],
+                                    doc_types=doc_types, page=page, per_page=per_page)
+
+    return jsonify({
+        'query': results.query,
+        'page': results.page,
+        'per_page': results.per_page,
+        'has_next': results.has_next,
+        'results': [hit._asdict() for hit in results.hits]
+    })
@@ -0,0 +1,131 @@
+import hashlib
+import json
+from collections import Counter, namedtuple
+from datetime import timedelta
+
+from .extensions import db, metrics
+from .models import Workout
+
+# Weekly Schedule Generation
+DAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+DIFFICULTIES = ('Easy', 'Medium', 'Hard', 'Intense')
+
+# Training days for each number of sessions, spread so hard days rarely fall back to back
+TRAINING_DAYS = {
+    3: ('monday', 'wednesday', 'friday'),
+    4: ('monday', 'tuesday', 'thursday', 'saturday'),
+    5: ('monday', 'tuesday', 'wednesday', 'friday', 'saturday'),
+    6: ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday'),
+}
+# Workout types that serve each goal type, most useful first
+GOAL_WORKOUT_TYPES = {
+    'strength': ('Upper Body', 'Lower Body', 'Full Body', 'Core'),
+    'muscle_gain': ('Upper Body', 'Lower Body', 'Full Body'),
+    'endurance': ('Cardio', 'HIIT', 'Full Body'),
+    'weight_loss': ('HIIT', 'Cardio', 'Full Body'),
+}
+# A balanced week for users with neither goals nor history
+DEFAULT_ROTATION = ('Upper Body', 'Lower Body', 'Cardio', 'Core', 'Full Body', 'HIIT')
+WORKLOAD_WEEKS = 4
+DEFAULT_DURATION = 30
+
+PlannedWorkout = namedtuple('PlannedWorkout', ['workout_type', 'duration_minutes', 'difficulty'])
+# Training before the planned week: weekly average, the week just before, and what was done
+Workload = namedtuple('Workload', ['workouts_per_week', 'last_week', 'avg_duration', 'type_counts', 'difficulty_counts'])
+
+
+def load_workload(user_id, week_start):
+    """The user's last WORKLOAD_WEEKS weeks of training before ``week_start`` (naive UTC), in one grouped query."""
+    since = week_start - timedelta(weeks=WORKLOAD_WEEKS)
+    last_week = week_start - timedelta(weeks=1)
+    rows = db.session.execute(
+        db.select(Workout.workout_type, Workout.difficulty, db.func.count(), db.func.sum(Workout.duration_minutes),
+                  db.func.count().filter(Workout.completed_at >= last_week))
+        .where(Workout.user_id == user_id, Workout.completed_at >= since, Workout.completed_at < week_start)
+        .group_by(Workout.workout_type, Workout.difficulty)
+    ).all()
+    type_counts = Counter()
+    difficulty_counts = Counter()
+    for workout_type, difficulty, count, _, _ in rows:
+        type_counts[workout_type] += count
+        difficulty_counts[difficulty] += count
+    total = sum(type_counts.values())
+    minutes = sum(row[3] or 0 for row in rows)
+    return Workload(total / WORKLOAD_WEEKS, sum(row[4] for row in rows),
+                    round(minutes / total) if total else None, type_counts, difficulty_counts)
+
+
+def _type_rotation(goal_types, workload):
+    """Workout types to cycle through: those serving the goals first, then the user's favourites."""
+    rotation = []
+    for goal_type in goal_types:
+        for workout_type in GOAL_WORKOUT_TYPES.get(goal_type, ()):
+            if workout_type not in rotation:
+                rotation.append(workout_type)
+    for workout_type, _ in workload.type_counts.most_common(2):
+        if workout_type not in rotation:
+            rotation.append(workout_type)
+    return rotation or list(DEFAULT_ROTATION)
+
+
+def _difficulty(workload, sessions):
+    """The usual difficulty, one step up after a full week of training and one down after a lapse."""
+    if not workload.difficulty_counts:
+        return 'Medium'
+    usual = workload.difficulty_counts.most_common(1)[0][0]
+    level = DIFFICULTIES.index(usual) if usual in DIFFICULTIES else 1
+    if workload.last_week >= sessions:
+        level += 1
+    elif workload.last_week * 2 < sessions:
+        level -= 1
+    return DIFFICULTIES[min(max(level, 0), len(DIFFICULTIES) - 1)]
+
+
+def generate_plan(goal_types, workload):
+    """A week of training as {day: PlannedWorkout or None (rest)}.
+
+    One session more than the recent weekly average (3 to 6 sessions),
+    cycling through the types that serve the active goals and the user's
+    favourite types, at their usual duration and a difficulty adjusted to
+    how last week went. Deterministic for the same inputs.
+    """
+    sessions = min(max(round(workload.workouts_per_week) + 1, 3), 6) if workload.type_counts else 3
+    rotation = _type_rotation(goal_types, workload)
+    duration = max(5, round((workload.avg_duration or DEFAULT_DURATION) / 5) * 5)
+    difficulty = _difficulty(workload, sessions)
+    days = TRAINING_DAYS[sessions]
+    plan = dict.fromkeys(DAYS)
+    for index, day in enumerate(days):
+        plan[day] = PlannedWorkout(rotation[index % len(rotation)], duration, difficulty)
+    return plan
+
+
+def plan_key(week, active_goals):
+    """Identifies the inputs a plan was generated from: the ISO week and the active goals.
+
+    The workload is read from the weeks before the planned one, so it cannot
+    change during the week and needs no part in the key.
+    """
+    goals = sorted((goal.id, goal.goal_type) for goal in active_goals)
+    digest = hashlib.sha1(json.dumps(goals).encode('utf-8')).hexdigest()[:16]
+    return f'{week[0]}-W{week[1]:02d}:{digest}'
+
+
+def weekly_plan(user_stats, active_goals, calendar):
+    """This week's plan for the user, generated only when the week or their goals changed.
+
+    The plan is cached on ``user_stats`` (already loaded by the page), so a
+    cache hit costs no query; the caller commits.
+    """
+    key = plan_key(calendar.today.isocalendar()[:2], active_goals)
+    if user_stats.weekly_plan_key == key and user_stats.weekly_plan:
+        metrics.inc('cache_requests_total', cache='weekly_plan', result='hit')
+        stored = json.loads(user_stats.weekly_plan)
+        return {day: PlannedWorkout(*stored[day]) if stored.get(day) else None for day in DAYS}
+
+    metrics.inc('cache_requests_total', cache='weekly_plan', result='miss')
+    workload = load_workload(user_stats.user_id, calendar.week.start)
+    plan = generate_plan([goal.goal_type for goal in active_goals], workload)
+    user_stats.weekly_plan = json.dumps(plan)
+    user_stats.weekly_plan_key = key
+    return plan
@@ -0,0 +1,92 @@
+import logging
+from functools import wraps
+
+from flask import abort, current_app, render_template, request, session
+from werkzeug.exceptions import HTTPException
+
+from .current import current_user
+from .extensions import db
+from .models import AccountDeletion, User
+
+# Security Event Logger
+security_logger = logging.getLogger('security')
+
+
+# Role-Based Access Control Decorator
+def admin_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not session.get('user_id') or not session.get('is_admin'):
+            abort(403, description='Admin access required')
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+# Security Headers Middleware
+def security_headers(response):
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    response.headers['X-Frame-Options'] = 'DENY'
+    response.headers['X-XSS-Protection'] = '1; mode=block'
+    response.headers['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains'
+    response.headers['Content-Security-Policy'] = "default-src 'self'; script-src 'self' 'unsafe-inline'; style-src 'self' 'unsafe-inline'"
+    return response
+
+
+# Session Revocation (a deletion request signs the account out everywhere, not just the session that asked)
+def end_revoked_session():
+    if 'user_id' not in session:
+        return
+    user_id = session['user_id']
+    deletion_requested = db.select(AccountDeletion.id).where(AccountDeletion.user_id == user_id).exists()
+    if db.session.execute(db.select(User.id).where(User.id == user_id, ~deletion_requested)).scalar() is None:
+        security_logger.warning(f"REVOKED_SESSION: user_id={user_id}, ip={request.remote_addr}")
+        session.clear()
+
+
+# Secure Error Handlers
+def forbidden(error):
+    user = current_user()
+    security_logger.warning(f"FORBIDDEN_ACCESS: user_id={user.id if user else None}, ip={request.remote_addr}, url={request.url}")
+    return render_template('403.html'), 403
+
+
+def not_found_error(error):
+    return render_template('404.html'), 404
+
+
+def internal_error(error):
+    db.session.rollback()
+    current_app.logger.error(f'Server Error: {error}', exc_info=True)
+    return render_template('500.html'), 500
+
+
+# Handle other HTTP errors
+def handle_http_error(error):
+    response = {
+        'error': error.name,
+        'code': error.code,
+        'message': error.description,
+    }
+    return render_template('error.html', error=response), error.code
+
+
+# Log all unhandled exceptions
+def handle_exception(error):
+    current_app.logger.error(f'Unhandled Exception: {error}', exc_info=True)
+    return render_template('500.html'), 500
+
+
+def init_app(app):
+    if not security_logger.handlers:
+        security_logger.setLevel(logging.WARNING)
+        handler = logging.FileHandler(app.config['SECURITY_LOG'], delay=True)
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+        security_logger.addHandler(handler)
+
+    app.before_request(end_revoked_session)
+    app.after_request(security_headers)
+    app.register_error_handler(403, forbidden)
+    app.register_error_handler(404, not_found_error)
+    app.register_error_handler(500, internal_error)
+    app.register_error_handler(HTTPException, handle_http_error)
+    app.register_error_handler(Exception, handle_exception)
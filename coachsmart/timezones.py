@@ -0,0 +1,29 @@
+from flask import current_app, g, session
+from sqlalchemy import select
+
+from localtime import Calendar
+from .extensions import db
+from .models import User
+
+
+def user_calendar():
+    """The signed-in user's calendar for this request; its ranges are computed on first use only."""
+    if 'calendar' not in g:
+        g.calendar = Calendar(session.get('timezone') or current_app.config['DEFAULT_TIMEZONE'])
+    return g.calendar
+
+
+def reset_calendar():
+    """Start each request with a fresh calendar (``g`` outlives a request run inside a CLI command)."""
+    g.pop('calendar', None)
+
+
+def calendar_for(user_id, now=None):
+    """A user's calendar outside a request (outbox handlers, CLI), at ``now`` (default: the current time)."""
+    zone = db.session.execute(select(User.timezone).where(User.id == user_id)).scalar()
+    return Calendar(zone or current_app.config['DEFAULT_TIMEZONE'], now)
+
+
+def localtime_filter(timestamp):
+    """Template filter: a stored UTC timestamp in the signed-in user's time zone."""
+    return user_calendar().local(timestamp)
@@ -0,0 +1,65 @@
+from collections import namedtuple
+
+from sqlalchemy import select
+
+from viewmodel import ViewQuery
+from .extensions import db
+from .models import Activity, Challenge, UserChallenge, UserStats
+
+# Read-only rows for templates - plain namedtuples instead of identity-mapped ORM objects
+StatsRow = namedtuple('StatsRow', ['current_streak', 'total_workouts', 'total_time_minutes', 'total_points', 'level',
+                                   'challenges_completed', 'gold_medals'])
+ActivityRow = namedtuple('ActivityRow', ['id', 'activity_type', 'title', 'description', 'points_earned', 'created_at'])
+ChallengeRow = namedtuple('ChallengeRow', ['id', 'name', 'description', 'target_value', 'points_reward',
+                                           'badge_name', 'challenge_type'])
+UserChallengeRow = namedtuple('UserChallengeRow', ChallengeRow._fields + ('current_progress', 'completed_at'))
+
+CHALLENGE_COLUMNS = [getattr(Challenge, field) for field in ChallengeRow._fields]
+RECENT_ACTIVITY_LIMIT = 10
+COMPLETED_CHALLENGE_LIMIT = 10
+
+
+def _stats_part(view, user_id):
+    view.add('stats', StatsRow, select(*[getattr(UserStats, field) for field in StatsRow._fields])
+             .where(UserStats.user_id == user_id), limit=1)
+
+
+def _user_challenges_part(view, name, user_id, completed, order_by=(), limit=None):
+    view.add(name, UserChallengeRow,
+             select(*CHALLENGE_COLUMNS, UserChallenge.current_progress, UserChallenge.completed_at)
+             .join_from(UserChallenge, Challenge)
+             .where(UserChallenge.user_id == user_id, UserChallenge.is_completed == completed),
+             order_by=order_by, limit=limit)
+
+
+def load_dashboard(user_id):
+    """Stats, the latest activities and active challenges in one statement.
+
+    Returns (stats or None, activities, active challenges).
+    """
+    view = ViewQuery()
+    _stats_part(view, user_id)
+    view.add('activities', ActivityRow, select(*[getattr(Activity, field) for field in ActivityRow._fields])
+             .where(Activity.user_id == user_id),
+             order_by=[Activity.created_at.desc(), Activity.id.desc()], limit=RECENT_ACTIVITY_LIMIT)
+    _user_challenges_part(view, 'active', user_id, False, order_by=[UserChallenge.id])
+    rows = view.load(db.session)
+    return (rows['stats'] or [None])[0], rows['activities'], rows['active']
+
+
+def load_challenges(user_id):
+    """Stats plus active, available and recently completed challenges in one statement.
+
+    Returns (stats or None, active, available, completed).
+    """
+    joined = select(UserChallenge.challenge_id).where(UserChallenge.user_id == user_id,
+                                                      UserChallenge.is_completed == False)
+    view = ViewQuery()
+    _stats_part(view, user_id)
+    _user_challenges_part(view, 'active', user_id, False, order_by=[UserChallenge.id])
+    view.add('available', ChallengeRow, select(*CHALLENGE_COLUMNS).where(Challenge.id.not_in(joined)),
+             order_by=[Challenge.id])
+    _user_challenges_part(view, 'completed', user_id, True,
+                          order_by=[UserChallenge.completed_at.desc()], limit=COMPLETED_CHALLENGE_LIMIT)
+    rows = view.load(db.session)
+    return (rows['stats'] or [None])[0], rows['active'], rows['available'], rows['completed']
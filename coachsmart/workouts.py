@@ -0,0 +1,336 @@
+from datetime import datetime, timedelta
+
+from flask import Blueprint, flash, redirect, render_template, request, session, url_for
+
+from dal import insert_or_ignore
+from .challenges import record_challenge_completion
+from .current import current_user
+from .events import idempotent, outbox, publish_event
+from .extensions import db
+from .goals import apply_workout_to_goals, load_goals, record_goal_completion
+from .models import Activity, Challenge, CustomWorkout, UserChallenge, UserStats, Workout
+from .schedule import weekly_plan
+from .timezones import calendar_for, user_calendar
+
+bp = Blueprint('workouts', __name__)
+
+# Workout Routes
+@bp.route('/start-workout')
+def start_workout():
+    if 'user_id' not in session:
+        flash('Please sign in to start a workout.', 'error')
+        return redirect(url_for('pages.get_started'))
+    
+    user_id = session['user_id']
+
+    # Get user stats for display
+    user_stats = current_user().stats()
+    
+    # Get recent workouts for recommendations
+    recent_workouts = Workout.query.options(db.raiseload('*')).filter_by(user_id=user_id).order_by(Workout.completed_at.desc()).limit(10).all()
+    
+    # Get custom workouts for this user
+    custom_workouts_db = CustomWorkout.query.filter_by(user_id=user_id).order_by(CustomWorkout.created_at.desc()).all()
+    custom_workouts = []
+    for workout in custom_workouts_db:
+        custom_workouts.append({
+            'id': workout.id,
+            'name': workout.name,
+            'duration_minutes': workout.duration_minutes,
+            'difficulty': workout.difficulty,
+            'workout_type': workout.workout_type,
+            'exercises': workout.exercises,
+            'description': workout.description,
+            'created_at': workout.created_at.isoformat() if workout.created_at else None
+        })
+    
+    # Determine user preferences based on past activities
+    workout_preferences = {}
+    if recent_workouts:
+        workout_types = [w.workout_type for w in recent_workouts]
+        difficulties = [w.difficulty for w in recent_workouts]
+        
+        # Count frequency of workout types
+        from collections import Counter
+        type_counts = Counter(workout_types)
+        difficulty_counts = Counter(difficulties)
+        
+        workout_preferences['favorite_type'] = type_counts.most_common(1)[0][0] if type_counts else 'Cardio'
+        workout_preferences['preferred_difficulty'] = difficulty_counts.most_common(1)[0][0] if difficulty_counts else 'Medium'
+        workout_preferences['workout_count'] = len(recent_workouts)
+    else:
+        workout_preferences['favorite_type'] = 'Cardio'
+        workout_preferences['preferred_difficulty'] = 'Medium'
+        workout_preferences['workout_count'] = 0
+
+    return render_template('workout.html',
+                         user_stats=user_stats,
+                         workout_preferences=workout_preferences,
+                         custom_workouts=custom_workouts)
+
+@bp.route('/training-plan')
+def training_plan():
+    if 'user_id' not in session:
+        flash('Please sign in to view your training plan.', 'error')      
+        return redirect(url_for('pages.get_started'))
+
+    user_id = session['user_id']
+
+    # Get user stats (created with defaults if missing) and workouts
+    user_stats, _ = current_user().stats_or_create()
+    
+    # Get recent workouts
+    user_workouts = Workout.query.options(db.raiseload('*')).filter_by(user_id=user_id).order_by(Workout.completed_at.desc()).limit(10).all()
+    
+    # Get today's workout (today in the user's time zone, as a UTC range on the index)
+    calendar = user_calendar()
+    todays_workout = Workout.query.options(db.raiseload('*')).filter_by(user_id=user_id).filter(
+        Workout.completed_at >= calendar.day.start, Workout.completed_at < calendar.day.end
+    ).first()
+    
+    # Calculate weekly workouts (today and the 7 days before it)
+    weekly_workouts_count = Workout.query.filter_by(user_id=user_id).filter(
+        Workout.completed_at >= calendar.since_days_ago(7).start
+    ).count()
+    
+    # Get user goals (active plus recent completed history in one query)
+    active_goals, completed_goals = load_goals(user_id)
+    
+    # This week's schedule, regenerated only when the week or the active goals change
+    weekly_workouts = weekly_plan(user_stats, active_goals, calendar)
+    
+    # Update user stats with current weekly workouts (totals are maintained as workouts complete)
+    user_stats.current_streak = weekly_workouts_count
+    db.session.commit()
+    
+    # Calculate percentages for template
+    weekly_percent = ((user_stats.current_streak or 0) / 7 * 100)
+    level_percent = ((user_stats.level or 1) / 10 * 100)
+    endurance_percent = (min(user_stats.total_workouts or 0, 20) / 20 * 100)
+    weight_loss_percent = ((user_stats.total_points or 0) / 500 * 100)
+    muscle_gain_percent = ((user_stats.level or 1) / 10 * 100)
+    stamina_percent = (min((user_stats.total_time_minutes or 0) / 60, 25) / 25 * 100)
+    
+    return render_template('training_plan.html',
+                         user_stats=user_stats,
+                         user_workouts=user_workouts,
+                         weekly_workouts=weekly_workouts,
+                         todays_workout=todays_workout,
+                         active_goals=active_goals,
+                         completed_goals=completed_goals,
+                         weekly_percent=weekly_percent,
+                         level_percent=level_percent,
+                         endurance_percent=endurance_percent,
+                         weight_loss_percent=weight_loss_percent,
+                         muscle_gain_percent=muscle_gain_percent,
+                         stamina_percent=stamina_percent)
+
+# Action Routes
+@bp.route('/complete-workout', methods=['POST'])
+@idempotent
+def complete_workout():
+    if 'user_id' not in session:
+        flash('Please sign in to complete a workout.', 'error')
+        return redirect(url_for('pages.get_started'))
+    
+    user_id = session['user_id']
+    workout_type = request.form.get('workout_type')
+    duration = int(request.form.get('duration', 30))
+    difficulty = request.form.get('difficulty', 'Medium')
+    
+    # Calculate points based on duration and difficulty
+    difficulty_multipliers = {'Easy': 1, 'Medium': 1.5, 'Hard': 2, 'Intense': 2.5}
+    base_points = duration * 2  # 2 points per minute
+    points_earned = int(base_points * difficulty_multipliers.get(difficulty, 1.5))
+    
+    try:
+        # Only the workout row is written here; stats, activity, challenges and goals follow via the outbox
+        workout = Workout(
+            user_id=user_id,
+            workout_type=workout_type,
+            duration_minutes=duration,
+            difficulty=difficulty,
+            points_earned=points_earned,
+            completed_at=datetime.utcnow()
+        )
+        db.session.add(workout)
+        db.session.flush()
+        publish_event('workout_completed', user_id=user_id, workout_id=workout.id)
+        
+        db.session.commit()
+        flash(f'🔥 Workout completed! +{points_earned} points earned!', 'success')
+        
+    except Exception as e:
+        db.session.rollback()
+        flash('An error occurred. Please try again.', 'error')
+    
+    return redirect(url_for('pages.dashboard'))
+
+@bp.route('/delete-custom-workout/<int:workout_id>', methods=['POST'])
+def delete_custom_workout(workout_id):
+    if 'user_id' not in session:
+        flash('Please sign in to delete workouts.', 'error')
+        return redirect(url_for('pages.get_started'))
+    
+    user_id = session['user_id']
+    
+    # Get the custom workout to delete
+    workout = CustomWorkout.query.filter_by(id=workout_id, user_id=user_id).first()
+    
+    if workout:
+        db.session.delete(workout)
+        db.session.commit()
+        flash('🗑️ Workout deleted successfully!', 'success')
+    else:
+        flash('Workout not found.', 'error')
+    
+    return redirect(url_for('workouts.my_custom_workouts'))
+
+@bp.route('/my-custom-workouts')
+def my_custom_workouts():
+    if 'user_id' not in session:
+        flash('Please sign in to view your custom workouts.', 'error')
+        return redirect(url_for('pages.get_started'))
+    
+    user_id = session['user_id']
+    
+    # Get all custom workouts for this user
+    custom_workouts_db = CustomWorkout.query.filter_by(user_id=user_id).order_by(CustomWorkout.created_at.desc()).all()
+    custom_workouts = []
+    for workout in custom_workouts_db:
+        custom_workouts.append({
+            'id': workout.id,
+            'name': workout.name,
+            'duration_minutes': workout.duration_minutes,
+            'difficulty': workout.difficulty,
+            'workout_type': workout.workout_type,
+            'exercises': workout.exercises,
+            'description': workout.description,
+            'created_at': workout.created_at
+        })
+    
+    return render_template('my_custom_workouts.html',
+                         custom_workouts=custom_workouts)
+
+@bp.route('/create-custom-workout', methods=['POST'])
+@idempotent
+def create_custom_workout():
+    if 'user_id' not in session:
+        flash('Please sign in to create a custom workout.', 'error')
+        return redirect(url_for('pages.get_started'))
+    
+    user_id = session['user_id']
+    name = request.form.get('name')
+    duration = int(request.form.get('duration', 30))
+    difficulty = request.form.get('difficulty')
+    workout_type = request.form.get('type')
+    exercises = request.form.get('exercises')
+    description = request.form.get('description')
+    
+    try:
+        # Create custom workout record
+        custom_workout = CustomWorkout(
+            user_id=user_id,
+            name=name,
+            duration_minutes=duration,
+            difficulty=difficulty,
+            workout_type=workout_type,
+            exercises=exercises,
+            description=description
+        )
+        db.session.add(custom_workout)
+        db.session.commit()
+        
+        flash(f'🎨 Custom workout "{name}" created successfully!', 'success')
+        
+    except Exception as e:
+        db.session.rollback()
+        flash('An error occurred while creating your custom workout. Please try again.', 'error')
+    
+    return redirect(url_for('workouts.start_workout'))
+
+# Outbox Handlers - derived state applied by the outbox worker, in its transaction
+@outbox.handler('workout_completed')
+def apply_workout_completed(user_id, workout_id):
+    workout = db.session.get(Workout, workout_id)
+    if workout is None:
+        return
+    # Days and weeks are the user's own, at the time of the workout
+    calendar = calendar_for(user_id, now=workout.completed_at)
+    workout_date = calendar.today
+    
+    # Streak from the workout before this one
+    yesterday = workout_date - timedelta(days=1)
+    last_workout = Workout.query.filter(Workout.user_id == user_id, Workout.id < workout_id).order_by(Workout.id.desc()).first()
+    last_date = calendar.local_date(last_workout.completed_at) if last_workout else None
+    if last_date == yesterday:
+        streak = UserStats.current_streak + 1
+    elif not last_workout or last_date < yesterday:
+        streak = 1
+    else:
+        streak = UserStats.current_streak
+    
+    # Update user stats with atomic increments, so concurrent workers never lose one;
+    # level up at 100 points per level (SET reads the pre-update total, hence the added points)
+    insert_or_ignore(db.session, UserStats.__table__, {'user_id': user_id}, ['user_id'])
+    total_points = UserStats.total_points + workout.points_earned
+    current_streak = db.session.execute(
+        db.update(UserStats).where(UserStats.user_id == user_id).values(
+            total_workouts=UserStats.total_workouts + 1,
+            total_time_minutes=UserStats.total_time_minutes + workout.duration_minutes,
+            total_points=total_points,
+            level=db.case((total_points // 100 + 1 > UserStats.level, total_points // 100 + 1), else_=UserStats.level),
+            current_streak=streak,
+        ).returning(UserStats.current_streak).execution_options(synchronize_session=False)
+    ).scalar_one()
+    
+    # Create activity record
+    db.session.add(Activity(
+        user_id=user_id,
+        activity_type='workout',
+        title=f'Completed {workout.workout_type} Workout',
+        description=f'{workout.duration_minutes} minute {workout.difficulty.lower()} {workout.workout_type} session',
+        points_earned=workout.points_earned
+    ))
+    
+    # Update challenge progress
+    workout_challenges = db.session.query(UserChallenge, Challenge).join(Challenge).filter(
+        UserChallenge.user_id == user_id,
+        UserChallenge.is_completed == False,
+        Challenge.challenge_type.in_(['workout_count', 'streak', 'weekly_goal'])
+    ).all()
+    
+    week_start = calendar.week.start
+    weekly_count = None  # counted once, however many weekly challenges the user has joined
+    for user_challenge, challenge in workout_challenges:
+        if challenge.challenge_type == 'workout_count':
+            user_challenge.current_progress += 1
+        elif challenge.challenge_type == 'streak':
+            user_challenge.current_progress = current_streak
+        elif challenge.challenge_type == 'weekly_goal' and workout.completed_at >= week_start:
+            # Count workouts this week
+            if weekly_count is None:
+                weekly_count = Workout.query.filter(
+                    Workout.user_id == user_id,
+                    Workout.completed_at >= week_start
+                ).count()
+            user_challenge.current_progress = weekly_count
+        
+        # Check if challenge is completed
+        if user_challenge.current_progress >= challenge.target_value:
+            user_challenge.is_completed = True
+            user_challenge.completed_at = datetime.utcnow()
+            record_challenge_completion(user_id, challenge)
+            
+            # Create achievement activity
+            db.session.add(Activity(
+                user_id=user_id,
+                activity_type='achievement',
+                title=f'🏆 Challenge Completed: {challenge.name}',
+                description=f'Earned {challenge.points_reward} points and {challenge.badge_name}',
+                points_earned=challenge.points_reward
+            ))
+    
+    # Advance workout-tracked goals
+    for goal_id, goal_title, target_value in apply_workout_to_goals(user_id, workout.workout_type, workout.duration_minutes):
+        record_goal_completion(user_id, goal_title, target_value)
@@ -0,0 +1,63 @@
+import csv
+import io
+from array import array
+from bisect import bisect_right
+
+
+def column_batches(connection, statement, typecodes, batch_size=10000):
+    """Stream a query's result as column batches instead of row objects.
+
+    ``typecodes`` has one entry per selected column: an ``array`` typecode
+    ('q' for integers, 'd' for floats), whose NULLs become 0, or None to keep
+    the values in a plain list (strings, dates). Rows are fetched through a
+    server-side cursor ``batch_size`` at a time, so memory is bounded by one
+    batch. Yields {column name: array or list}.
+    """
+    result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(statement)
+    names = list(result.keys())
+    if len(typecodes) != len(names):
+        raise ValueError(f'Expected {len(names)} typecodes, got {len(typecodes)}')
+    for partition in result.partitions():
+        batch = {}
+        for name, typecode, values in zip(names, typecodes, zip(*partition)):
+            batch[name] = array(typecode, [value or 0 for value in values]) if typecode else list(values)
+        yield batch
+
+
+def runs(batches, key):
+    """Regroup column batches sorted by ``key`` into one batch per key value.
+
+    Yields (key value, {column name: slice}); a run split across two input
+    batches is joined back together.
+    """
+    pending = None
+    for batch in batches:
+        keys = batch[key]
+        start = 0
+        while start < len(keys):
+            stop = bisect_right(keys, keys[start], start)
+            run = {name: column[start:stop] for name, column in batch.items()}
+            start = stop
+            if pending is not None:
+                if pending[key][0] == run[key][0]:
+                    for name, column in run.items():
+                        pending[name] += column
+                    continue
+                yield pending[key][0], pending
+            pending = run
+    if pending is not None:
+        yield pending[key][0], pending
+
+
+def csv_chunks(fields, rows, rows_per_chunk=1000):
+    """Encode rows as CSV text (header first), yielding one string per ``rows_per_chunk`` rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
@@ -0,0 +1,521 @@
+import atexit
+import hashlib
+import json
+import logging
+import os
+import smtplib
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.utils import formataddr
+
+from sqlalchemy import func, select, update
+
+from dal import upsert_statement
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)  # timestamps are naive UTC
+
+
+class Spool:
+    """Append-only spool of JSON records, one file per ``segment_seconds`` of wall-clock time.
+
+    Appending is a single ``write`` to a file opened with O_APPEND, so
+    threads and processes sharing the directory never interleave records and
+    no lock is taken. A segment is sealed once its time slot has passed (plus
+    ``grace`` for writes in flight); consumers claim sealed segments by
+    renaming them, which only one of them can win, and delete them once their
+    records are safely stored. A claim older than ``claim_timeout`` seconds is
+    assumed abandoned by a crashed consumer and can be claimed again.
+    """
+
+    def __init__(self, directory=None, segment_seconds=5, grace=1.0, claim_timeout=300):
+        self.directory = directory
+        self.segment_seconds = segment_seconds
+        self.grace = grace
+        self.claim_timeout = claim_timeout
+
+    def _segment(self, timestamp):
+        start = int(timestamp // self.segment_seconds * self.segment_seconds)
+        return f'{datetime.utcfromtimestamp(start):%Y%m%dT%H%M%S}.jsonl'
+
+    def append(self, record):
+        data = (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8')
+        path = os.path.join(self.directory, self._segment(time.time()))
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        except FileNotFoundError:
+            os.makedirs(self.directory, exist_ok=True)
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+    def claim(self):
+        """Claim every sealed or abandoned segment. Returns the claimed paths, oldest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        now = time.time()
+        open_segment = self._segment(now - self.grace)
+        claimed = []
+        for entry in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, entry)
+            if entry.endswith('.jsonl'):
+                if entry >= open_segment:
+                    continue
+                segment = entry
+            elif entry.endswith('.claimed'):
+                try:
+                    if now - os.path.getmtime(path) < self.claim_timeout:
+                        continue
+                except FileNotFoundError:
+                    continue
+                segment = entry.split('.jsonl.', 1)[0] + '.jsonl'
+            else:
+                continue
+            target = os.path.join(self.directory, f'{segment}.{os.getpid()}-{uuid.uuid4().hex[:8]}.claimed')
+            try:
+                os.rename(path, target)
+                os.utime(target)  # the claim's age, not the segment's last write
+            except OSError:
+                continue  # another consumer won
+            claimed.append(target)
+        return claimed
+
+    @staticmethod
+    def read(path):
+        """The records in a claimed segment; a torn last line (a writer that crashed mid-write) is skipped."""
+        with open(path, encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning('Skipping unreadable record %s:%d', path, number)
+
+    @staticmethod
+    def release(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def backlog(self):
+        """``(segments, bytes)`` waiting in the spool, claimed or not."""
+        if not os.path.isdir(self.directory):
+            return 0, 0
+        segments = size = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(('.jsonl', '.claimed')):
+                try:
+                    size += entry.stat().st_size
+                except FileNotFoundError:
+                    continue
+                segments += 1
+        return segments, size
+
+
+class ContactQueue:
+    """Contact form submissions: spooled on the request path, persisted and forwarded in batches.
+
+    ``submit`` only appends to the spool, so a burst of submissions costs
+    neither a database write lock nor a mail round trip per request. A worker
+    moves sealed spool segments into ``table`` in bulk INSERT ... ON CONFLICT
+    DO NOTHING statements keyed by ``dedup_key``, a hash of the sender,
+    subject, message and ``dedup_window`` slot: repeated submissions of the
+    same message and re-read segments collapse into one row. Stored messages
+    are then handed to ``sink`` in batches with at-least-once delivery: a
+    batch is leased (``available_at``) before the sink is called outside any
+    transaction; delivered messages are marked forwarded and each message
+    the sink reports as failed is retried on its own with exponential backoff.
+    """
+
+    def __init__(self, table, spool=None, sink=None, interval=2.0, batch_size=500,
+                 dedup_window=timedelta(hours=24), lease=60.0, max_attempts=8, retry_delay=30.0):
+        self.table = table
+        self.spool = spool or Spool()
+        self.sink = sink or LogSink()
+        self.interval = interval
+        self.batch_size = batch_size
+        self.dedup_window = dedup_window
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._metrics = {'submitted': 0, 'stored': 0, 'duplicates': 0, 'forwarded': 0, 'forward_failures': 0,
+                         'last_batch_at': None}
+
+    def init_app(self, app):
+        config = app.config
+        self.spool.directory = config.get('CONTACT_SPOOL_DIR') or os.path.join(app.instance_path, 'contact_spool')
+        self.spool.segment_seconds = config.get('CONTACT_SPOOL_SEGMENT_SECONDS', self.spool.segment_seconds)
+        self.interval = config.get('CONTACT_INTERVAL', self.interval)
+        self.batch_size = config.get('CONTACT_BATCH_SIZE', self.batch_size)
+        self.dedup_window = timedelta(hours=config.get('CONTACT_DEDUP_HOURS', self.dedup_window / timedelta(hours=1)))
+        self.sink = create_sink(config.get('CONTACT_SINK', 'log'), config, app.instance_path)
+        app.extensions['contact_queue'] = self
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._metrics[name] += amount
+
+    # Request path
+    def submit(self, name, email, subject, message, remote_addr=None):
+        """Spool one submission. Returns its id."""
+        submission_id = uuid.uuid4().hex
+        self.spool.append({'id': submission_id, 'name': name, 'email': email, 'subject': subject,
+                           'message': message, 'remote_addr': remote_addr,
+                           'submitted_at': datetime.utcnow().isoformat()})
+        self._count('submitted')
+        return submission_id
+
+    # Persisting
+    def dedup_key(self, record, submitted_at):
+        slot = int((submitted_at - EPOCH).total_seconds() // self.dedup_window.total_seconds())
+        content = '\x1f'.join([record['email'].strip().lower(), ' '.join(record['subject'].split()),
+                               ' '.join(record['message'].split()), str(slot)])
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def _store(self, engine, records):
+        now = datetime.utcnow()
+        rows = []
+        for record in records:
+            submitted_at = datetime.fromisoformat(record['submitted_at'])
+            rows.append({'dedup_key': self.dedup_key(record, submitted_at), 'name': record['name'],
+                         'email': record['email'], 'subject': record['subject'], 'message': record['message'],
+                         'remote_addr': record.get('remote_addr'), 'submitted_at': submitted_at,
+                         'received_at': now, 'available_at': now, 'attempts': 0})
+        with engine.begin() as connection:
+            stored = connection.execute(upsert_statement(engine, self.table, ['dedup_key']), rows).rowcount
+        self._count('stored', stored)
+        self._count('duplicates', len(rows) - stored)
+        return stored
+
+    def persist(self, engine):
+        """Move every sealed spool segment into the table. Returns ``(stored, duplicates)``."""
+        stored = total = 0
+        for path in self.spool.claim():
+            batch = []
+            for record in self.spool.read(path):
+                batch.append(record)
+                if len(batch) == self.batch_size:
+                    stored += self._store(engine, batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                stored += self._store(engine, batch)
+                total += len(batch)
+            # Only now are its records stored; a crash before this re-reads the segment and the key dedupes it
+            self.spool.release(path)
+        return stored, total - stored
+
+    # Forwarding
+    def forward_batch(self, engine):
+        """Lease up to batch_size unforwarded messages and hand them to the sink. Returns the number forwarded."""
+        t = self.table
+        now = datetime.utcnow()
+        pending = select(t.c.id).where(
+            t.c.forwarded_at.is_(None), t.c.available_at <= now, t.c.attempts < self.max_attempts
+        ).order_by(t.c.id).limit(self.batch_size)
+        with engine.begin() as connection:
+            messages = connection.execute(
+                update(t).where(t.c.id.in_(pending.scalar_subquery()), t.c.forwarded_at.is_(None))
+                .values(attempts=t.c.attempts + 1, available_at=now + timedelta(seconds=self.lease))
+                .returning(t.c.id, t.c.name, t.c.email, t.c.subject, t.c.message, t.c.remote_addr,
+                           t.c.submitted_at, t.c.attempts)
+            ).all()
+        if not messages:
+            return 0
+        messages.sort(key=lambda message: message.id)
+        try:
+            failures = self.sink.send(messages) or {}
+        except Exception as exc:
+            logger.exception('Forwarding %d contact messages failed', len(messages))
+            failures = {message.id: exc for message in messages}
+        forwarded = [message.id for message in messages if message.id not in failures]
+        with engine.begin() as connection:
+            if forwarded:
+                connection.execute(update(t).where(t.c.id.in_(forwarded)).values(forwarded_at=datetime.utcnow()))
+            # Each failed message backs off on its own, so one bad message doesn't hold back its batch
+            for message in messages:
+                if message.id in failures:
+                    delay = self.retry_delay * 2 ** (message.attempts - 1)
+                    connection.execute(update(t).where(t.c.id == message.id).values(
+                        last_error=repr(failures[message.id])[:500],
+                        available_at=datetime.utcnow() + timedelta(seconds=delay)))
+        self._count('forwarded', len(forwarded))
+        self._count('forward_failures', len(failures))
+        return len(forwarded)
+
+    def process(self, engine):
+        """Persist the spool, then forward until nothing is due. Returns ``(stored, duplicates, forwarded)``."""
+        stored, duplicates = self.persist(engine)
+        forwarded = 0
+        while True:
+            count = self.forward_batch(engine)
+            forwarded += count
+            if count < self.batch_size:
+                break
+        with self._lock:
+            self._metrics['last_batch_at'] = datetime.utcnow()
+        return stored, duplicates, forwarded
+
+    # Metrics
+    def stats(self, session):
+        """Spool backlog and unforwarded messages plus this process's counters."""
+        t = self.table
+        row = session.execute(select(
+            func.count().filter(t.c.attempts < self.max_attempts),
+            func.count().filter(t.c.attempts >= self.max_attempts),
+        ).where(t.c.forwarded_at.is_(None))).one()
+        segments, size = self.spool.backlog()
+        with self._lock:
+            metrics = dict(self._metrics)
+        if metrics['last_batch_at']:
+            metrics['last_batch_at'] = metrics['last_batch_at'].isoformat()
+        metrics.update({
+            'spool_segments': segments,
+            'spool_bytes': size,
+            'forward_pending': row[0],
+            'forward_dead': row[1],
+            'worker_running': self._thread is not None and self._thread.is_alive(),
+        })
+        return metrics
+
+    # Background worker
+    def run(self, engine):
+        """Worker loop: process the spool every ``interval`` seconds until stopped."""
+        while not self._stop.wait(self.interval):
+            try:
+                self.process(engine)
+            except Exception:
+                logger.exception('Contact queue batch failed')
+
+    def start(self, engine):
+        """Start the worker thread (idempotent) and process once more at interpreter exit."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self.run, args=(engine,), name='contact-queue', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop, engine)
+
+    def stop(self, engine):
+        self._stop.set()
+        try:
+            self.process(engine)
+        except Exception:
+            logger.exception('Contact queue batch failed at exit')
+
+
+class RateLimiter:
+    """At most ``limit`` events per ``window`` seconds for each key (sliding window, this process only)."""
+
+    def __init__(self, limit=5, window=600.0):
+        self.limit = limit
+        self.window = window
+        self._events = {}  # key -> deque of monotonic timestamps
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    def allow(self, *keys):
+        """Record one event for every key and return True, unless any key is over its limit."""
+        now = time.monotonic()
+        with self._lock:
+            windows = []
+            for key in keys:
+                events = self._events.setdefault(key, deque())
+                while events and events[0] <= now - self.window:
+                    events.popleft()
+                if len(events) >= self.limit:
+                    return False
+                windows.append(events)
+            for events in windows:
+                events.append(now)
+            self._calls += 1
+            if self._calls % 1000 == 0:
+                # Forget keys that have gone quiet, so one-off senders don't accumulate
+                self._events = {key: events for key, events in self._events.items()
+                                if events and events[-1] > now - self.window}
+            return True
+
+
+# Sinks - where stored messages are forwarded. ``send(messages)`` returns {message id: exception} for the
+# messages it could not deliver (retried on their own) or raises when none of them went out
+class LogSink:
+    """Log each message (development)."""
+
+    def send(self, messages):
+        for message in messages:
+            logger.info('Contact message %d from %s <%s>: %s', message.id, message.name, message.email, message.subject)
+
+
+class FileSink:
+    """Append each message as a JSON line to a local file (testing and benchmarks)."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, messages):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for message in messages:
+                f.write(json.dumps(dict(message._asdict(), submitted_at=message.submitted_at.isoformat())) + '\n')
+
+
+class SMTPSink:
+    """Mail each message to ``recipient`` over one SMTP connection per batch, replying to the sender."""
+
+    def __init__(self, host, port=587, sender=None, recipient=None, username=None, password=None, starttls=True):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipient = recipient
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+
+    def send(self, messages):
+        with smtplib.SMTP(self.host, self.port, timeout=30) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            failures = {}
+            for index, message in enumerate(messages):
+                try:
+                    smtp.send_message(self.mail(message))
+                except (ValueError, smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as exc:
+                    # This message can't be built or was refused; the rest of the batch still goes out
+                    failures[message.id] = exc
+                except OSError as exc:
+                    # Connection lost: what was sent stays sent, the rest are retried
+                    failures.update((rest.id, exc) for rest in messages[index:])
+                    break
+        return failures
+
+    def mail(self, message):
+        mail = EmailMessage()
+        mail['From'] = self.sender
+        mail['To'] = self.recipient
+        mail['Reply-To'] = formataddr((message.name, message.email))
+        mail['Subject'] = f'[Contact] {message.subject}'
+        mail.set_content(f'{message.message}\n\n-- \n{message.name} <{message.email}>, '
+                         f'{message.submitted_at:%Y-%m-%d %H:%M} UTC from {message.remote_addr}')
+        return mail
+
+
+SINKS = {
+    'log': lambda config, instance_path: LogSink(),
+    'file': lambda config, instance_path: FileSink(
+        config.get('CONTACT_SINK_FILE') or os.path.join(instance_path, 'contact_inbox.jsonl')),
+    'smtp': lambda config, instance_path: SMTPSink(
+        config['CONTACT_SMTP_HOST'], config.get('CONTACT_SMTP_PORT', 587), config['CONTACT_EMAIL_FROM'],
+        config['CONTACT_EMAIL_TO'], config.get('CONTACT_SMTP_USERNAME'), config.get('CONTACT_SMTP_PASSWORD'),
+        config.get('CONTACT_SMTP_STARTTLS', True)),
+}
+
+
+def create_sink(name, config, instance_path):
+    """A sink by name (see SINKS), or ``name`` itself if it is already an object with ``send``."""
+    if hasattr(name, 'send'):
+        return name
+    try:
+        return SINKS[name](config, instance_path)
+    except KeyError:
+        raise ValueError(f'Unknown contact sink: {name}')
+
+
+# Benchmark
+def run_benchmark(table, directory, submissions=20_000, threads=8, duplicate_rate=0.1, burst=1_000, seed=42):
+    """Compare spooled submissions with one INSERT per submission and time the worker, on scratch SQLite files."""
+    import random
+    from sqlalchemy import create_engine, insert
+
+    rng = random.Random(seed)
+    records = []
+    for i in range(submissions):
+        if records and rng.random() < duplicate_rate:
+            records.append(dict(rng.choice(records)))  # a resubmitted form
+            continue
+        records.append({'name': f'Visitor {i}', 'email': f'visitor{i % 5000}@example.com',
+                        'subject': rng.choice(['Pricing', 'Partnership', 'Bug report', 'Coaching']),
+                        'message': ' '.join(rng.choices(['train', 'plan', 'coach', 'team', 'help', 'goal'], k=60)),
+                        'remote_addr': f'10.0.{i % 250}.{i % 200}'})
+    chunks = [records[i::threads] for i in range(threads)]
+
+    def concurrently(f):
+        workers = [threading.Thread(target=f, args=(chunk,)) for chunk in chunks]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return time.perf_counter() - started
+
+    def engine_at(name):
+        engine = create_engine(f'sqlite:///{os.path.join(directory, name)}')
+        table.create(engine)
+        return engine
+
+    results = {'submissions': submissions, 'threads': threads}
+
+    # Baseline: the request path writes its own row and commits
+    engine = engine_at('direct.db')
+    now = datetime.utcnow()
+
+    def insert_each(chunk):
+        for record in chunk:
+            with engine.begin() as connection:
+                connection.execute(insert(table).values(
+                    dedup_key=uuid.uuid4().hex, submitted_at=now, received_at=now, available_at=now, attempts=0,
+                    **record))
+
+    elapsed = concurrently(insert_each)
+    results['direct_insert_per_sec'] = round(submissions / elapsed)
+    engine.dispose()
+
+    # Spooled: the request path appends a line; the worker stores, dedupes and forwards in batches
+    queue = ContactQueue(table, Spool(os.path.join(directory, 'spool'), segment_seconds=1, grace=0.2),
+                         FileSink(os.path.join(directory, 'inbox.jsonl')))
+
+    def submit_each(chunk):
+        for record in chunk:
+            queue.submit(**record)
+
+    elapsed = concurrently(submit_each)
+    results['spool_submit_per_sec'] = round(submissions / elapsed)
+    results['spool_bytes'] = queue.spool.backlog()[1]
+
+    engine = engine_at('queued.db')
+    time.sleep(queue.spool.segment_seconds + queue.spool.grace)  # let the last segment seal
+    started = time.perf_counter()
+    stored, duplicates = queue.persist(engine)
+    results['persist_per_sec'] = round(submissions / (time.perf_counter() - started))
+    results['stored'] = stored
+    results['duplicates'] = duplicates
+    started = time.perf_counter()
+    forwarded = 0
+    while True:
+        count = queue.forward_batch(engine)
+        forwarded += count
+        if not count:
+            break
+    results['forward_per_sec'] = round(forwarded / (time.perf_counter() - started)) if forwarded else 0
+    results['forwarded'] = forwarded
+    engine.dispose()
+
+    # Spam burst: one client address submitting as fast as it can
+    limiter = RateLimiter(limit=5, window=600)
+    started = time.perf_counter()
+    accepted = sum(limiter.allow(('remote_addr', '203.0.113.7'), ('email', f'bot{i}@example.com'))
+                   for i in range(burst))
+    results['burst_accepted'] = f'{accepted}/{burst}'
+    results['rate_limit_check_us'] = round((time.perf_counter() - started) / burst * 1e6, 2)
+    return results
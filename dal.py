@@ -0,0 +1,160 @@
+import logging
+
+from sqlalchemy import event, inspect, select, text
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.dialects import postgresql, sqlite
+
+logger = logging.getLogger(__name__)
+
+# Dialect-specific INSERT constructs that support ON CONFLICT
+INSERTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+
+def _insert_for(bind):
+    try:
+        return INSERTS[bind.dialect.name]
+    except KeyError:
+        raise NotImplementedError(f'Upserts are not supported on {bind.dialect.name}')
+
+
+def upsert_statement(bind, table, index_elements, update_columns=(), increment_columns=(), where=None):
+    """Build an INSERT ... ON CONFLICT statement for the bind's dialect.
+
+    ``update_columns`` are overwritten with the new row's values and
+    ``increment_columns`` are added to the stored value in SQL; with ``where``
+    only a stored row matching it is updated. With neither column list,
+    conflicting rows are left untouched (ON CONFLICT DO NOTHING).
+    """
+    stmt = _insert_for(bind)(table)
+    set_ = {column: stmt.excluded[column] for column in update_columns}
+    set_.update({column: table.c[column] + stmt.excluded[column] for column in increment_columns})
+    if not set_:
+        return stmt.on_conflict_do_nothing(index_elements=list(index_elements))
+    return stmt.on_conflict_do_update(index_elements=list(index_elements), set_=set_, where=where)
+
+
+def upsert(session, table, values, index_elements, update_columns=(), increment_columns=()):
+    """Insert one row or list of rows, resolving conflicts atomically. Returns the affected row count."""
+    stmt = upsert_statement(session.get_bind(), table, index_elements, update_columns, increment_columns)
+    return session.execute(stmt, values).rowcount
+
+
+def insert_or_ignore(session, table, values, index_elements):
+    """Insert a row unless one with the same key exists. Returns True if this call inserted it."""
+    return upsert(session, table, values, index_elements) > 0
+
+
+def get_or_create(session, model, **keys):
+    """Fetch a row by its unique key, inserting it first if it does not exist.
+
+    The common case is a single SELECT; the insert path is race-free because
+    concurrent inserts of the same key collapse in ON CONFLICT DO NOTHING.
+    Returns ``(instance, created)``; the caller commits.
+    """
+    instance = session.query(model).filter_by(**keys).first()
+    if instance is not None:
+        return instance, False
+    created = insert_or_ignore(session, model.__table__, keys, list(keys))
+    return session.query(model).filter_by(**keys).one(), created
+
+
+def duplicate_rows(session, table, index):
+    """Ids of the rows that repeat an older row's key under the unique ``index`` (all but the oldest per key)."""
+    columns = ', '.join(column.name for column in index.columns)
+    return session.execute(text(
+        f'SELECT id FROM {table.name} WHERE id NOT IN (SELECT MIN(id) FROM {table.name} GROUP BY {columns})'
+    )).scalars().all()
+
+
+def create_missing_indexes(session, table):
+    """Add the indexes declared on ``table`` that an existing database lacks.
+
+    Tables created before a unique index was declared may hold duplicates;
+    such an index is left out rather than built over them. Returns
+    {index name: duplicate row count} for the indexes left out, which
+    ``remove_duplicates`` can then clear.
+    """
+    bind = session.get_bind()
+    existing = {index['name'] for index in inspect(bind).get_indexes(table.name)}
+    blocked = {}
+    for index in table.indexes:
+        if index.name in existing:
+            continue
+        if index.unique:
+            duplicates = duplicate_rows(session, table, index)
+            if duplicates:
+                logger.warning(f'{index.name} not created: {len(duplicates)} duplicate rows in {table.name}')
+                blocked[index.name] = len(duplicates)
+                continue
+        index.create(bind)
+    return blocked
+
+
+def blocking_duplicates(session, table):
+    """{index name: duplicate row ids} for each unique index ``table`` lacks that duplicates keep from being built."""
+    existing = {index['name'] for index in inspect(session.get_bind()).get_indexes(table.name)}
+    blocking = {}
+    for index in table.indexes:
+        if index.unique and index.name not in existing:
+            ids = duplicate_rows(session, table, index)
+            if ids:
+                blocking[index.name] = ids
+    return blocking
+
+
+def remove_duplicates(session, table):
+    """Delete the rows that block the unique indexes ``table`` lacks, keeping the oldest per key.
+
+    Rows referencing a deleted row go with it where their foreign key cascades.
+    Returns {index name: deleted ids}; the caller commits, then builds the
+    indexes with ``create_missing_indexes``.
+    """
+    removed = blocking_duplicates(session, table)
+    for name, ids in removed.items():
+        for start in range(0, len(ids), 500):  # stay under the bound-parameter limit
+            session.execute(table.delete().where(table.c.id.in_(ids[start:start + 500])))
+        logger.warning(f'Removed {len(ids)} duplicate rows from {table.name} for {name}: ids {ids}')
+    return removed
+
+
+def add_missing_columns(session, table):
+    """Add the columns declared on ``table`` that an existing database lacks.
+
+    Only for additive changes: new columns need a server default (or must be
+    nullable) so existing rows get a value. Returns the names of the columns added.
+    """
+    bind = session.get_bind()
+    existing = {column['name'] for column in inspect(bind).get_columns(table.name)}
+    added = []
+    for column in table.columns:
+        if column.name in existing:
+            continue
+        session.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {CreateColumn(column).compile(dialect=bind.dialect)}'))
+        added.append(column.name)
+    session.commit()
+    return added
+
+
+def delete_chunk(session, table, condition, limit):
+    """Delete up to ``limit`` rows matching ``condition`` in one statement. Returns the deleted ids.
+
+    Callers commit between chunks, so deleting millions of rows never holds
+    the write lock for longer than one chunk takes.
+    """
+    ids = select(table.c.id).where(condition).limit(limit).scalar_subquery()
+    return session.execute(table.delete().where(table.c.id.in_(ids)).returning(table.c.id)).scalars().all()
+
+
+def enable_sqlite_foreign_keys(engine):
+    """Turn on foreign key enforcement (and ON DELETE actions) for every new SQLite connection."""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys = ON')
+        cursor.close()
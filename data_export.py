@@ -0,0 +1,70 @@
+import json
+import zipfile
+from datetime import date, datetime
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'Cannot export {type(value).__name__}')
+
+
+def _section_chunks(connection, statement, batch_size, extra=None):
+    """NDJSON text for one statement, ``batch_size`` rows per chunk, read through a server-side cursor."""
+    result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(statement)
+    for partition in result.mappings().partitions():
+        yield ''.join(json.dumps({**(extra or {}), **row}, default=_json_default) + '\n' for row in partition)
+
+
+def ndjson_export(connection, sections, batch_size=1000):
+    """Stream ``sections`` - (name, statement) pairs - as one NDJSON document.
+
+    Every line is one row with a ``type`` key naming its section. Rows are
+    never all in memory: each statement is read ``batch_size`` rows at a time
+    and each batch is yielded as soon as it is encoded.
+    """
+    for name, statement in sections:
+        yield from _section_chunks(connection, statement, batch_size, {'type': name})
+
+
+class _ChunkWriter:
+    """Write-only file object whose contents are taken with ``drain()``.
+
+    It cannot seek, so zipfile writes each member with a data descriptor and
+    never goes back to patch a header - the archive can be sent as it is built.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.offset = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def zip_export(connection, sections, batch_size=1000):
+    """Stream ``sections`` as a zip archive with one ``<name>.ndjson`` member per section. Yields bytes."""
+    out = _ChunkWriter()
+    with zipfile.ZipFile(out, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, statement in sections:
+            # Sizes are unknown up front, so allow members over 2 GiB
+            with archive.open(f'{name}.ndjson', 'w', force_zip64=True) as member:
+                for chunk in _section_chunks(connection, statement, batch_size):
+                    member.write(chunk.encode('utf-8'))
+                    data = out.drain()
+                    if data:
+                        yield data
+    yield out.drain()
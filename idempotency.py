@@ -0,0 +1,146 @@
+import functools
+import hashlib
+import json
+import secrets
+import time
+from datetime import datetime, timedelta
+
+from flask import Response, flash, jsonify, make_response, request, session
+
+from dal import upsert_statement
+
+HEADER = 'Idempotency-Key'
+FORM_FIELD = 'idempotency_key'
+MAX_KEY_LENGTH = 64
+
+
+def new_key():
+    """A fresh key for a form (the ``idempotency_key()`` template global)."""
+    return secrets.token_urlsafe(16)
+
+
+def request_key():
+    """The key sent with the current request, from the header or the hidden form field, or None."""
+    return (request.headers.get(HEADER) or request.form.get(FORM_FIELD) or '').strip() or None
+
+
+def request_fingerprint():
+    """Hash of what the request asks for, so a key reused for a different submission is caught."""
+    fields = sorted((name, value) for name, value in request.form.items(multi=True) if name != FORM_FIELD)
+    body = json.dumps([request.method, request.path, fields])
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+class IdempotencyKeys:
+    """Per-user idempotency keys for POST routes, kept for ``ttl``.
+
+    The first request with a key claims it with one INSERT ... ON CONFLICT
+    in the same transaction as the route's own writes, so the key exists
+    exactly when those writes were committed; concurrent requests with the
+    same key block on the unique index until the first one finishes. Its
+    response (status, redirect, flashed messages) is then stored, and later
+    requests with the key get that response back without running the route:
+    a double-tapped or retried submission costs two statements and no write.
+    """
+
+    def __init__(self, table, ttl=timedelta(hours=24), wait=5.0):
+        self.table = table
+        self.ttl = ttl
+        self.wait = wait  # how long a replay waits for the first request's response
+
+    def init_app(self, app):
+        self.ttl = timedelta(hours=app.config.get('IDEMPOTENCY_KEY_TTL_HOURS', self.ttl.total_seconds() / 3600))
+        app.jinja_env.globals['idempotency_key'] = new_key
+        app.extensions['idempotency_keys'] = self
+
+    def claim(self, session, user_id, key, fingerprint):
+        """Claim ``key`` in the caller's transaction. False if a live request already holds it.
+
+        An expired key is taken over in the same statement.
+        """
+        t = self.table
+        now = datetime.utcnow()
+        stmt = upsert_statement(
+            session.get_bind(), t, ['user_id', 'key'],
+            update_columns=['fingerprint', 'status_code', 'location', 'mimetype', 'body', 'flashes',
+                            'created_at', 'expires_at'],
+            where=t.c.expires_at <= now,
+        )
+        return session.execute(stmt, {
+            'user_id': user_id, 'key': key, 'fingerprint': fingerprint, 'status_code': None, 'location': None,
+            'mimetype': None, 'body': None, 'flashes': None, 'created_at': now, 'expires_at': now + self.ttl,
+        }).rowcount > 0
+
+    def lookup(self, session, user_id, key):
+        t = self.table
+        return session.execute(t.select().where(t.c.user_id == user_id, t.c.key == key)).first()
+
+    def record(self, session, user_id, key, response, flashes):
+        """Store the response to a claimed key and commit."""
+        t = self.table
+        redirect = 300 <= response.status_code < 400
+        session.execute(t.update().where(t.c.user_id == user_id, t.c.key == key).values(
+            status_code=response.status_code,
+            location=response.headers.get('Location'),
+            mimetype=response.mimetype,
+            body=None if redirect or response.is_streamed else response.get_data(as_text=True),
+            flashes=json.dumps(flashes),
+        ))
+        session.commit()
+
+    def replay(self, session, user_id, key, fingerprint):
+        """The stored response to ``key``, waiting briefly for one still in progress."""
+        session.rollback()  # release the write lock the failed claim took
+        row = self.lookup(session, user_id, key)
+        if row is not None and row.fingerprint != fingerprint:
+            return jsonify({'error': f'{HEADER} was already used for a different request'}), 422
+        deadline = time.monotonic() + self.wait
+        while (row is None or row.status_code is None) and time.monotonic() < deadline:
+            time.sleep(0.05)
+            session.rollback()  # end the read so the next one sees the first request's commit
+            row = self.lookup(session, user_id, key)
+        if row is None or row.status_code is None:
+            return jsonify({'error': f'A request with this {HEADER} is still in progress'}), 409
+
+        for category, message in json.loads(row.flashes or '[]'):
+            flash(message, category)
+        response = Response(row.body, status=row.status_code, mimetype=row.mimetype)
+        if row.location:
+            response.headers['Location'] = row.location
+        response.headers['Idempotent-Replayed'] = 'true'
+        return response
+
+    def purge(self, session):
+        """Delete expired keys. Returns the number deleted."""
+        t = self.table
+        deleted = session.execute(t.delete().where(t.c.expires_at <= datetime.utcnow())).rowcount
+        session.commit()
+        return deleted
+
+    def decorator(self, db_session, user_id):
+        """Make POST views replay their first response for a repeated key.
+
+        ``user_id()`` returns the signed-in user, or None; requests without a
+        user or without a key run the view as before. The view commits its
+        own writes, and the key claim commits with them; if it rolls back,
+        the claim goes too and a retry runs the view again.
+        """
+        def wrap(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                key = request_key()
+                owner = user_id()
+                if key is None or owner is None or request.method != 'POST':
+                    return view(*args, **kwargs)
+                if len(key) > MAX_KEY_LENGTH:
+                    return jsonify({'error': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters'}), 400
+
+                fingerprint = request_fingerprint()
+                if not self.claim(db_session, owner, key, fingerprint):
+                    return self.replay(db_session, owner, key, fingerprint)
+                flashed = len(session.get('_flashes', []))
+                response = make_response(view(*args, **kwargs))
+                self.record(db_session, owner, key, response, session.get('_flashes', [])[flashed:])
+                return response
+            return wrapper
+        return wrap
@@ -0,0 +1,67 @@
+from collections import namedtuple
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# A half-open [start, end) interval of naive UTC datetimes, comparable with stored timestamps
+Range = namedtuple('Range', ['start', 'end'])
+
+
+def get_zone(name, default='UTC'):
+    """The ZoneInfo for an IANA name such as 'Europe/Berlin', falling back to ``default``."""
+    try:
+        return ZoneInfo(name) if name else ZoneInfo(default)
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo(default)
+
+
+def is_valid_zone(name):
+    try:
+        ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError, TypeError):
+        return False
+    return True
+
+
+class Calendar:
+    """A user's local calendar at one instant, as UTC ranges for database filters.
+
+    Timestamps are stored as naive UTC, so "today" or "this week" for a user
+    is a range of UTC instants whose bounds depend on their time zone (and on
+    DST). The common ranges are computed once when the calendar is built;
+    filtering with ``column >= range.start, column < range.end`` keeps every
+    date filter an index range scan instead of a function of the column.
+    """
+
+    def __init__(self, zone, now=None):
+        self.zone = zone if isinstance(zone, ZoneInfo) else get_zone(zone)
+        self.now_utc = now or datetime.utcnow()
+        self.now = self.now_utc.replace(tzinfo=timezone.utc).astimezone(self.zone)
+        self.today = self.now.date()
+
+        week_start = self.today - timedelta(days=self.today.weekday())
+        month_start = self.today.replace(day=1)
+        next_month = (month_start + timedelta(days=32)).replace(day=1)
+        self.day = self.days(self.today, 1)
+        self.week = self.days(week_start, 7)  # Monday to Sunday
+        self.month = Range(self.midnight(month_start), self.midnight(next_month))
+
+    def midnight(self, day):
+        """The naive UTC instant at which the local ``day`` starts."""
+        return datetime.combine(day, time(), tzinfo=self.zone).astimezone(timezone.utc).replace(tzinfo=None)
+
+    def days(self, first_day, count):
+        """The Range covering ``count`` local days from ``first_day``."""
+        return Range(self.midnight(first_day), self.midnight(first_day + timedelta(days=count)))
+
+    def since_days_ago(self, count):
+        """From the start of the local day ``count`` days ago until the end of today."""
+        return Range(self.midnight(self.today - timedelta(days=count)), self.day.end)
+
+    def local(self, utc_timestamp):
+        """A stored naive UTC timestamp as an aware datetime in the user's zone."""
+        if utc_timestamp is None:
+            return None
+        return utc_timestamp.replace(tzinfo=timezone.utc).astimezone(self.zone)
+
+    def local_date(self, utc_timestamp):
+        return self.local(utc_timestamp).date()
@@ -0,0 +1,186 @@
+import bisect
+import math
+import threading
+import time
+from collections import namedtuple
+
+from flask import g, request
+
+# Request latency buckets in seconds (upper bounds; a final +Inf bucket is implied)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Metric = namedtuple('Metric', ['name', 'kind', 'help', 'buckets'])
+# A value computed when metrics are read (database size, backlog, ...): samples are [(labels dict, value)]
+Sample = namedtuple('Sample', ['name', 'kind', 'help', 'samples'])
+
+
+class MetricsRegistry:
+    """In-process counters and fixed-bucket histograms, cheap enough for every request.
+
+    Each thread writes to a shard of its own, so recording takes no lock: a
+    counter is one dict update and a histogram observation a bisect plus two
+    list updates. Reading sums the shards; shards of threads that have exited
+    are folded into a retired total so short-lived request threads don't
+    accumulate. Gauges that cost a query (database size, row counts, job lag)
+    are registered as collectors and only run when metrics are read.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+        self.started_at = time.time()
+        self._local = threading.local()
+        self._shards = []  # (thread, shard)
+        self._retired = {}
+        self._lock = threading.Lock()  # taken when a thread creates its shard and when reading
+
+    def counter(self, name, help):
+        self.metrics[name] = Metric(name, 'counter', help, None)
+
+    def histogram(self, name, help, buckets=DEFAULT_BUCKETS):
+        self.metrics[name] = Metric(name, 'histogram', help, tuple(buckets))
+
+    def collector(self, f):
+        """Register ``f()`` returning a list of Sample, run on every read (usable as a decorator)."""
+        self.collectors.append(f)
+        return f
+
+    # Recording
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        shard = self._shard()
+        shard[key] = shard.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        shard = self._shard()
+        buckets = self.metrics[name].buckets
+        counts = shard.get(key)
+        if counts is None:
+            counts = shard[key] = [0] * (len(buckets) + 1) + [0.0]  # one count per bucket and +Inf, then the sum
+        counts[bisect.bisect_left(buckets, value)] += 1
+        counts[-1] += value
+
+    # Reading
+    @staticmethod
+    def _merge(total, shard):
+        for key, value in list(shard.items()):
+            if isinstance(value, list):
+                merged = total.get(key)
+                total[key] = list(value) if merged is None else [a + b for a, b in zip(merged, value)]
+            else:
+                total[key] = total.get(key, 0) + value
+
+    def values(self):
+        """{(name, labels): value} summed over every thread; a histogram's value is its bucket counts plus sum."""
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    self._merge(self._retired, shard)
+            self._shards = live
+            total = {key: list(value) if isinstance(value, list) else value for key, value in self._retired.items()}
+        for _, shard in live:
+            self._merge(total, shard)
+        return total
+
+    def collect(self):
+        """Every collector's samples; a failing collector is skipped."""
+        samples = []
+        for collector in self.collectors:
+            try:
+                samples.extend(collector())
+            except Exception as exc:
+                samples.append(Sample('collector_errors', 'gauge', 'Collectors that failed on this read',
+                                      [({'collector': collector.__name__, 'error': type(exc).__name__}, 1)]))
+        return samples
+
+    def prometheus(self, prefix=''):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        values = self.values()
+        for metric in self.metrics.values():
+            name = prefix + metric.name
+            lines.append(f'# HELP {name} {metric.help}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for (key_name, labels), value in sorted(values.items()):
+                if key_name != metric.name:
+                    continue
+                if metric.kind == 'counter':
+                    lines.append(f'{name}{_labels(labels)} {_number(value)}')
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (math.inf,), value[:-1]):
+                    cumulative += count
+                    le = '+Inf' if bound == math.inf else _number(bound)
+                    lines.append(f'{name}_bucket{_labels(labels + (("le", le),))} {cumulative}')
+                lines.append(f'{name}_sum{_labels(labels)} {_number(value[-1])}')
+                lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+        for sample in self.collect():
+            name = prefix + sample.name
+            lines.append(f'# HELP {name} {sample.help}')
+            lines.append(f'# TYPE {name} {sample.kind}')
+            for labels, value in sample.samples:
+                lines.append(f'{name}{_labels(tuple(sorted(labels.items())))} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+    # Flask integration - request counts and latency per endpoint
+    def init_app(self, app):
+        self.counter('http_requests_total', 'HTTP requests by endpoint, method and status')
+        self.histogram('http_request_duration_seconds', 'Time from request start to response, by endpoint')
+        app.extensions['metrics'] = self
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    @staticmethod
+    def _start_request():
+        g.request_started = time.perf_counter()
+
+    def _finish_request(self, response):
+        started = g.get('request_started')
+        if started is not None:
+            endpoint = request.endpoint or 'unknown'
+            self.inc('http_requests_total', endpoint=endpoint, method=request.method, status=str(response.status_code))
+            self.observe('http_request_duration_seconds', time.perf_counter() - started, endpoint=endpoint)
+        return response
+
+
+def histogram_quantile(buckets, counts, q):
+    """Estimate the ``q`` quantile from bucket counts (the last count being +Inf) by linear interpolation."""
+    total = sum(counts)
+    if not total:
+        return None
+    rank = q * total
+    lower = 0.0
+    seen = 0
+    for bound, count in zip(buckets + (math.inf,), counts):
+        if seen + count >= rank:
+            if bound == math.inf:
+                return lower
+            return lower + (bound - lower) * (rank - seen) / count if count else lower
+        seen += count
+        lower = bound
+    return lower
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(value) if math.isfinite(value) else ('+Inf' if value > 0 else '-Inf' if value < 0 else 'NaN')
+    return str(value)
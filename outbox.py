@@ -0,0 +1,191 @@
+import atexit
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, func, insert, select, update
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+class Outbox:
+    """Transactional outbox for the side effects of user actions.
+
+    Routes publish an event in the same transaction as their primary write,
+    so an event exists exactly when the change it describes was committed.
+    A background worker applies events in batches with at-least-once
+    delivery: an event stays pending until the transaction holding its
+    handler's writes commits, and each event is marked processed inside that
+    transaction, so a retried or concurrently claimed event takes effect once.
+    """
+
+    def __init__(self, table, interval=2.0, batch_size=100, max_attempts=5, retry_delay=10.0):
+        self.table = table
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.handlers = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._metrics = {'processed': 0, 'failed': 0, 'batches': 0,
+                         'last_batch_at': None, 'last_lag_seconds': None, 'max_lag_seconds': 0.0}
+
+        # Wake the worker as soon as a transaction that published events commits
+        event.listen(Session, 'after_commit', self._after_commit)
+
+    def init_app(self, app):
+        self.interval = app.config.get('OUTBOX_INTERVAL', self.interval)
+        self.batch_size = app.config.get('OUTBOX_BATCH_SIZE', self.batch_size)
+        app.extensions['outbox'] = self
+
+    def handler(self, event_type):
+        """Register ``f(**payload)`` as the handler for ``event_type``; it runs in the worker's transaction."""
+        def decorator(f):
+            self.handlers[event_type] = f
+            return f
+        return decorator
+
+    def publish(self, session, event_type, **payload):
+        """Add an event to the caller's transaction. It is applied after that transaction commits."""
+        if event_type not in self.handlers:
+            raise ValueError(f'No outbox handler for {event_type}')
+        now = datetime.utcnow()
+        session.execute(insert(self.table).values(
+            event_type=event_type, payload=json.dumps(payload), created_at=now, available_at=now
+        ))
+        session.info['outbox_published'] = True
+
+    def _after_commit(self, session):
+        if session.info.pop('outbox_published', False):
+            self._wake.set()
+
+    # Processing
+    def _pending(self, now):
+        t = self.table
+        return select(t.c.id).where(
+            t.c.processed_at.is_(None),
+            t.c.available_at <= now,
+            t.c.attempts < self.max_attempts
+        ).order_by(t.c.id).limit(self.batch_size)
+
+    def process_batch(self, session):
+        """Apply up to batch_size pending events in one transaction. Returns the number claimed."""
+        t = self.table
+        now = datetime.utcnow()
+        # Claiming bumps the delivery count and takes the write lock, so concurrent workers never share a batch
+        claimed = session.execute(
+            update(t).where(t.c.id.in_(self._pending(now).scalar_subquery()), t.c.processed_at.is_(None))
+            .values(attempts=t.c.attempts + 1)
+            .returning(t.c.id, t.c.event_type, t.c.payload, t.c.created_at, t.c.attempts)
+        ).all()
+        if not claimed:
+            session.rollback()
+            return 0
+
+        lags = []
+        failed = 0
+        for row in sorted(claimed, key=lambda row: row.id):
+            try:
+                # Each event gets a savepoint, so one failing handler doesn't undo the rest of the batch
+                with session.begin_nested():
+                    self.handlers[row.event_type](**json.loads(row.payload))
+                    session.execute(update(t).where(t.c.id == row.id).values(processed_at=datetime.utcnow()))
+            except Exception as exc:
+                logger.exception('Outbox event %d (%s) failed on attempt %d', row.id, row.event_type, row.attempts)
+                session.execute(update(t).where(t.c.id == row.id).values(
+                    last_error=repr(exc)[:500],
+                    available_at=now + timedelta(seconds=self.retry_delay * 2 ** (row.attempts - 1))
+                ))
+                failed += 1
+                continue
+            lags.append((datetime.utcnow() - row.created_at).total_seconds())
+        session.commit()
+
+        with self._lock:
+            metrics = self._metrics
+            metrics['processed'] += len(lags)
+            metrics['failed'] += failed
+            metrics['batches'] += 1
+            metrics['last_batch_at'] = datetime.utcnow()
+            if lags:
+                metrics['last_lag_seconds'] = round(max(lags), 3)
+                metrics['max_lag_seconds'] = round(max(metrics['max_lag_seconds'], *lags), 3)
+        return len(claimed)
+
+    def drain(self, session):
+        """Process batches until nothing is pending. Returns the number of events claimed.
+
+        Handlers may publish follow-up events (e.g. the next chunk of a long
+        job), so a short batch doesn't mean the queue is empty.
+        """
+        total = 0
+        while True:
+            count = self.process_batch(session)
+            total += count
+            if count == 0:
+                return total
+
+    def prune(self, session, older_than=timedelta(days=7)):
+        """Delete processed events older than ``older_than``. Returns the number deleted."""
+        t = self.table
+        deleted = session.execute(t.delete().where(
+            t.c.processed_at.is_not(None), t.c.processed_at < datetime.utcnow() - older_than
+        )).rowcount
+        session.commit()
+        return deleted
+
+    # Metrics
+    def stats(self, session):
+        """Backlog and lag figures from the table plus this process's worker counters."""
+        t = self.table
+        now = datetime.utcnow()
+        pending = t.c.processed_at.is_(None)
+        dead = t.c.attempts >= self.max_attempts
+        row = session.execute(select(
+            func.count().filter(pending, ~dead),
+            func.min(t.c.created_at).filter(pending, ~dead),
+            func.count().filter(pending, dead),
+        )).one()
+        with self._lock:
+            metrics = dict(self._metrics)
+        if metrics['last_batch_at']:
+            metrics['last_batch_at'] = metrics['last_batch_at'].isoformat()
+        metrics.update({
+            'pending': row[0],
+            'lag_seconds': round((now - row[1]).total_seconds(), 3) if row[1] else 0.0,
+            'dead': row[2],
+            'worker_running': self._thread is not None and self._thread.is_alive(),
+        })
+        return metrics
+
+    # Background worker
+    def run(self, app, session):
+        """Worker loop: drain whenever woken by a commit, and at least every ``interval`` seconds."""
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            with app.app_context():
+                try:
+                    self.drain(session())
+                except Exception:
+                    logger.exception('Outbox worker batch failed')
+                finally:
+                    session.remove()
+
+    def start(self, app, session):
+        """Start the worker thread for ``app`` using a scoped ``session`` (idempotent)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self.run, args=(app, session), name='outbox-worker', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
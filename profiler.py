@@ -0,0 +1,199 @@
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, namedtuple
+from datetime import datetime
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# One profiled request on disk: <name>.folded holds its collapsed stacks, <name>.sql its statements
+ProfileFile = namedtuple('ProfileFile', ['name', 'endpoint', 'created_at', 'duration_ms', 'samples', 'statements'])
+
+
+class Profile:
+    """Stack samples and SQL statements of one request."""
+
+    def __init__(self, endpoint, thread_id):
+        self.endpoint = endpoint
+        self.thread_id = thread_id
+        self.started = time.perf_counter()
+        self.created_at = datetime.utcnow()
+        self.samples = Counter()
+        self.statements = []  # (milliseconds, SQL text)
+
+
+class SamplingProfiler:
+    """Opt-in sampling profiler for selected requests.
+
+    A request is profiled when its endpoint is in ``endpoints`` or, failing
+    that, with probability ``sample_rate`` unless its endpoint starts with
+    one of ``exclude``; both can be changed at runtime.
+    While at least one profiled request is running, a background thread reads
+    the stacks of their threads every ``interval`` seconds; the requests
+    themselves only register and unregister, so unprofiled requests pay one
+    attribute check. Each profile is written as flamegraph-compatible
+    collapsed stacks (``frame;frame;frame count``) plus the SQL statements the
+    request executed, with timings but without parameters.
+    """
+
+    def __init__(self, directory=None, interval=0.005, keep=200, exclude=('static',)):
+        self.directory = directory
+        self.interval = interval
+        self.keep = keep
+        self.exclude = tuple(exclude)
+        self.endpoints = frozenset()
+        self.sample_rate = 0.0
+        self._active = {}  # thread id -> Profile
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    @property
+    def enabled(self):
+        return bool(self.endpoints) or self.sample_rate > 0
+
+    def configure(self, endpoints=None, sample_rate=None):
+        """Change which requests are profiled, effective from the next request."""
+        if endpoints is not None:
+            self.endpoints = frozenset(endpoint for endpoint in endpoints if endpoint)
+        if sample_rate is not None:
+            self.sample_rate = min(max(float(sample_rate), 0.0), 1.0)
+
+    def init_app(self, app):
+        self.directory = app.config.get('PROFILE_DIR') or os.path.join(app.instance_path, 'profiles')
+        self.interval = app.config.get('PROFILER_INTERVAL', self.interval)
+        self.keep = app.config.get('PROFILER_KEEP', self.keep)
+        self.configure(app.config.get('PROFILE_ENDPOINTS', ()), app.config.get('PROFILE_SAMPLE_RATE', 0.0))
+        app.extensions['profiler'] = self
+        app.before_request(self._start_request)
+        app.teardown_request(self._finish_request)
+
+        # Engine events are global, so register them once per process
+        if not event.contains(Engine, 'before_cursor_execute', self._before_statement):
+            event.listen(Engine, 'before_cursor_execute', self._before_statement)
+            event.listen(Engine, 'after_cursor_execute', self._after_statement)
+
+    # Requests
+    def _start_request(self):
+        if not self.enabled:
+            return
+        endpoint = request.endpoint or 'unknown'
+        if endpoint not in self.endpoints and (endpoint.startswith(self.exclude) or random.random() >= self.sample_rate):
+            return
+        profile = g.profile = Profile(endpoint, threading.get_ident())
+        with self._lock:
+            self._active[profile.thread_id] = profile
+        self._ensure_sampler()
+        self._wake.set()
+
+    def _finish_request(self, exc=None):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return
+        with self._lock:
+            self._active.pop(profile.thread_id, None)
+        try:
+            self.write(profile, time.perf_counter() - profile.started)
+        except OSError:
+            logger.exception('Could not write the profile of %s', profile.endpoint)
+
+    # SQL statements of profiled requests
+    @staticmethod
+    def _before_statement(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and g.get('profile') is not None:
+            conn.info.setdefault('profile_started', []).append(time.perf_counter())
+
+    @staticmethod
+    def _after_statement(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and g.get('profile') is not None and conn.info.get('profile_started'):
+            elapsed = time.perf_counter() - conn.info['profile_started'].pop()
+            g.profile.statements.append((round(elapsed * 1000, 3), ' '.join(statement.split())))
+
+    # Sampling
+    def _ensure_sampler(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                idle = not self._active
+            if idle:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            self.sample()
+            time.sleep(self.interval)
+
+    def sample(self):
+        """Record the current stack of every thread serving a profiled request."""
+        frames = sys._current_frames()
+        with self._lock:
+            for thread_id, profile in self._active.items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    profile.samples[collapse(frame)] += 1
+
+    # Output
+    def write(self, profile, duration):
+        """Write ``<name>.folded`` and ``<name>.sql`` for a finished profile and drop the oldest beyond ``keep``."""
+        os.makedirs(self.directory, exist_ok=True)
+        name = f'{profile.created_at:%Y%m%dT%H%M%S%f}-{profile.endpoint.replace(".", "-")}'
+        with open(os.path.join(self.directory, f'{name}.folded'), 'w', encoding='utf-8') as f:
+            for stack, count in profile.samples.most_common():
+                f.write(f'{stack} {count}\n')
+        with open(os.path.join(self.directory, f'{name}.sql'), 'w', encoding='utf-8') as f:
+            f.write(f'-- {profile.endpoint}: {duration * 1000:.1f} ms, {len(profile.samples)} distinct stacks, '
+                    f'{sum(profile.samples.values())} samples, {len(profile.statements)} statements\n')
+            for milliseconds, statement in profile.statements:
+                f.write(f'\n-- {milliseconds} ms\n{statement};\n')
+        self._prune()
+        return name
+
+    def _prune(self):
+        names = sorted(entry[:-len('.folded')] for entry in os.listdir(self.directory) if entry.endswith('.folded'))
+        for name in names[:max(len(names) - self.keep, 0)]:
+            for extension in ('.folded', '.sql'):
+                try:
+                    os.remove(os.path.join(self.directory, name + extension))
+                except FileNotFoundError:
+                    pass
+
+    def profiles(self, limit=50):
+        """The newest written profiles as ProfileFile, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted((entry[:-len('.folded')] for entry in os.listdir(self.directory) if entry.endswith('.folded')),
+                       reverse=True)[:limit]
+        files = []
+        for name in names:
+            # The .sql header line: "-- endpoint: 12.3 ms, 4 distinct stacks, 20 samples, 7 statements"
+            try:
+                with open(os.path.join(self.directory, f'{name}.sql'), encoding='utf-8') as f:
+                    endpoint, _, figures = f.readline()[3:].partition(': ')
+                duration, _, samples, statements = (float(figure.split()[0]) for figure in figures.split(', '))
+                created_at = datetime.strptime(name[:21], '%Y%m%dT%H%M%S%f')
+            except (OSError, ValueError):
+                continue
+            files.append(ProfileFile(name, endpoint, created_at, duration, int(samples), int(statements)))
+        return files
+
+
+def collapse(frame):
+    """A stack as 'module:function;...' from the outermost frame to ``frame``."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{frame.f_globals.get("__name__", "?")}:{getattr(code, "co_qualname", code.co_name)}')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
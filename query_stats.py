@@ -0,0 +1,140 @@
+import logging
+import threading
+from functools import wraps
+
+from flask import before_render_template, current_app, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+
+logger = logging.getLogger(__name__)
+
+
+class LazyLoadInTemplateError(RuntimeError):
+    """Raised in RAISE_ON_LAZY_LOAD mode when rendering a template triggers a query."""
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised in ENFORCE_QUERY_BUDGETS mode when a view issues more queries than its budget."""
+
+
+def query_budget(limit):
+    """Declare the maximum number of SQL statements a view may issue.
+
+    Overruns are logged; with ENFORCE_QUERY_BUDGETS set (tests, query-report)
+    they raise instead, so a regression to N+1 fails loudly.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            # Only the view's own statements count, not those of before_request hooks
+            before = g.get('query_count', 0)
+            response = f(*args, **kwargs)
+            used = g.get('query_count', 0) - before
+            if used > limit:
+                message = f'{request.endpoint} issued {used} queries, budget is {limit}'
+                if current_app.config.get('ENFORCE_QUERY_BUDGETS'):
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+            return response
+        decorated_function.query_budget = limit
+        return decorated_function
+    return decorator
+
+
+class QueryStats:
+    """Counts SQL statements per request and aggregates them per endpoint.
+
+    Also provides the RAISE_ON_LAZY_LOAD mode: while a template is being
+    rendered, any lazy relationship load or expired-attribute refresh raises
+    LazyLoadInTemplateError, so N+1 patterns fail loudly instead of silently
+    issuing a query per row.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RAISE_ON_LAZY_LOAD', False)
+        app.config.setdefault('ENFORCE_QUERY_BUDGETS', False)
+        app.extensions['query_stats'] = self
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        before_render_template.connect(self._enter_template, app)
+        template_rendered.connect(self._leave_template, app)
+
+        # Engine and Session events are global (shared by every app in the process), so register them once
+        if not event.contains(Engine, 'before_cursor_execute', self._count_statement):
+            event.listen(Engine, 'before_cursor_execute', self._count_statement)
+            event.listen(Session, 'do_orm_execute', self._check_lazy_load)
+
+    # Per-request counting
+    @staticmethod
+    def _start_request():
+        g.query_count = 0
+        g.queries_avoided = 0
+        g.rendering_depth = 0
+
+    @staticmethod
+    def avoided(count=1):
+        """Record queries the request didn't issue because the data was already loaded (request-scoped memos)."""
+        if has_request_context() and 'queries_avoided' in g:
+            g.queries_avoided += count
+
+    def _finish_request(self, response):
+        count = g.get('query_count', 0)
+        avoided = g.get('queries_avoided', 0)
+        endpoint = request.endpoint or 'unknown'
+        with self._lock:
+            requests, total, peak, total_avoided = self._endpoints.get(endpoint, (0, 0, 0, 0))
+            self._endpoints[endpoint] = (requests + 1, total + count, max(peak, count), total_avoided + avoided)
+        response.headers['X-Query-Count'] = str(count)
+        response.headers['X-Queries-Avoided'] = str(avoided)
+        return response
+
+    @staticmethod
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and 'query_count' in g:
+            g.query_count += 1
+
+    # Lazy-load detection during template rendering
+    @staticmethod
+    def _enter_template(sender, template, context, **extra):
+        g.rendering_depth = g.get('rendering_depth', 0) + 1
+
+    @staticmethod
+    def _leave_template(sender, template, context, **extra):
+        g.rendering_depth = g.get('rendering_depth', 1) - 1
+
+    @staticmethod
+    def _check_lazy_load(orm_execute_state):
+        if not has_request_context() or not g.get('rendering_depth'):
+            return
+        if not current_app.config['RAISE_ON_LAZY_LOAD']:
+            return
+        if orm_execute_state.is_relationship_load or orm_execute_state.is_column_load:
+            raise LazyLoadInTemplateError(
+                f'Query issued while rendering {request.endpoint}: {orm_execute_state.statement}'
+            )
+
+    # Reporting
+    def report(self):
+        """Return {endpoint: {'requests', 'avg_queries', 'max_queries', 'avg_avoided'}} since start or last reset."""
+        with self._lock:
+            return {
+                endpoint: {
+                    'requests': requests,
+                    'avg_queries': round(total / requests, 2),
+                    'max_queries': peak,
+                    'avg_avoided': round(avoided / requests, 2),
+                }
+                for endpoint, (requests, total, peak, avoided) in sorted(self._endpoints.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
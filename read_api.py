@@ -0,0 +1,76 @@
+import base64
+import binascii
+import hashlib
+import json
+from datetime import date, datetime
+
+from flask import jsonify, request
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+MAX_ID = 2 ** 63 - 1  # cursors carry a row id, a signed 64-bit integer in the database
+
+
+class ApiError(Exception):
+    """Client error returned as a JSON body instead of an HTML error page."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def parse_fields(allowed):
+    """Return the requested sparse fieldset (``?fields=a,b``) in declaration order, or all fields."""
+    requested = request.args.get('fields')
+    if requested is None:
+        return list(allowed)
+    fields = {name.strip() for name in requested.split(',') if name.strip()}
+    if not fields:
+        raise ApiError(f'fields must name at least one field. Allowed: {", ".join(allowed)}')
+    unknown = fields - set(allowed)
+    if unknown:
+        raise ApiError(f'Unknown fields: {", ".join(sorted(unknown))}. Allowed: {", ".join(allowed)}')
+    return [name for name in allowed if name in fields]
+
+
+def parse_limit():
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    return min(max(limit, 1), MAX_PAGE_SIZE)
+
+
+def encode_cursor(last_id):
+    return base64.urlsafe_b64encode(json.dumps([last_id]).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode an opaque cursor into the last id seen, or None for the first page."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        (last_id,) = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError, binascii.Error):
+        raise ApiError('Invalid cursor')
+    # Ids are positive 64-bit integers; anything else would only fail when bound to the query
+    if type(last_id) is not int or not 0 < last_id <= MAX_ID:
+        raise ApiError('Invalid cursor')
+    return last_id
+
+
+def serialize(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def row_to_dict(row, fields):
+    return {name: serialize(value) for name, value in zip(fields, row)}
+
+
+def conditional_json(payload):
+    """JSON response with a strong ETag; answers 304 when the client already has this version."""
+    response = jsonify(payload)
+    response.set_etag(hashlib.sha1(response.get_data()).hexdigest())
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
@@ -0,0 +1,90 @@
+import gzip
+import json
+import os
+from datetime import date, datetime
+
+from sqlalchemy import select, text
+
+# SQLite auto_vacuum modes (PRAGMA auto_vacuum)
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'Cannot archive {type(value).__name__}')
+
+
+def archive_rows(session, table, time_column, cutoff, archive_dir, batch_size=5000, on_batch=None):
+    """Move rows older than ``cutoff`` into a gzipped NDJSON file, one batch at a time.
+
+    Rows are read in primary key order with keyset pagination, so memory use
+    is bounded by ``batch_size``. Each batch is written to the archive before
+    it is deleted, and ``on_batch(rows)`` runs in the same transaction as the
+    delete (e.g. to fold the rows into summaries). Returns ``(rows, path)``;
+    path is None when nothing was old enough.
+    """
+    query = select(table).where(table.c[time_column] < cutoff).order_by(table.c.id).limit(batch_size)
+    path = None
+    archive = None
+    moved = 0
+    last_id = 0
+    try:
+        while True:
+            rows = session.execute(query.where(table.c.id > last_id)).mappings().all()
+            if not rows:
+                break
+            if archive is None:
+                os.makedirs(archive_dir, exist_ok=True)
+                path = os.path.join(archive_dir, f'{table.name}-{datetime.utcnow():%Y%m%dT%H%M%S}.ndjson.gz')
+                archive = gzip.open(path, 'wt', encoding='utf-8')
+            for row in rows:
+                archive.write(json.dumps(dict(row), default=_json_default) + '\n')
+            archive.flush()
+
+            last_id = rows[-1]['id']
+            if on_batch is not None:
+                on_batch(rows)
+            session.execute(table.delete().where(table.c.id.in_([row['id'] for row in rows])))
+            session.commit()
+            moved += len(rows)
+    finally:
+        if archive is not None:
+            archive.close()
+    return moved, path
+
+
+def read_archive(path):
+    """Yield the archived rows of one file as dicts (timestamps stay ISO strings)."""
+    with gzip.open(path, 'rt', encoding='utf-8') as archive:
+        for line in archive:
+            yield json.loads(line)
+
+
+def database_size(connection):
+    """Return (file bytes, free bytes) of the SQLite database behind ``connection``."""
+    page_size = connection.execute(text('PRAGMA page_size')).scalar()
+    page_count = connection.execute(text('PRAGMA page_count')).scalar()
+    free_pages = connection.execute(text('PRAGMA freelist_count')).scalar()
+    return page_size * page_count, page_size * free_pages
+
+
+def incremental_vacuum(engine, pages=None):
+    """Return free pages to the filesystem. Returns the number of bytes reclaimed.
+
+    Databases created without ``auto_vacuum = INCREMENTAL`` are converted with
+    one full VACUUM; every later run only releases the freelist pages.
+    """
+    if engine.dialect.name != 'sqlite':
+        return 0
+    # VACUUM cannot run inside a transaction
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        before, _ = database_size(connection)
+        if connection.execute(text('PRAGMA auto_vacuum')).scalar() != AUTO_VACUUM_INCREMENTAL:
+            connection.execute(text(f'PRAGMA auto_vacuum = {AUTO_VACUUM_INCREMENTAL}'))
+            connection.execute(text('VACUUM'))
+        else:
+            # pysqlite steps a statement once, which frees one page; executescript runs it to completion
+            connection.connection.driver_connection.executescript(f'PRAGMA incremental_vacuum({int(pages or 0)})')
+        after, _ = database_size(connection)
+    return before - after
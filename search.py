@@ -0,0 +1,259 @@
+import itertools
+import json
+import os
+import random
+import re
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from collections import namedtuple
+
+from sqlalchemy import create_engine, text
+
+# Search documents and results
+SearchDocument = namedtuple('SearchDocument', ['doc_type', 'doc_id', 'title', 'body', 'owner_id'])
+SearchHit = namedtuple('SearchHit', ['doc_type', 'doc_id', 'title', 'snippet', 'score'])
+SearchPage = namedtuple('SearchPage', ['query', 'page', 'per_page', 'has_next', 'hits'])
+
+# Every indexed model gets a small type code so (doc_type, doc_id) packs into one integer key
+DOC_TYPES = {
+    'custom_workout': 1,
+    'challenge': 2,
+    'muscle_group': 3,
+}
+DOC_TYPE_NAMES = {code: name for name, code in DOC_TYPES.items()}
+TYPE_BITS = 3
+
+MAX_PER_PAGE = 50
+MAX_PAGE = 100  # deeper pages of ranked results are never useful and only cost OFFSET scans
+MAX_QUERY_TERMS = 8
+
+
+def flatten_exercises(exercises):
+    """Turn a JSON list of exercises into plain searchable text."""
+    if not exercises:
+        return ''
+    try:
+        parsed = json.loads(exercises)
+    except (TypeError, ValueError):
+        return exercises
+    if isinstance(parsed, list):
+        return ' '.join(str(item) for item in parsed)
+    return exercises
+
+
+def build_match_query(query):
+    """Convert free text into a safe FTS5 MATCH expression (prefix match, all terms required)."""
+    terms = re.findall(r'\w+', query or '', re.UNICODE)[:MAX_QUERY_TERMS]
+    return ' '.join(f'"{term.lower()}"*' for term in terms)
+
+
+# Search Backend Interface
+class SearchBackend(ABC):
+    """Interface every search engine implementation must provide.
+
+    All methods take a SQLAlchemy connection so index writes happen in the
+    same transaction as the row they describe.
+    """
+
+    @abstractmethod
+    def create_schema(self, connection):
+        pass
+
+    @abstractmethod
+    def index_document(self, connection, document):
+        pass
+
+    @abstractmethod
+    def remove_document(self, connection, doc_type, doc_id):
+        pass
+
+    @abstractmethod
+    def search(self, connection, query, owner_id=None, doc_types=None, page=1, per_page=20):
+        pass
+
+    def rebuild(self, connection, documents, doc_types=None):
+        """Re-index from scratch. Backends can override with a faster bulk path."""
+        for document in documents:
+            self.index_document(connection, document)
+
+
+# SQLite FTS5 Backend
+class SQLiteFTS5Backend(SearchBackend):
+    """Full-text search stored in an FTS5 virtual table inside the app database.
+
+    The rowid encodes (doc_id, doc_type), so updates and deletes are primary
+    key lookups instead of scans over the index. Owner and type are indexed as
+    tokens in the ``scope`` column, so filtering happens inside the MATCH
+    instead of after ranking every hit.
+    """
+
+    table = 'search_index'
+    # bm25 column weights: scope, title, body
+    rank_function = 'bm25(0.0, 10.0, 1.0)'
+
+    def __init__(self):
+        self._schema_ready = set()
+
+    @staticmethod
+    def _rowid(doc_type, doc_id):
+        return (int(doc_id) << TYPE_BITS) | DOC_TYPES[doc_type]
+
+    @staticmethod
+    def _scope(document):
+        owner = 'global' if document.owner_id is None else f'u{document.owner_id}'
+        return f'{owner} t{DOC_TYPES[document.doc_type]}'
+
+    def _row(self, document):
+        return {
+            'rowid': self._rowid(document.doc_type, document.doc_id),
+            'scope': self._scope(document),
+            'title': document.title or '',
+            'body': document.body or '',
+        }
+
+    def create_schema(self, connection):
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+            "scope, title, body, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        ))
+        self._schema_ready.add(connection.engine.url)
+
+    def _ensure_schema(self, connection):
+        if connection.engine.url not in self._schema_ready:
+            self.create_schema(connection)
+
+    def index_document(self, connection, document):
+        self._ensure_schema(connection)
+        row = self._row(document)
+        connection.execute(text(f'DELETE FROM {self.table} WHERE rowid = :rowid'), {'rowid': row['rowid']})
+        connection.execute(text(
+            f'INSERT INTO {self.table}(rowid, scope, title, body) VALUES (:rowid, :scope, :title, :body)'
+        ), row)
+
+    def remove_document(self, connection, doc_type, doc_id):
+        self._ensure_schema(connection)
+        connection.execute(text(f'DELETE FROM {self.table} WHERE rowid = :rowid'),
+                           {'rowid': self._rowid(doc_type, doc_id)})
+
+    def rebuild(self, connection, documents, doc_types=None):
+        self._ensure_schema(connection)
+        if doc_types is None:
+            connection.execute(text(f'DELETE FROM {self.table}'))
+        else:
+            codes = [DOC_TYPES[name] for name in doc_types]
+            connection.execute(text(
+                f'DELETE FROM {self.table} WHERE (rowid & {(1 << TYPE_BITS) - 1}) IN ({", ".join(map(str, codes))})'
+            ))
+        insert = text(f'INSERT INTO {self.table}(rowid, scope, title, body) VALUES (:rowid, :scope, :title, :body)')
+        batch = []
+        for document in documents:
+            batch.append(self._row(document))
+            if len(batch) >= 5000:
+                connection.execute(insert, batch)
+                batch = []
+        if batch:
+            connection.execute(insert, batch)
+        connection.execute(text(f"INSERT INTO {self.table}({self.table}) VALUES ('optimize')"))
+
+    def search(self, connection, query, owner_id=None, doc_types=None, page=1, per_page=20):
+        self._ensure_schema(connection)
+        page = min(max(int(page), 1), MAX_PAGE)
+        per_page = min(max(int(per_page), 1), MAX_PER_PAGE)
+        match = build_match_query(query)
+        if not match:
+            return SearchPage(query, page, per_page, False, [])
+
+        # Global documents (challenges, muscle groups) have no owner
+        scopes = 'global' if owner_id is None else f'global OR u{int(owner_id)}'
+        match = f'scope : ({scopes}) AND {{title body}} : ({match})'
+        if doc_types:
+            match += ' AND scope : (' + ' OR '.join(f't{DOC_TYPES[name]}' for name in doc_types) + ')'
+
+        # Fetch one extra row to know whether another page exists without a COUNT(*).
+        # The rank function is set per query; persisting it in the FTS5 config is a write.
+        rows = connection.execute(text(
+            f"SELECT rowid, title, snippet({self.table}, 2, '', '', '…', 12), rank "
+            f"FROM {self.table} WHERE {self.table} MATCH :match AND rank MATCH :rank "
+            f"ORDER BY rank LIMIT :limit OFFSET :offset"
+        ), {'match': match, 'rank': self.rank_function, 'limit': per_page + 1,
+            'offset': (page - 1) * per_page}).fetchall()
+
+        hits = [
+            SearchHit(DOC_TYPE_NAMES[rowid & ((1 << TYPE_BITS) - 1)], rowid >> TYPE_BITS, title, snippet, -score)
+            for rowid, title, snippet, score in rows[:per_page]
+        ]
+        return SearchPage(query, page, per_page, len(rows) > per_page, hits)
+
+
+BACKENDS = {
+    'sqlite-fts5': SQLiteFTS5Backend,
+}
+
+
+def create_backend(name):
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f'Unknown search backend: {name}')
+
+
+# Benchmark
+BENCH_WORDS = [
+    'squat', 'deadlift', 'bench', 'press', 'row', 'pullup', 'pushup', 'plank', 'lunge', 'curl',
+    'sprint', 'cardio', 'hiit', 'yoga', 'boxing', 'core', 'glutes', 'hamstrings', 'quadriceps', 'calves',
+    'shoulders', 'triceps', 'biceps', 'chest', 'back', 'endurance', 'strength', 'mobility', 'tempo', 'interval',
+    'morning', 'evening', 'quick', 'heavy', 'light', 'superset', 'circuit', 'stretch', 'recovery', 'burn',
+]
+
+
+def run_benchmark(n_docs=1_000_000, n_queries=500, n_users=10_000, path=None, seed=42):
+    """Build an index of n_docs synthetic documents and time ranked, paginated queries."""
+    rng = random.Random(seed)
+    # Exercise words plus filler vocabulary with a Zipf-like frequency curve, like real text
+    filler = [''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=rng.randint(4, 9))) for _ in range(20_000)]
+    vocabulary = BENCH_WORDS + filler
+    weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(vocabulary))))
+    owns_file = path is None
+    if owns_file:
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+    engine = create_engine(f'sqlite:///{path}')
+    backend = SQLiteFTS5Backend()
+
+    def documents():
+        for doc_id in range(1, n_docs + 1):
+            title = ' '.join(rng.choices(vocabulary, cum_weights=weights, k=3)).title()
+            body = ' '.join(rng.choices(vocabulary, cum_weights=weights, k=25))
+            yield SearchDocument('custom_workout', doc_id, title, body, rng.randint(1, n_users))
+
+    try:
+        started = time.perf_counter()
+        with engine.begin() as connection:
+            backend.rebuild(connection, documents())
+        build_seconds = time.perf_counter() - started
+
+        timings = []
+        with engine.connect() as connection:
+            for _ in range(n_queries):
+                query = ' '.join(rng.choices(vocabulary, cum_weights=weights, k=rng.randint(1, 2)))
+                page = rng.randint(1, 3)
+                started = time.perf_counter()
+                backend.search(connection, query, owner_id=rng.randint(1, n_users), page=page)
+                timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        return {
+            'documents': n_docs,
+            'queries': n_queries,
+            'build_seconds': round(build_seconds, 2),
+            'index_bytes': os.path.getsize(path),
+            'p50_ms': round(timings[len(timings) // 2], 3),
+            'p95_ms': round(timings[int(len(timings) * 0.95) - 1], 3),
+            'p99_ms': round(timings[int(len(timings) * 0.99) - 1], 3),
+        }
+    finally:
+        engine.dispose()
+        if owns_file:
+            os.remove(path)
@@ -0,0 +1,135 @@
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from dal import upsert_statement
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+# Fixtures
+def load_fixture(name, directory=FIXTURE_DIR):
+    """Read ``<directory>/<name>.json``: {"table", "key", "rows", optional "update"}."""
+    with open(os.path.join(directory, f'{name}.json'), encoding='utf-8') as f:
+        fixture = json.load(f)
+    missing = {'table', 'key', 'rows'} - set(fixture)
+    if missing:
+        raise ValueError(f'Fixture {name} is missing {", ".join(sorted(missing))}')
+    return fixture
+
+
+def apply_fixture(connection, metadata, fixture):
+    """Upsert a fixture's rows in one statement, matching existing rows on its key columns.
+
+    Rows already present get the fixture's values unless the fixture sets
+    ``"update": false`` (e.g. accounts whose password may have changed).
+    Lists and objects are stored as JSON text. Returns the affected row count.
+    """
+    table = metadata.tables[fixture['table']]
+    key = fixture['key']
+    rows = [
+        {column: json.dumps(value) if isinstance(value, (list, dict)) else value for column, value in row.items()}
+        for row in fixture['rows']
+    ]
+    if not rows:
+        return 0
+    columns = sorted({column for row in rows for column in row} - set(key))
+    update_columns = columns if fixture.get('update', True) else ()
+    return connection.execute(upsert_statement(connection, table, key, update_columns=update_columns), rows).rowcount
+
+
+def seed_fixtures(connection, metadata, names, directory=FIXTURE_DIR):
+    """Apply the named fixtures in order. Returns {name: affected rows}."""
+    return {name: apply_fixture(connection, metadata, load_fixture(name, directory)) for name in names}
+
+
+# Synthetic users
+WORKOUT_TYPES = ['Upper Body', 'Lower Body', 'Cardio', 'Core', 'Full Body', 'HIIT', 'Yoga', 'Boxing']
+DIFFICULTIES = {'Easy': 1, 'Medium': 1.5, 'Hard': 2, 'Intense': 2.5}
+GOAL_TYPES = [('endurance', 'workouts'), ('strength', 'workouts'), ('weight_loss', 'kg'), ('custom', 'minutes')]
+EXERCISES = ['Squats', 'Push-ups', 'Lunges', 'Plank', 'Burpees', 'Rows', 'Deadlifts', 'Mountain climbers']
+
+
+def seed_population(connection, metadata, users=100, years=1, workouts_per_week=3, challenges_per_user=5,
+                    goals_per_user=6, custom_workouts_per_user=4, password_hash='!', prefix='bench',
+                    batch_size=10000, seed=42):
+    """Bulk-insert a synthetic population with Core executemany inserts. Returns rows inserted per table.
+
+    Users are generated in chunks so memory stays bounded; every user gets
+    ``years`` of workout history with one activity per workout, enrollments
+    in challenges already in the database, goals and custom workouts.
+    """
+    rng = random.Random(seed)
+    tables = metadata.tables
+    challenge_ids = connection.execute(select(tables['challenge'].c.id)).scalars().all()
+    first_id = (connection.execute(select(func.max(tables['user'].c.id))).scalar() or 0) + 1
+    now = datetime.utcnow().replace(microsecond=0)
+    history_seconds = int(years * 365 * 86400)
+    workouts_per_user = int(years * 52 * workouts_per_week)
+    counts = dict.fromkeys(['user', 'user_stats', 'workout', 'activity', 'user_challenge', 'goal', 'custom_workout'], 0)
+
+    pending = {name: [] for name in counts}
+
+    def flush():
+        # Parents first, so foreign keys hold on databases that enforce them
+        for name in counts:
+            if pending[name]:
+                connection.execute(tables[name].insert(), pending[name])
+                counts[name] += len(pending[name])
+                pending[name] = []
+
+    for user_id in range(first_id, first_id + users):
+        joined = now - timedelta(seconds=history_seconds)
+        pending['user'].append({'id': user_id, 'username': f'{prefix}{user_id}', 'email': f'{prefix}{user_id}@coachsmart.invalid',
+                                'password_hash': password_hash, 'is_admin': False, 'created_at': joined})
+
+        total_minutes = total_points = 0
+        for offset in sorted(rng.randrange(history_seconds) for _ in range(workouts_per_user)):
+            completed_at = joined + timedelta(seconds=offset)
+            workout_type = rng.choice(WORKOUT_TYPES)
+            difficulty = rng.choice(list(DIFFICULTIES))
+            duration = rng.choice([15, 20, 30, 45, 60])
+            points = int(duration * 2 * DIFFICULTIES[difficulty])
+            total_minutes += duration
+            total_points += points
+            pending['workout'].append({'user_id': user_id, 'workout_type': workout_type, 'duration_minutes': duration,
+                                       'difficulty': difficulty, 'points_earned': points, 'completed_at': completed_at})
+            pending['activity'].append({'user_id': user_id, 'activity_type': 'workout',
+                                        'title': f'Completed {workout_type} Workout',
+                                        'description': f'{duration} minute {difficulty.lower()} {workout_type} session',
+                                        'points_earned': points, 'created_at': completed_at})
+        pending['user_stats'].append({'user_id': user_id, 'total_workouts': workouts_per_user, 'total_time_minutes': total_minutes,
+                                      'total_points': total_points, 'level': total_points // 100 + 1,
+                                      'current_streak': rng.randint(0, 7)})
+
+        for challenge_id in rng.sample(challenge_ids, min(challenges_per_user, len(challenge_ids))):
+            completed = rng.random() < 0.3
+            pending['user_challenge'].append({'user_id': user_id, 'challenge_id': challenge_id,
+                                              'current_progress': rng.randint(0, 30), 'is_completed': completed,
+                                              'started_at': joined, 'completed_at': now if completed else None})
+
+        for i in range(goals_per_user):
+            goal_type, unit = rng.choice(GOAL_TYPES)
+            target = rng.choice([5, 10, 20, 50])
+            completed = rng.random() < 0.5
+            pending['goal'].append({'user_id': user_id, 'title': f'{goal_type.replace("_", " ").title()} goal {i + 1}',
+                                    'goal_type': goal_type, 'target_value': target,
+                                    'current_value': target if completed else rng.randint(0, target - 1), 'unit': unit,
+                                    'is_completed': completed, 'is_active': True,
+                                    'completed_at': now - timedelta(days=rng.randint(0, 365)) if completed else None})
+
+        for i in range(custom_workouts_per_user):
+            workout_type = rng.choice(WORKOUT_TYPES)
+            pending['custom_workout'].append({'user_id': user_id, 'name': f'My {workout_type} {i + 1}',
+                                              'duration_minutes': rng.choice([20, 30, 45]), 'difficulty': rng.choice(list(DIFFICULTIES)),
+                                              'workout_type': workout_type,
+                                              'exercises': json.dumps(rng.sample(EXERCISES, 4)),
+                                              'description': f'Custom {workout_type.lower()} session'})
+
+        if len(pending['workout']) >= batch_size:
+            flush()
+    flush()
+    return counts
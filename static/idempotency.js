@@ -0,0 +1,57 @@
+// Every form submission carries an idempotency key, so a double tap or a
+// retry on a flaky connection replays the first response instead of writing twice.
+function newIdempotencyKey() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    return Date.now().toString(36) + Math.random().toString(36).slice(2);
+}
+
+// One key per action for the life of the page: repeated taps on the same button send the same key
+const pageIdempotencyKeys = {};
+
+function pageIdempotencyKey(action) {
+    if (!(action in pageIdempotencyKeys)) {
+        pageIdempotencyKeys[action] = newIdempotencyKey();
+    }
+    return pageIdempotencyKeys[action];
+}
+
+function addIdempotencyKey(form, action) {
+    const input = document.createElement('input');
+    input.type = 'hidden';
+    input.name = 'idempotency_key';
+    input.value = pageIdempotencyKey(action);
+    form.appendChild(input);
+}
+
+// Disable a button once it has submitted; returns false if it already had
+function disableSubmitButton(button) {
+    if (!button) {
+        return true;
+    }
+    if (button.disabled) {
+        return false;
+    }
+    button.disabled = true;
+    button.classList.add('opacity-50', 'cursor-not-allowed');
+    return true;
+}
+
+// Forms that carry a key disable their submit buttons after the first submit
+document.addEventListener('submit', function(event) {
+    const form = event.target;
+    if (form.querySelector('input[name="idempotency_key"]')) {
+        form.querySelectorAll('button[type="submit"], input[type="submit"]').forEach(disableSubmitButton);
+    }
+});
+
+// A page restored from the back/forward cache gets its buttons back (its keys still replay)
+window.addEventListener('pageshow', function(event) {
+    if (event.persisted) {
+        document.querySelectorAll('button.cursor-not-allowed[disabled]').forEach(function(button) {
+            button.disabled = false;
+            button.classList.remove('opacity-50', 'cursor-not-allowed');
+        });
+    }
+});
@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from coachsmart import create_app
+from coachsmart.cli import apply_fixtures, create_tables
+from coachsmart.extensions import db
+from coachsmart.features import enabled_fixtures
+from coachsmart.models import User
+
+BASE_URL = 'https://localhost'
+PASSWORD = 'correct horse battery'
+
+
+@pytest.fixture
+def app(tmp_path):
+    """The app on a temporary SQLite file with the default fixtures; background workers are off."""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "test.db"}',
+        'OUTBOX_WORKER': False,
+        'CONTACT_WORKER': False,
+        # Nothing a test writes ends up in the repository
+        'SECURITY_LOG': str(tmp_path / 'security.log'),
+        'CONTACT_SPOOL_DIR': str(tmp_path / 'contact_spool'),
+        'CONTACT_SINK_FILE': str(tmp_path / 'contact_inbox.jsonl'),
+    })
+    with app.app_context():
+        create_tables()
+        apply_fixtures(enabled_fixtures())
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def user(app):
+    user = User(username='athlete', email='athlete@example.com', password_hash=generate_password_hash(PASSWORD))
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def signed_in_client(app, user):
+    client = app.test_client()
+    with client.session_transaction(base_url=BASE_URL) as session:
+        session['user_id'] = user.id
+        session['username'] = user.username
+    return client
+
+
+def run_concurrently(threads, target, *args):
+    """Run ``target(*args)`` in ``threads`` threads started together. Returns the exceptions they raised."""
+    barrier = threading.Barrier(threads)
+    errors = []
+
+    def run():
+        barrier.wait()
+        try:
+            target(*args)
+        except Exception as exc:
+            errors.append(exc)
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return errors
@@ -0,0 +1,27 @@
+from conftest import BASE_URL, PASSWORD, signed_in_client
+
+
+def test_deletion_ends_every_session_of_the_account(app, user):
+    requester = signed_in_client(app, user)
+    other_device = signed_in_client(app, user)
+    assert other_device.get('/api/v1/activities', base_url=BASE_URL).status_code == 200
+
+    response = requester.post('/account/delete', data={'password': PASSWORD}, base_url=BASE_URL)
+    assert response.status_code == 202
+
+    # The other session is signed out before the deletion has even started
+    assert other_device.get('/api/v1/activities', base_url=BASE_URL).status_code == 401
+    assert other_device.get('/dashboard', base_url=BASE_URL).status_code == 302
+
+
+def test_deleted_account_cannot_sign_in(app, user):
+    email = user.email
+    signed_in_client(app, user).post('/account/delete', data={'password': PASSWORD}, base_url=BASE_URL)
+    response = app.test_client().post('/signin', data={'email': email, 'password': PASSWORD}, base_url=BASE_URL)
+    assert response.headers['Location'].endswith('/get-started')
+
+
+def test_deletion_request_reaches_the_security_log(app, user, caplog):
+    # The security logger only passes WARNING and above to security.log
+    signed_in_client(app, user).post('/account/delete', data={'password': PASSWORD}, base_url=BASE_URL)
+    assert any(record.getMessage().startswith('ACCOUNT_DELETION_REQUESTED') for record in caplog.records)
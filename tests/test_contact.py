@@ -0,0 +1,103 @@
+import smtplib
+from datetime import datetime
+
+import pytest
+
+from coachsmart import create_app
+from coachsmart.events import contact_queue
+from coachsmart.extensions import db
+from coachsmart.models import ContactMessage
+from coachsmart.pages import contact_limiter
+from contact_queue import SMTPSink
+from conftest import BASE_URL
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiter():
+    # The limiter lives in the process, not the app
+    contact_limiter._events.clear()
+
+
+def submit(client, email, subject='Hello', **headers):
+    return client.post('/contact', base_url=BASE_URL, headers=headers, data={
+        'name': 'Sam', 'email': email, 'subject': subject, 'message': 'A question about plans.'})
+
+
+def flush(monkeypatch):
+    """Store and forward everything spooled so far, without waiting for the open segment to be sealed."""
+    monkeypatch.setattr(contact_queue.spool, 'grace', -contact_queue.spool.segment_seconds)
+    return contact_queue.process(db.engine)
+
+
+class FakeSMTP:
+    """Accepts every message except those whose subject contains 'refused'."""
+    sent = []
+
+    def __init__(self, host, port, timeout):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def starttls(self):
+        pass
+
+    def send_message(self, mail):
+        if 'refused' in mail['Subject']:
+            raise smtplib.SMTPRecipientsRefused({'hello@coachsmart.local': (550, b'Rejected')})
+        self.sent.append(mail['Subject'])
+
+
+def test_one_sender_is_limited(app):
+    client = app.test_client()
+    limit = app.config['CONTACT_RATE_LIMIT']
+    statuses = [submit(client, 'sam@example.com', subject=f'Question {n}').status_code for n in range(limit + 1)]
+    assert statuses == [302] * limit + [429]
+
+
+def test_a_repeated_message_is_stored_once(app, monkeypatch):
+    client = app.test_client()
+    submit(client, 'sam@example.com')
+    submit(client, 'SAM@example.com')
+
+    stored, duplicates, forwarded = flush(monkeypatch)
+    assert (stored, duplicates, forwarded) == (1, 1, 1)
+    assert ContactMessage.query.count() == 1
+    # A second flush finds nothing new
+    assert flush(monkeypatch) == (0, 0, 0)
+
+
+def test_a_refused_message_does_not_hold_back_its_batch(app, monkeypatch):
+    monkeypatch.setattr(smtplib, 'SMTP', FakeSMTP)
+    monkeypatch.setattr(FakeSMTP, 'sent', [])
+    monkeypatch.setattr(contact_queue, 'sink', SMTPSink('localhost', sender='noreply@coachsmart.local',
+                                                        recipient='hello@coachsmart.local'))
+    client = app.test_client()
+    for n, subject in enumerate(['First', 'Please refused', 'Third']):
+        submit(client, f'visitor{n}@example.com', subject=subject)
+
+    assert flush(monkeypatch) == (3, 0, 2)
+    assert FakeSMTP.sent == ['[Contact] First', '[Contact] Third']
+    refused = ContactMessage.query.filter_by(forwarded_at=None).one()
+    assert refused.subject == 'Please refused'
+    assert 'SMTPRecipientsRefused' in refused.last_error
+    assert refused.available_at > datetime.utcnow()  # backs off on its own
+    assert ContactMessage.query.filter(ContactMessage.forwarded_at.isnot(None)).count() == 2
+
+
+def test_visitors_behind_the_proxy_get_their_own_limit(app, monkeypatch):
+    settings = ('TESTING', 'SQLALCHEMY_DATABASE_URI', 'OUTBOX_WORKER', 'CONTACT_WORKER', 'SECURITY_LOG', 'CONTACT_SPOOL_DIR')
+    proxied_app = create_app({**{name: app.config[name] for name in settings}, 'PROXY_HOPS': 1})
+    monkeypatch.setattr(contact_limiter, 'limit', 2)
+
+    def send(client):
+        return [submit(client, f'visitor{n}@example.com', **{'X-Forwarded-For': f'203.0.113.{n}'}).status_code
+                for n in range(4)]
+
+    # Without PROXY_HOPS the header is ignored and every visitor shares the proxy's address
+    assert send(app.test_client()) == [302, 302, 429, 429]
+    contact_limiter._events.clear()
+    assert send(proxied_app.test_client()) == [302] * 4
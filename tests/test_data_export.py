@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+
+from benchmark import peak_memory
+from coachsmart.account import export_account
+from coachsmart.extensions import db
+from coachsmart.models import Activity, User
+from conftest import BASE_URL, signed_in_client
+
+SIZES = (2_000, 40_000)  # activity rows of the small and the large account
+
+
+@pytest.fixture
+def export_engine(app, tmp_path):
+    """A database holding one account per size in SIZES (user ids 1, 2, ...)."""
+    engine = create_engine(f'sqlite:///{tmp_path / "export.db"}')
+    db.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        for user_id, size in enumerate(SIZES, 1):
+            connection.execute(User.__table__.insert(), {'id': user_id, 'username': f'export{user_id}',
+                                                         'email': f'export{user_id}@example.com', 'password_hash': '-'})
+            connection.execute(Activity.__table__.insert(), [
+                {'user_id': user_id, 'activity_type': 'workout', 'title': f'Workout {i}',
+                 'description': '30 minutes of Cardio', 'points_earned': 90, 'created_at': now - timedelta(minutes=i)}
+                for i in range(size)
+            ])
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.parametrize('fmt', ['ndjson', 'zip'])
+def test_export_streams_in_bounded_memory(export_engine, fmt):
+    small, large = (peak_memory(export_account(export_engine, user_id, fmt)) for user_id in (1, 2))
+    # Twenty times the rows and over ten times the output, but no more memory while producing it
+    assert large['size'] > small['size'] * 10
+    assert large['peak_kib'] <= small['peak_kib'] * 1.5
+    assert large['peak_kib'] < 4096
+
+
+def test_export_reaches_the_security_log(app, user, caplog):
+    # The security logger only passes WARNING and above to security.log
+    response = signed_in_client(app, user).get('/account/export', base_url=BASE_URL)
+    assert response.status_code == 200
+    response.close()
+    assert any(record.getMessage().startswith('DATA_EXPORT') for record in caplog.records)
@@ -0,0 +1,10 @@
+import pytest
+
+from conftest import BASE_URL
+
+
+@pytest.mark.parametrize('method, route, status', [('post', '/about', 405), ('get', '/no-such-page', 404)])
+def test_http_errors_render_their_page(app, method, route, status):
+    response = getattr(app.test_client(), method)(route, base_url=BASE_URL)
+    assert response.status_code == status
+    assert str(status) in response.get_data(as_text=True)
@@ -0,0 +1,66 @@
+from coachsmart.events import outbox
+from coachsmart.extensions import db
+from coachsmart.models import Activity, Goal, UserStats
+from conftest import BASE_URL, signed_in_client
+
+
+def add_goal(user, goal_type, target_value, unit):
+    goal = Goal(user_id=user.id, title=f'{target_value} {unit}', goal_type=goal_type, target_value=target_value,
+                current_value=0.0, unit=unit)
+    db.session.add(goal)
+    db.session.commit()
+    return goal.id
+
+
+def progress(goal_id):
+    goal = db.session.get(Goal, goal_id)
+    db.session.refresh(goal)
+    return goal.current_value, goal.is_completed
+
+
+def test_workouts_advance_matching_goals_by_their_unit(app, user):
+    workouts = add_goal(user, 'endurance', 2, 'workouts')
+    minutes = add_goal(user, 'custom', 60, 'minutes')
+    hours = add_goal(user, 'weight_loss', 1, 'hours')
+    strength = add_goal(user, 'strength', 2, 'workouts')  # a cardio workout doesn't count towards it
+    untracked = add_goal(user, 'custom', 70, 'kg')
+    client = signed_in_client(app, user)
+
+    def complete_cardio():
+        data = {'workout_type': 'Cardio', 'duration': 30, 'difficulty': 'Easy'}  # 60 points
+        assert client.post('/complete-workout', base_url=BASE_URL, data=data).status_code == 302
+        outbox.drain(db.session)
+
+    complete_cardio()
+    assert progress(workouts) == (1, False)
+    assert progress(minutes) == (30, False)
+    assert progress(hours) == (0.5, False)
+
+    complete_cardio()
+    assert progress(workouts) == (2, True)
+    assert progress(minutes) == (60, True)
+    assert progress(hours) == (1, True)
+    assert progress(strength) == (0, False)
+    assert progress(untracked) == (0, False)
+    # Each completed goal awards 10 points per target unit, once
+    assert UserStats.query.filter_by(user_id=user.id).one().total_points == 2 * 60 + (2 + 60 + 1) * 10
+    assert Activity.query.filter_by(user_id=user.id, activity_type='goal_completed').count() == 3
+
+    complete_cardio()
+    assert progress(workouts) == (2, True)
+
+
+def test_posting_the_same_completion_twice_awards_points_once(app, user):
+    db.session.add(UserStats(user_id=user.id))
+    db.session.commit()
+    goal_id = add_goal(user, 'custom', 5, 'km')
+    client = signed_in_client(app, user)
+
+    responses = [client.post(f'/update-goal/{goal_id}', base_url=BASE_URL, data={'current_value': '5'})
+                 for _ in range(2)]
+    assert [response.json for response in responses] == [{'success': True, 'is_completed': True}] * 2
+    outbox.drain(db.session)
+
+    assert progress(goal_id) == (5, True)
+    assert UserStats.query.filter_by(user_id=user.id).one().total_points == 5 * 10
+    assert Activity.query.filter_by(user_id=user.id, activity_type='goal_completed').count() == 1
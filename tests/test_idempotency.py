@@ -0,0 +1,36 @@
+import uuid
+
+from coachsmart.events import outbox
+from coachsmart.extensions import db
+from coachsmart.models import UserStats, Workout
+from conftest import BASE_URL, run_concurrently, signed_in_client
+
+WORKOUT = {'workout_type': 'Cardio', 'duration': 30, 'difficulty': 'Medium'}
+
+
+def test_concurrent_submissions_with_one_key_are_applied_once(app, user):
+    responses = []
+
+    def submit(key):
+        client = signed_in_client(app, user)
+        responses.append(client.post('/complete-workout', base_url=BASE_URL, data=dict(WORKOUT, idempotency_key=key)))
+
+    for _ in range(3):
+        assert run_concurrently(8, submit, uuid.uuid4().hex) == []
+
+    assert [response.status_code for response in responses] == [302] * 24
+    assert sum(response.headers.get('Idempotent-Replayed') == 'true' for response in responses) == 21
+    db.session.remove()
+    outbox.drain(db.session())
+    assert Workout.query.filter_by(user_id=user.id).count() == 3
+    assert UserStats.query.filter_by(user_id=user.id).one().total_workouts == 3
+
+
+def test_reusing_a_key_for_a_different_request_is_rejected(app, user):
+    client = signed_in_client(app, user)
+    key = uuid.uuid4().hex
+    assert client.post('/complete-workout', base_url=BASE_URL, data=dict(WORKOUT, idempotency_key=key)).status_code == 302
+    response = client.post('/complete-workout', base_url=BASE_URL,
+                           data=dict(WORKOUT, duration=45, idempotency_key=key))
+    assert response.status_code == 422
+    assert Workout.query.filter_by(user_id=user.id).count() == 1
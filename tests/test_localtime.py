@@ -0,0 +1,48 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from coachsmart.events import outbox, publish_event
+from coachsmart.extensions import db
+from coachsmart.models import UserStats, Workout
+from localtime import Calendar
+
+
+def test_day_and_week_follow_the_local_calendar():
+    # 00:30 on Monday 15 June in Tokyo is still Sunday in UTC
+    calendar = Calendar('Asia/Tokyo', now=datetime(2026, 6, 14, 15, 30))
+    assert calendar.today == date(2026, 6, 15)
+    assert calendar.day == (datetime(2026, 6, 14, 15), datetime(2026, 6, 15, 15))
+    assert calendar.week == (datetime(2026, 6, 14, 15), datetime(2026, 6, 21, 15))
+    assert calendar.local_date(datetime(2026, 6, 14, 14, 59)) == date(2026, 6, 14)
+
+
+def test_week_across_a_dst_change():
+    # Berlin moves from UTC+1 to UTC+2 on Sunday 29 March 2026, so that week is an hour short
+    calendar = Calendar('Europe/Berlin', now=datetime(2026, 3, 29, 12))
+    assert calendar.week == (datetime(2026, 3, 22, 23), datetime(2026, 3, 29, 22))
+    assert calendar.week.end - calendar.week.start == timedelta(days=7, hours=-1)
+    assert calendar.day == (datetime(2026, 3, 28, 23), datetime(2026, 3, 29, 22))
+    assert calendar.local_date(datetime(2026, 3, 29, 22, 30)) == date(2026, 3, 30)
+
+
+@pytest.mark.parametrize('zone, completed, streak', [
+    # 23:30 and 00:30 local on consecutive Tokyo days, though both fall on 14 June in UTC
+    ('Asia/Tokyo', [datetime(2026, 6, 14, 14, 30), datetime(2026, 6, 14, 15, 30)], 2),
+    # Both before local midnight in New York, on one local day though two UTC days
+    ('America/New_York', [datetime(2026, 6, 14, 12), datetime(2026, 6, 15, 3)], 1),
+    # Late on Saturday and on Sunday in Berlin, either side of the switch to summer time
+    ('Europe/Berlin', [datetime(2026, 3, 28, 22, 30), datetime(2026, 3, 29, 21, 30)], 2),
+])
+def test_streak_counts_local_days(app, user, zone, completed, streak):
+    user.timezone = zone
+    db.session.commit()
+    for completed_at in completed:
+        workout = Workout(user_id=user.id, workout_type='Cardio', duration_minutes=20, difficulty='Easy',
+                          points_earned=40, completed_at=completed_at)
+        db.session.add(workout)
+        db.session.flush()
+        publish_event('workout_completed', user_id=user.id, workout_id=workout.id)
+        db.session.commit()
+        outbox.drain(db.session)
+    assert UserStats.query.filter_by(user_id=user.id).one().current_streak == streak
@@ -0,0 +1,27 @@
+from coachsmart.extensions import db
+from conftest import BASE_URL, signed_in_client
+
+
+def test_prometheus_metrics_need_admin_or_token(app):
+    client = app.test_client()
+    assert client.get('/admin/ops/metrics', base_url=BASE_URL).status_code == 403
+
+    app.config['OPS_METRICS_TOKEN'] = 'scrape-token'
+    assert client.get('/admin/ops/metrics', base_url=BASE_URL,
+                      headers={'Authorization': 'Bearer wrong-token'}).status_code == 403
+    response = client.get('/admin/ops/metrics', base_url=BASE_URL, headers={'Authorization': 'Bearer scrape-token'})
+    assert response.status_code == 200
+    assert 'coachsmart_http_requests_total' in response.get_data(as_text=True)
+
+
+def test_profiler_changes_reach_the_security_log(app, user, caplog):
+    user.is_admin = True
+    db.session.commit()
+    client = signed_in_client(app, user)
+    with client.session_transaction(base_url=BASE_URL) as session:
+        session['is_admin'] = True
+
+    response = client.post('/admin/ops/profiler', data={'endpoints': '', 'sample_percent': '0'}, base_url=BASE_URL)
+    assert response.status_code == 302
+    # The security logger only passes WARNING and above to security.log
+    assert any(record.getMessage().startswith('PROFILER_CONFIGURED') for record in caplog.records)
@@ -0,0 +1,22 @@
+import pytest
+
+from coachsmart.cli import add_sample_account
+from coachsmart.extensions import db
+from coachsmart.models import User
+from conftest import BASE_URL, signed_in_client
+
+ROUTES = ['/dashboard', '/start-workout', '/training-plan', '/activity', '/challenges',
+          '/my-custom-workouts', '/search?q=workout']
+
+
+@pytest.mark.parametrize('route', ROUTES)
+def test_query_count_does_not_grow_with_account_size(app, route):
+    """Pages load what they render up front (lazy loads raise) in a fixed number of queries."""
+    app.config['RAISE_ON_LAZY_LOAD'] = True
+    counts = []
+    for size in (5, 50):
+        user = db.session.get(User, add_sample_account(f'report-{size}', size))
+        response = signed_in_client(app, user).get(route, base_url=BASE_URL)
+        assert response.status_code == 200
+        counts.append(int(response.headers['X-Query-Count']))
+    assert counts[1] <= counts[0]
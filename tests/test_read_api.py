@@ -0,0 +1,35 @@
+import base64
+import json
+
+import pytest
+
+from conftest import BASE_URL, signed_in_client
+
+
+def cursor(value):
+    return base64.urlsafe_b64encode(json.dumps([value]).encode()).decode().rstrip('=')
+
+
+@pytest.mark.parametrize('value', [2 ** 64, -1, 0, 1.5, True, 'abc', None])
+def test_out_of_range_cursor_is_a_client_error(app, user, value):
+    response = signed_in_client(app, user).get(f'/api/v1/activities?cursor={cursor(value)}', base_url=BASE_URL)
+    assert response.status_code == 400
+    assert response.json == {'error': 'Invalid cursor'}
+
+
+def test_valid_cursor_pages(app, user):
+    response = signed_in_client(app, user).get(f'/api/v1/activities?cursor={cursor(10)}', base_url=BASE_URL)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('route', ['/api/v1/stats', '/api/v1/activities'])
+@pytest.mark.parametrize('fields', ['', ',', ' , '])
+def test_empty_fieldset_is_a_client_error(app, user, route, fields):
+    response = signed_in_client(app, user).get(f'{route}?fields={fields}', base_url=BASE_URL)
+    assert response.status_code == 400
+    assert response.json['error'].startswith('fields must name at least one field')
+
+
+def test_fieldset_selects_the_named_fields(app, user):
+    response = signed_in_client(app, user).get('/api/v1/stats?fields=total_points', base_url=BASE_URL)
+    assert response.json == {'data': {'total_points': 0}}
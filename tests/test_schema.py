@@ -0,0 +1,48 @@
+from sqlalchemy import inspect, text
+
+from coachsmart.cli import create_tables
+from coachsmart.extensions import db
+from coachsmart.models import Challenge
+
+
+def index_names():
+    return {index['name'] for index in inspect(db.engine).get_indexes('challenge')}
+
+
+def add_duplicate_challenge():
+    """A database from before challenge names were unique, holding a repeated name."""
+    db.session.execute(text('DROP INDEX uq_challenge_name'))
+    original = Challenge.query.order_by(Challenge.id).first()
+    db.session.add(Challenge(name=original.name, target_value=1, points_reward=1, challenge_type='streak'))
+    db.session.commit()
+    return original
+
+
+def test_init_db_leaves_duplicates_alone(app):
+    add_duplicate_challenge()
+    count = Challenge.query.count()
+
+    assert create_tables() == {'uq_challenge_name': 1}
+    assert 'uq_challenge_name' not in index_names()
+
+    result = app.test_cli_runner().invoke(args=['init-db'])
+    assert result.exit_code != 0
+    assert 'flask remove-duplicates' in result.output
+    assert Challenge.query.count() == count
+
+
+def test_remove_duplicates_keeps_the_oldest_row_and_builds_the_index(app):
+    original = add_duplicate_challenge()
+    count = Challenge.query.count()
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(args=['remove-duplicates', '--dry-run'])
+    assert 'Dry run: 1 rows would be removed.' in result.output
+    assert Challenge.query.count() == count
+
+    result = runner.invoke(args=['remove-duplicates'])
+    assert result.exit_code == 0, result.output
+    db.session.expire_all()
+    assert Challenge.query.count() == count - 1
+    assert Challenge.query.filter_by(name=original.name).one().id == original.id
+    assert 'uq_challenge_name' in index_names()
@@ -0,0 +1,15 @@
+import pytest
+
+from conftest import BASE_URL, signed_in_client
+from search import MAX_PAGE, MAX_PER_PAGE
+
+
+@pytest.mark.parametrize('args, page, per_page', [
+    ('page=100000000000000000000', MAX_PAGE, 20),
+    ('page=-3&per_page=0', 1, 1),
+    ('per_page=100000000000000000000', 1, MAX_PER_PAGE),
+])
+def test_search_clamps_paging(app, user, args, page, per_page):
+    response = signed_in_client(app, user).get(f'/search?q=workout&{args}', base_url=BASE_URL)
+    assert response.status_code == 200
+    assert (response.json['page'], response.json['per_page']) == (page, per_page)
@@ -0,0 +1,28 @@
+from coachsmart.events import outbox
+from coachsmart.extensions import db
+from coachsmart.models import Activity, Challenge, UserChallenge, UserStats
+from conftest import BASE_URL, run_concurrently, signed_in_client
+
+
+def test_concurrent_create_or_update_routes_leave_no_duplicates(app, user):
+    """Clients racing to create the stats row and join the same challenges never duplicate or fail."""
+    challenge_ids = [c.id for c in Challenge.query.order_by(Challenge.id).limit(5)]
+    statuses = []
+
+    def hammer():
+        client = signed_in_client(app, user)
+        for _ in range(5):
+            statuses.append(client.get('/dashboard', base_url=BASE_URL).status_code)
+            statuses.append(client.get('/training-plan', base_url=BASE_URL).status_code)
+            for challenge_id in challenge_ids:
+                statuses.append(client.post(f'/join-challenge/{challenge_id}', base_url=BASE_URL).status_code)
+
+    # TESTING propagates view exceptions, so an IntegrityError surfaces here
+    assert run_concurrently(8, hammer) == []
+    assert all(status < 500 for status in statuses)
+
+    db.session.remove()
+    outbox.drain(db.session())
+    assert UserStats.query.filter_by(user_id=user.id).count() == 1
+    assert UserChallenge.query.filter_by(user_id=user.id).count() == len(challenge_ids)
+    assert Activity.query.filter_by(user_id=user.id, activity_type='challenge').count() == len(challenge_ids)
@@ -0,0 +1,49 @@
+from sqlalchemy import event
+
+from coachsmart.events import outbox
+from coachsmart.extensions import db
+from coachsmart.models import Challenge, UserStats
+from conftest import BASE_URL, signed_in_client
+
+
+def complete(client, duration, difficulty='Hard'):
+    data = {'workout_type': 'Cardio', 'duration': duration, 'difficulty': difficulty}
+    assert client.post('/complete-workout', base_url=BASE_URL, data=data).status_code == 302
+
+
+def test_stats_are_incremented_in_sql(app, user):
+    client = signed_in_client(app, user)
+    complete(client, 30)  # 120 points
+    complete(client, 10)  # 40 points
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    outbox.drain(db.session)
+    event.remove(db.engine, 'before_cursor_execute', record)
+
+    stats = UserStats.query.filter_by(user_id=user.id).one()
+    assert (stats.total_workouts, stats.total_time_minutes, stats.total_points) == (2, 40, 160)
+    assert stats.level == 2
+    assert stats.current_streak == 1
+    # Read-modify-write in Python would lose increments made by another worker in between
+    updates = [statement for statement in statements if statement.startswith('UPDATE user_stats')]
+    assert len(updates) == 2
+    assert all('total_points=(user_stats.total_points + ?)' in statement for statement in updates)
+
+
+def test_completed_challenge_awards_points_and_a_medal(app, user):
+    challenge = Challenge(name='First Step', target_value=1, points_reward=150, badge_name='Step Badge',
+                          challenge_type='workout_count')
+    db.session.add(challenge)
+    db.session.commit()
+    client = signed_in_client(app, user)
+    assert client.post(f'/join-challenge/{challenge.id}', base_url=BASE_URL).status_code == 302
+    complete(client, 10)  # 40 points
+    outbox.drain(db.session)
+
+    stats = UserStats.query.filter_by(user_id=user.id).one()
+    assert (stats.total_points, stats.challenges_completed, stats.gold_medals) == (190, 1, 1)
@@ -0,0 +1,75 @@
+from sqlalchemy import func, literal, null, select, type_coerce, union_all
+from sqlalchemy.sql.elements import Label
+
+
+class ViewQuery:
+    """Loads every list a page needs in one round trip, as plain row objects.
+
+    Each part is a SELECT whose labelled columns match the fields of a DTO
+    class (a namedtuple: ``__slots__ = ()``, no identity map, change tracking
+    or lazy loading). The parts are combined into one UNION ALL: every column
+    is placed in a slot of its type (integer, string, datetime, ...), unused
+    slots are typed NULLs, and a ``part`` column (the part's position) says
+    which part a row came from. Per-part ordering and limits are kept.
+    """
+
+    def __init__(self):
+        self.parts = []
+
+    def add(self, name, dto, query, order_by=(), limit=None):
+        """Add a part. ``query`` selects one labelled column per field of ``dto``, in any order."""
+        columns = {column.key: column.element if isinstance(column, Label) else column
+                   for column in query.selected_columns}
+        missing = set(dto._fields) - set(columns)
+        if missing:
+            raise ValueError(f'View part {name} does not select {", ".join(sorted(missing))}')
+        self.parts.append((name, dto, query, [columns[field] for field in dto._fields], list(order_by), limit))
+        return self
+
+    def _slots(self):
+        """Assign every part's columns to typed slots. Returns (slot types, {part: [slot name per field]})."""
+        slot_types = {}
+        layout = {}
+        for name, _, _, columns, _, _ in self.parts:
+            used = {}
+            names = []
+            for column in columns:
+                affinity = column.type._type_affinity
+                index = used.get(affinity, 0)
+                used[affinity] = index + 1
+                slot = f'{affinity.__name__.lower()}_{index}'
+                slot_types.setdefault(slot, column.type)
+                names.append(slot)
+            layout[name] = names
+        return slot_types, layout
+
+    def statement(self):
+        slot_types, layout = self._slots()
+        selects = []
+        for position, (name, _, query, columns, order_by, limit) in enumerate(self.parts):
+            by_slot = dict(zip(layout[name], columns))
+            sequence = func.row_number().over(order_by=order_by) if order_by else literal(0)
+            inner = query.with_only_columns(
+                literal(position).label('part'), sequence.label('seq'),
+                *[type_coerce(by_slot.get(slot, null()), slot_type).label(slot)
+                  for slot, slot_type in slot_types.items()],
+                maintain_column_froms=True
+            )
+            if order_by:
+                inner = inner.order_by(*order_by)
+            if limit is not None:
+                inner = inner.limit(limit)
+            # SQLite does not allow ORDER BY/LIMIT directly inside a compound SELECT
+            selects.append(select(inner.subquery()))
+        combined = union_all(*selects).subquery()
+        return select(combined).order_by(combined.c.part, combined.c.seq)
+
+    def load(self, session):
+        """Run the statement once. Returns {part name: [dto, ...]}."""
+        _, layout = self._slots()
+        results = {name: [] for name, *_ in self.parts}
+        decoders = [(name, dto, layout[name]) for name, dto, *_ in self.parts]
+        for row in session.execute(self.statement()).mappings():
+            name, dto, slots = decoders[row['part']]
+            results[name].append(dto._make([row[slot] for slot in slots]))
+        return results
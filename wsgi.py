@@ -1,12 +1,6 @@
-import sys
+# Start the server from the repository root so `coachsmart` and the top-level modules are importable,
+# e.g. `gunicorn --chdir /path/to/CoachSmart wsgi:application`
+# Set SECRET_KEY in the environment so every worker signs sessions with the same key
+from coachsmart import create_app
 
-# Add your project directory to the Python path
-path = '/home/your_username/CoachSmart'
-if path not in sys.path:
-    sys.path.insert(0, path)
-
-# Import your Flask app
-from app import app as application  # noqa
-
-# Set the secret key for session management
-application.secret_key = 'your-secret-key-here'  # Make sure this matches your app's secret key
+application = create_app({'PRECOMPILE_TEMPLATES': True})